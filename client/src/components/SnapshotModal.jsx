@@ -11,6 +11,30 @@ export default function SnapshotModal({ open, onClose }) {
   const [openCount, setOpenCount] = useState(0);
   const prevOpenRef = useRef(false);
 
+  // Per-chart content hashes from the seeder's snapshot_manifest.json. When
+  // present they replace the open counter in the URL, so unchanged charts
+  // stay cached across opens.
+  const [versions, setVersions] = useState({});
+
+  useEffect(() => {
+    if (!open) return;
+    let cancelled = false;
+    fetch(`${API_BASE}/snapshots/snapshot_manifest.json`, { cache: "no-store" })
+      .then((res) => (res.ok ? res.json() : null))
+      .then((manifest) => {
+        if (cancelled || !manifest?.charts) return;
+        const next = {};
+        for (const chart of Object.values(manifest.charts)) {
+          if (chart?.file && chart?.hash) next[chart.file] = chart.hash.slice(0, 16);
+        }
+        setVersions(next);
+      })
+      .catch(() => {});
+    return () => {
+      cancelled = true;
+    };
+  }, [open, API_BASE]);
+
   useEffect(() => {
     if (open && !prevOpenRef.current) {
       setOpenCount((c) => c + 1); // eslint-disable-line react-hooks/set-state-in-effect
@@ -25,13 +49,15 @@ export default function SnapshotModal({ open, onClose }) {
 
   if (!open) return null;
 
+  const snapshotSrc = (file) => `${API_BASE}/snapshots/${file}?v=${versions[file] ?? openCount}`;
+
   const images = [
-    { src: `${API_BASE}/snapshots/snapshot_1_geo_distribution.png?v=${openCount}`, alt: "Snapshot 1 - Geographic Distribution" },
-    { src: `${API_BASE}/snapshots/snapshot_2_country_split.png?v=${openCount}`, alt: "Snapshot 2 - Country Split" },
-    { src: `${API_BASE}/snapshots/snapshot_3_package_distribution.png?v=${openCount}`, alt: "Snapshot 3 - Package Distribution" },
-    { src: `${API_BASE}/snapshots/snapshot_4_subscription_status.png?v=${openCount}`, alt: "Snapshot 4 - Subscription Status" },
-    { src: `${API_BASE}/snapshots/snapshot_5_billing_cycle.png?v=${openCount}`, alt: "Snapshot 5 - Billing Cycle" },
-    { src: `${API_BASE}/snapshots/snapshot_6_customer_creation_timeline.png?v=${openCount}`, alt: "Snapshot 6 - Customer Creation Timeline" },
+    { src: snapshotSrc("snapshot_1_geo_distribution.png"), alt: "Snapshot 1 - Geographic Distribution" },
+    { src: snapshotSrc("snapshot_2_country_split.png"), alt: "Snapshot 2 - Country Split" },
+    { src: snapshotSrc("snapshot_3_package_distribution.png"), alt: "Snapshot 3 - Package Distribution" },
+    { src: snapshotSrc("snapshot_4_subscription_status.png"), alt: "Snapshot 4 - Subscription Status" },
+    { src: snapshotSrc("snapshot_5_billing_cycle.png"), alt: "Snapshot 5 - Billing Cycle" },
+    { src: snapshotSrc("snapshot_6_customer_creation_timeline.png"), alt: "Snapshot 6 - Customer Creation Timeline" },
   ];
 
   return (
@@ -0,0 +1,9 @@
+-- Remove duplicate (subscriptionID, dueDate) payments, keeping the oldest row
+DELETE FROM "Payment" a
+USING "Payment" b
+WHERE a."subscriptionID" = b."subscriptionID"
+  AND a."dueDate" = b."dueDate"
+  AND a."paymentID" > b."paymentID";
+
+-- CreateIndex
+CREATE UNIQUE INDEX "Payment_subscriptionID_dueDate_key" ON "Payment"("subscriptionID", "dueDate");
@@ -0,0 +1,8 @@
+-- CreateTable
+CREATE TABLE "PaymentGenerationState" (
+    "job" TEXT NOT NULL,
+    "generatedThrough" DATE NOT NULL,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "PaymentGenerationState_pkey" PRIMARY KEY ("job")
+);
@@ -0,0 +1,355 @@
+"""
+Benchmarks for the seeder hot paths, checked against stored baselines.
+
+Cases:
+  postal:<dist>        generate_postal_and_coords() n times, per POSTAL_DISTRIBUTIONS entry
+  pick:<dist>          pick_subscription_by_distribution() n times, per distribution
+  sample:<dist>        SubscriptionSampler.sample(n), per distribution
+  due_rows             payments_due.due_payment_rows() over n synthetic subscriptions
+  due_scan             verify_due.find_due_monthly_active_subs() over n rows   (needs DATABASE_URL)
+  insert:values        insert_many() through execute_values                    (needs DATABASE_URL)
+  insert:copy          insert_many() through COPY                              (needs DATABASE_URL)
+  snapshots            generate_snapshots_inline() for n customers + n subscriptions
+
+Usage:
+  python benchmarks/bench_hot_paths.py                          # 10k scale
+  BENCH_SCALE=10k,1m,10m python benchmarks/bench_hot_paths.py
+  BENCH_ONLY=postal,sample python benchmarks/bench_hot_paths.py # case name prefixes
+  BENCH_SAVE_BASELINE=1 python benchmarks/bench_hot_paths.py    # record current timings
+  BENCH_REPORT_ONLY=1 python benchmarks/bench_hot_paths.py      # list regressions, exit 0
+
+Timings are compared with benchmarks/baselines.json (per scale). The run exits
+with status 1 if a case is slower than baseline * (1 + BENCH_TOLERANCE) plus
+BENCH_MIN_SLACK seconds; the slack keeps sub-timer-noise cases (most of the
+10k tier) from tripping the check. Database rows go into TEMP tables and are
+rolled back.
+
+Baselines depend on the machine. baselines.json holds the 10k and 1m tiers
+from a development machine, so the check is meaningful there; CI runs 10k on
+every push with BENCH_REPORT_ONLY=1, since a shared runner is neither that
+machine nor stable enough to gate on. The 10m tier is a manual run (the
+insert and snapshot inputs alone need several GB): its cases are reported
+without a baseline until one is recorded for the machine at hand with
+BENCH_SAVE_BASELINE=1.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parents[1]  # .../server/seeder
+if str(HERE) not in sys.path:
+    sys.path.insert(0, str(HERE))
+
+# the seeder's status lines go through the "seeder" logger; keep them out of the timings table
+os.environ.setdefault("SEED_LOG_LEVEL", "WARNING")
+
+from seeder.config import strip_prisma_schema_query
+from seeder.db import connect, insert_many
+from seeder.payments_due import PaymentInsertSchema, due_payment_rows
+from seeder.seeders import (
+    POSTAL_DISTRIBUTIONS,
+    SnapshotCustomers,
+    SnapshotSubscriptions,
+    generate_postal_and_coords,
+    generate_snapshots_inline,
+)
+from seeder.subscription_distributions import DISTRIBUTIONS, SubscriptionSampler, pick_subscription_by_distribution
+from seeder.verify_due import VerifySchema, find_due_monthly_active_subs
+
+from bench_insert_many import TABLE as INSERT_TABLE, create_bench_table, make_rows, run_insert
+
+SCALES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+
+BASELINES_FILE = Path(__file__).with_name("baselines.json")
+TOLERANCE = float(os.environ.get("BENCH_TOLERANCE", "0.5"))
+MIN_SLACK = float(os.environ.get("BENCH_MIN_SLACK", "0.05"))
+REPORT_ONLY = os.environ.get("BENCH_REPORT_ONLY", "0").strip() in ("1", "true", "True")
+
+STATUSES = ["ACTIVE", "CANCELED", "PAST_DUE"]
+N_CUSTOMERS = 10_000
+N_PACKAGES = 10
+
+DUE_TABLE = "bench_subscription"
+
+
+# ------------------------------------------------------------
+# synthetic inputs
+# ------------------------------------------------------------
+def _ids() -> tuple[list[int], list[int], list[float], list[float]]:
+    rnd = random.Random(0)
+    cust_ids = list(range(1, N_CUSTOMERS + 1))
+    pkg_ids = list(range(1, N_PACKAGES + 1))
+    return cust_ids, pkg_ids, [rnd.uniform(1, 10) for _ in pkg_ids], [rnd.uniform(0.5, 2) for _ in cust_ids]
+
+
+def _sampler(dist: str) -> SubscriptionSampler:
+    cust_ids, pkg_ids, pkg_w, cust_w = _ids()
+    return SubscriptionSampler(
+        dist, cust_ids, pkg_ids, STATUSES, pkg_weights=pkg_w, cust_weights=cust_w, rng=np.random.default_rng(0)
+    )
+
+
+def _subscription_batch(n: int):
+    return _sampler("realistic_default").sample(n)
+
+
+# ------------------------------------------------------------
+# cases: fn(n, cur) -> None; timed around the call
+# ------------------------------------------------------------
+def _postal_case(dist: str):
+    def run(n: int, cur) -> None:
+        random.seed(0)
+        for _ in range(n):
+            generate_postal_and_coords(dist)
+
+    return run
+
+
+def _pick_case(dist: str):
+    cust_ids, pkg_ids, pkg_w, cust_w = _ids()
+
+    def run(n: int, cur) -> None:
+        random.seed(0)
+        for _ in range(n):
+            pick_subscription_by_distribution(
+                dist, cust_ids, pkg_ids, STATUSES, pkg_weights=pkg_w, cust_weights=cust_w
+            )
+
+    return run
+
+
+def _sample_case(dist: str):
+    def run(n: int, cur) -> None:
+        _sampler(dist).sample(n)
+
+    return run
+
+
+# inputs built by a case's setup, outside the timed call
+_INPUTS: dict[str, object] = {}
+
+
+def _due_rows_setup(n: int, cur) -> None:
+    _INPUTS["batch"] = _subscription_batch(n)
+
+
+def _due_rows(n: int, cur) -> None:
+    batch = _INPUTS["batch"]
+    pay = PaymentInsertSchema(
+        PAY_T="Payment",
+        pay_cols={"subscriptionID", "dueDate", "status", "amountCents"},
+        pay_sub_fk="subscriptionID",
+        pay_due="dueDate",
+        pay_status="status",
+        pay_amount="amountCents",
+        pay_period_start=None,
+        pay_period_end=None,
+        pay_paid_at=None,
+    )
+    due_payment_rows(
+        pay,
+        "DUE",
+        np.arange(1, n + 1, dtype=np.int64),
+        batch.start_dts,
+        batch.cycles,
+        batch.statuses,
+        days_ahead=7,
+        today=date(2026, 1, 15),
+    )
+
+
+def _due_scan_setup(n: int, cur) -> None:
+    cur.execute(
+        f'''
+        CREATE TEMP TABLE IF NOT EXISTS "{DUE_TABLE}" (
+          "subscriptionID" SERIAL PRIMARY KEY,
+          "customerID" INT NOT NULL,
+          "billingCycle" TEXT NOT NULL,
+          "status" TEXT NOT NULL,
+          "startDate" TIMESTAMP(3) NOT NULL
+        )
+        '''
+    )
+    cur.execute(f'TRUNCATE "{DUE_TABLE}" RESTART IDENTITY')
+    batch = _subscription_batch(n)
+    rows = [
+        {"customerID": c, "billingCycle": cy, "status": st, "startDate": sd}
+        for c, cy, st, sd in zip(
+            batch.customer_ids.tolist(), batch.cycles.tolist(), batch.statuses.tolist(), batch.start_dts.tolist()
+        )
+    ]
+    insert_many(cur, DUE_TABLE, rows, use_copy=True)
+    cur.execute(f'ANALYZE "{DUE_TABLE}"')
+
+
+def _due_scan(n: int, cur) -> None:
+    schema = VerifySchema(
+        sub_table=DUE_TABLE,
+        cust_table=None,
+        pkg_table=None,
+        sub_pk="subscriptionID",
+        sub_cust_fk="customerID",
+        sub_pkg_fk=None,
+        sub_cycle_col="billingCycle",
+        sub_status_col="status",
+        sub_start_col="startDate",
+        cust_pk=None,
+        cust_first=None,
+        cust_last=None,
+        cust_full=None,
+        cust_email=None,
+        pkg_pk=None,
+        pkg_name=None,
+    )
+    find_due_monthly_active_subs(cur, schema, days_ahead=7, today=date(2026, 1, 15))
+
+
+def _insert_setup(n: int, cur) -> None:
+    cur.execute("SELECT to_regclass(%s)", (f"pg_temp.{INSERT_TABLE}",))
+    if cur.fetchone()[0] is None:
+        create_bench_table(cur)
+    _INPUTS["rows"] = make_rows(n)
+
+
+def _insert_case(use_copy: bool):
+    def run(n: int, cur) -> None:
+        run_insert(cur, _INPUTS["rows"], use_copy=use_copy)
+
+    return run
+
+
+def _snapshots_setup(n: int, cur) -> None:
+    rnd = random.Random(0)
+    customers = SnapshotCustomers()
+    base = date(2020, 1, 1)
+    for i in range(n):
+        if i % 2:
+            customers.append("H2X 1Y4", rnd.uniform(43, 53), rnd.uniform(-123, -63), base + timedelta(days=i % 2000))
+        else:
+            customers.append("10001", rnd.uniform(26, 48), rnd.uniform(-122, -70), base + timedelta(days=i % 2000))
+    subscriptions = SnapshotSubscriptions()
+    subscriptions.add_batch(_subscription_batch(n))
+    _INPUTS["customers"], _INPUTS["subscriptions"] = customers, subscriptions
+
+
+def _snapshots(n: int, cur) -> None:
+    with tempfile.TemporaryDirectory() as out_dir:
+        generate_snapshots_inline(
+            customers=_INPUTS["customers"],
+            subscriptions=_INPUTS["subscriptions"],
+            package_lookup={pkg: f"Package {pkg}" for pkg in range(1, N_PACKAGES + 1)},
+            output_dir=out_dir,
+        )
+
+
+def build_cases() -> list[tuple[str, object, object, bool]]:
+    """(name, fn, setup or None, needs_db)"""
+    cases = [(f"postal:{d}", _postal_case(d), None, False) for d in sorted(POSTAL_DISTRIBUTIONS)]
+    cases += [(f"pick:{d}", _pick_case(d), None, False) for d in DISTRIBUTIONS]
+    cases += [(f"sample:{d}", _sample_case(d), None, False) for d in DISTRIBUTIONS]
+    cases += [
+        ("due_rows", _due_rows, _due_rows_setup, False),
+        ("due_scan", _due_scan, _due_scan_setup, True),
+        ("insert:values", _insert_case(False), _insert_setup, True),
+        ("insert:copy", _insert_case(True), _insert_setup, True),
+        ("snapshots", _snapshots, _snapshots_setup, False),
+    ]
+    return cases
+
+
+# ------------------------------------------------------------
+# runner
+# ------------------------------------------------------------
+def _time_case(fn, setup, n: int, cur, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup(n, cur)
+        t0 = time.perf_counter()
+        fn(n, cur)
+        best = min(best, time.perf_counter() - t0)
+    _INPUTS.clear()
+    return best
+
+
+def _load_baselines() -> dict:
+    if BASELINES_FILE.exists():
+        return json.loads(BASELINES_FILE.read_text(encoding="utf-8"))
+    return {}
+
+
+def main() -> int:
+    scales = [s.strip() for s in os.environ.get("BENCH_SCALE", "10k").split(",") if s.strip()]
+    for s in scales:
+        if s not in SCALES:
+            raise SystemExit(f"Invalid BENCH_SCALE='{s}'. Allowed: {sorted(SCALES)}")
+    only = [p.strip() for p in os.environ.get("BENCH_ONLY", "").split(",") if p.strip()]
+    save = os.environ.get("BENCH_SAVE_BASELINE", "0").strip() in ("1", "true", "True")
+
+    cases = [c for c in build_cases() if not only or any(c[0].startswith(p) for p in only)]
+
+    db_url = os.environ.get("DATABASE_URL")
+    conn = connect(strip_prisma_schema_query(db_url)) if db_url else None
+    if conn is None and any(needs_db for *_, needs_db in cases):
+        print("ℹ️ DATABASE_URL not set; skipping database cases.")
+
+    baselines = _load_baselines()
+    regressions = []
+    try:
+        cur = conn.cursor() if conn else None
+        for scale in scales:
+            n = SCALES[scale]
+            repeat = 3 if n <= 10_000 else 1
+            base = baselines.get(scale, {})
+            results: dict[str, float] = {}
+
+            print(f"\n=== scale {scale} (n={n}) ===")
+            print(f"{'case':<28} {'seconds':>10} {'rows/s':>12} {'baseline':>10} {'ratio':>7}")
+            for name, fn, setup, needs_db in cases:
+                if needs_db and cur is None:
+                    continue
+                secs = _time_case(fn, setup, n, cur, repeat)
+                results[name] = round(secs, 4)
+
+                ref = base.get(name)
+                ratio = f"{secs / ref:>6.2f}x" if ref else "      -"
+                print(f"{name:<28} {secs:>10.3f} {n / secs if secs else 0:>12.0f} {ref or '-':>10} {ratio}")
+                if ref is not None and secs > ref * (1 + TOLERANCE) + MIN_SLACK:
+                    regressions.append((scale, name, secs, ref))
+
+            if save:
+                baselines[scale] = {**base, **results}
+        if conn:
+            conn.rollback()
+    finally:
+        if conn:
+            conn.close()
+
+    if save:
+        BASELINES_FILE.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\n✅ Baselines written to {BASELINES_FILE}")
+        return 0
+
+    if regressions:
+        mark = "⚠️" if REPORT_ONLY else "❌"
+        print(f"\n{mark} {len(regressions)} regression(s) beyond {TOLERANCE:.0%} of baseline:")
+        for scale, name, secs, ref in regressions:
+            print(f"  [{scale}] {name}: {secs:.3f}s vs {ref:.3f}s")
+        return 0 if REPORT_ONLY else 1
+
+    print("\n✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,34 @@
+import os
+import sys
+
+# Ensure imports work: allow `from seeder.seed_files import load_seed_files`
+HERE = os.path.dirname(os.path.abspath(__file__))  # .../server/seeder
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+from seeder.config import strip_prisma_schema_query
+from seeder.db import connect
+from seeder.seed_files import load_seed_files
+
+
+def main():
+    # Usage: python load_seed_files.py /path/written/by/SEED_OUTPUT
+    if len(sys.argv) != 2:
+        raise SystemExit("Usage: python load_seed_files.py <seed files dir>")
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise SystemExit("DATABASE_URL is not set (needed for load_seed_files.py).")
+
+    conn = connect(strip_prisma_schema_query(db_url))
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                load_seed_files(cur, sys.argv[1])
+        print("✅ Seed files loaded.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,13 +12,24 @@ Parse schema.prisma and output JSON:
           "type": "Int",
           "optional": false,
           "list": false,
-          "db_column": null             # if @map exists, else null
+          "db_column": null,            # if @map exists, else null
+          "db_type": null,              # native type from @db.X, e.g. "Date", "VarChar(255)"
+          "relation_fields": null,      # @relation(fields: [...]) on relation fields
+          "relation_references": null   # @relation(references: [...])
         },
         ...
       ]
     },
     ...
   ],
+  "enums": [
+    {
+      "enum": "PaymentStatus",
+      "db_type": null,                  # if @@map exists, else null
+      "values": ["DUE", "PAID", ...]    # database labels (@map applied)
+    },
+    ...
+  ],
   "meta": {
     "schema_path": "...",
     "generated_at_utc": "..."
@@ -50,6 +61,9 @@ class FieldInfo:
     optional: bool
     list: bool
     db_column: Optional[str] = None
+    db_type: Optional[str] = None
+    relation_fields: Optional[List[str]] = None
+    relation_references: Optional[List[str]] = None
 
 
 @dataclass
@@ -59,6 +73,13 @@ class ModelInfo:
     fields: List[FieldInfo]
 
 
+@dataclass
+class EnumInfo:
+    enum: str
+    db_type: Optional[str]
+    values: List[str]
+
+
 # ---------- prisma parsing ----------
 
 MODEL_START_RE = re.compile(r"^\s*model\s+([A-Za-z_]\w*)\s*\{\s*$")
@@ -74,6 +95,16 @@ MODEL_MAP_RE = re.compile(r'@@map\(\s*"([^"]+)"\s*\)')
 # @map("column_name")
 FIELD_MAP_RE = re.compile(r'@map\(\s*"([^"]+)"\s*\)')
 
+# @db.Date, @db.VarChar(255), @db.Timestamptz(3)
+FIELD_DB_TYPE_RE = re.compile(r"@db\.(\w+(?:\([^)]*\))?)")
+
+# @relation(fields: [a, b], references: [c, d])
+RELATION_FIELDS_RE = re.compile(r"fields:\s*\[([^\]]*)\]")
+RELATION_REFS_RE = re.compile(r"references:\s*\[([^\]]*)\]")
+
+# Enum value line: <VALUE> [@map("db_value")]
+ENUM_VALUE_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*(.*)$")
+
 
 def _strip_inline_comment(line: str) -> str:
     # Prisma uses // for comments. This removes anything after //.
@@ -83,10 +114,15 @@ def _strip_inline_comment(line: str) -> str:
     return line.rstrip()
 
 
-def parse_schema_prisma(schema_text: str) -> list[ModelInfo]:
+def _split_list(text: str) -> list[str]:
+    return [p.strip() for p in text.split(",") if p.strip()]
+
+
+def parse_schema_prisma(schema_text: str) -> tuple[list[ModelInfo], list[EnumInfo]]:
     lines = schema_text.splitlines()
 
     models: list[ModelInfo] = []
+    enums: list[EnumInfo] = []
     model_names: set[str] = set()
 
     i = 0
@@ -96,6 +132,37 @@ def parse_schema_prisma(schema_text: str) -> list[ModelInfo]:
         if not raw:
             continue
 
+        em = ENUM_START_RE.match(raw)
+        if em:
+            enum_name = em.group(1)
+            enum_db_type: Optional[str] = None
+            values: list[str] = []
+
+            # parse enum block until closing }
+            while i < len(lines):
+                line_raw = _strip_inline_comment(lines[i]).strip()
+                i += 1
+
+                if not line_raw:
+                    continue
+                if BLOCK_END_RE.match(line_raw):
+                    break
+
+                if line_raw.startswith("@@"):
+                    mm = MODEL_MAP_RE.search(line_raw)
+                    if mm:
+                        enum_db_type = mm.group(1)
+                    continue
+
+                vm = ENUM_VALUE_RE.match(line_raw)
+                if not vm:
+                    continue
+                vmm = FIELD_MAP_RE.search(vm.group(2) or "")
+                values.append(vmm.group(1) if vmm else vm.group(1))
+
+            enums.append(EnumInfo(enum=enum_name, db_type=enum_db_type, values=values))
+            continue
+
         m = MODEL_START_RE.match(raw)
         if not m:
             continue
@@ -155,6 +222,20 @@ def parse_schema_prisma(schema_text: str) -> list[ModelInfo]:
             if fmm:
                 db_col = fmm.group(1)
 
+            db_type = None
+            fdm = FIELD_DB_TYPE_RE.search(attrs)
+            if fdm:
+                db_type = fdm.group(1)
+
+            rel_fields = None
+            rel_refs = None
+            if "@relation" in attrs:
+                rfm = RELATION_FIELDS_RE.search(attrs)
+                rrm = RELATION_REFS_RE.search(attrs)
+                if rfm and rrm:
+                    rel_fields = _split_list(rfm.group(1))
+                    rel_refs = _split_list(rrm.group(1))
+
             fields.append(
                 FieldInfo(
                     name=field_name,
@@ -162,6 +243,9 @@ def parse_schema_prisma(schema_text: str) -> list[ModelInfo]:
                     optional=optional,
                     list=is_list,
                     db_column=db_col,
+                    db_type=db_type,
+                    relation_fields=rel_fields,
+                    relation_references=rel_refs,
                 )
             )
 
@@ -170,12 +254,12 @@ def parse_schema_prisma(schema_text: str) -> list[ModelInfo]:
     # Optional: if you want, you can tag relations by comparing types to model names.
     # (Not requested explicitly, but useful; kept out to keep JSON simple.)
 
-    return models
+    return models, enums
 
 
 # ---------- output ----------
 
-def write_schema_json(models: list[ModelInfo], schema_path: Path, out_json: Path) -> None:
+def write_schema_json(models: list[ModelInfo], enums: list[EnumInfo], schema_path: Path, out_json: Path) -> None:
     payload = {
         "models": [
             {
@@ -185,6 +269,7 @@ def write_schema_json(models: list[ModelInfo], schema_path: Path, out_json: Path
             }
             for m in models
         ],
+        "enums": [asdict(e) for e in enums],
         "meta": {
             "schema_path": str(schema_path),
             "generated_at_utc": datetime.now(timezone.utc).isoformat(),
@@ -203,11 +288,12 @@ def main() -> int:
         raise SystemExit(f"schema.prisma not found at: {schema_path}")
 
     schema_text = schema_path.read_text(encoding="utf-8")
-    models = parse_schema_prisma(schema_text)
-    write_schema_json(models, schema_path, out_json)
+    models, enums = parse_schema_prisma(schema_text)
+    write_schema_json(models, enums, schema_path, out_json)
 
     print(f"✅ Wrote schema JSON: {out_json}")
     print(f"   Models: {len(models)}")
+    print(f"   Enums: {len(enums)}")
     return 0
 
 
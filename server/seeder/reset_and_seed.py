@@ -11,7 +11,8 @@ if HERE not in sys.path:
     sys.path.insert(0, HERE)
 
 from seeder.db import connect
-from seeder.seeders import run_seed
+from seeder.db_templates import restore_from_template, save_template, seed_templates_enabled
+from seeder.seeders import SNAPSHOT_OUTPUT_DIR, run_seed
 
 
 def truncate_all_tables(conn):
@@ -47,6 +48,12 @@ def main():
     if not db_url:
         raise SystemExit("DATABASE_URL is not set (needed for reset_and_seed.py).")
 
+    # SEED_TEMPLATE=1: recreate the database from a template of the same seed config
+    templates = seed_templates_enabled()
+    if templates and restore_from_template(db_url, SNAPSHOT_OUTPUT_DIR):
+        print("✅ Reset from template complete.")
+        return
+
     conn = connect(db_url)
     try:
         with conn:
@@ -60,6 +67,9 @@ def main():
     finally:
         conn.close()
 
+    if templates:
+        save_template(db_url, SNAPSHOT_OUTPUT_DIR)
+
 
 if __name__ == "__main__":
     main()
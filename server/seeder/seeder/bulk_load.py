@@ -0,0 +1,156 @@
+# server/seeder/seeder/bulk_load.py
+"""
+SEED_BULK_LOAD=1: load without index maintenance.
+
+Before the seed, the non-unique indexes and foreign keys on the bulk tables
+(Subscription, Payment) are dropped, with their definitions kept. After the
+load they are recreated from those definitions, so each index is built once
+by a sort instead of being updated row by row, and each FK is checked by one
+join instead of a lookup per row. Then the tables are ANALYZEd.
+
+Unique indexes and primary keys stay: they enforce data rules, and
+insert_due_payments() needs the (subscription, dueDate) unique index for
+ON CONFLICT.
+
+In the single-process seed everything is one transaction, so a failure rolls
+the drops back. With SEED_WORKERS the drops are committed before the pool
+starts; run_seed() then calls rebuild_deferred() again after a failure.
+
+SEED_UNLOGGED=1 additionally switches Customer/Subscription/Payment to
+UNLOGGED for the load, so their rows skip the WAL, and back to LOGGED at the
+end (before the index rebuild, so indexes are built once, on the final
+table). SEED_UNLOGGED=keep leaves them unlogged: only for throwaway databases,
+since Postgres empties unlogged tables after a crash and does not replicate
+them.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+
+from .log import get_logger
+
+log = get_logger(__name__)
+
+# Session settings for the rebuild: more sort memory, and parallel workers per index build.
+BULK_MAINTENANCE_WORK_MEM = os.environ.get("SEED_BULK_MAINTENANCE_WORK_MEM", "512MB").strip() or "512MB"
+BULK_PARALLEL_WORKERS = int(os.environ.get("SEED_BULK_PARALLEL_WORKERS", str(min(os.cpu_count() or 1, 8))))
+
+
+@dataclass
+class DeferredIndexes:
+    tables: list[str]
+    # (name, CREATE INDEX statement)
+    indexes: list[tuple[str, str]] = field(default_factory=list)
+    # (table, name, constraint definition)
+    foreign_keys: list[tuple[str, str, str]] = field(default_factory=list)
+
+
+def defer_indexes(cur, tables: list[str]) -> DeferredIndexes:
+    """Drops the non-unique indexes and FKs on tables and returns how to recreate them."""
+    deferred = DeferredIndexes(tables=list(tables))
+
+    cur.execute(
+        """
+        SELECT ic.relname, pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        JOIN pg_class ic ON ic.oid = i.indexrelid
+        JOIN pg_class t ON t.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = 'public'
+          AND t.relname = ANY(%s)
+          AND NOT i.indisunique
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+        ORDER BY t.relname, ic.relname
+        """,
+        (list(tables),),
+    )
+    deferred.indexes = [(name, ddl) for name, ddl in cur.fetchall()]
+
+    cur.execute(
+        """
+        SELECT t.relname, c.conname, pg_get_constraintdef(c.oid)
+        FROM pg_constraint c
+        JOIN pg_class t ON t.oid = c.conrelid
+        JOIN pg_namespace n ON n.oid = t.relnamespace
+        WHERE n.nspname = 'public'
+          AND c.contype = 'f'
+          AND t.relname = ANY(%s)
+        ORDER BY t.relname, c.conname
+        """,
+        (list(tables),),
+    )
+    deferred.foreign_keys = [(table, name, ddl) for table, name, ddl in cur.fetchall()]
+
+    for table, name, _ in deferred.foreign_keys:
+        cur.execute(f'ALTER TABLE "{table}" DROP CONSTRAINT "{name}"')
+    for name, _ in deferred.indexes:
+        cur.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+    log.info(
+        "⚙️  Bulk load: deferred %d index(es) and %d foreign key(s) on %s.",
+        len(deferred.indexes),
+        len(deferred.foreign_keys),
+        ", ".join(tables),
+    )
+    return deferred
+
+
+def _if_not_exists(ddl: str) -> str:
+    # pg_get_indexdef gives "CREATE INDEX name ON ..."; the seeder may already have recreated some
+    # (e.g. ensure_due_day_index during payment generation)
+    return ddl.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS ", 1)
+
+
+def rebuild_deferred(cur, deferred: DeferredIndexes) -> None:
+    """Recreates what defer_indexes() dropped (skipping anything already back), then ANALYZEs."""
+    cur.execute("SET LOCAL maintenance_work_mem = %s", (BULK_MAINTENANCE_WORK_MEM,))
+    cur.execute("SET LOCAL max_parallel_maintenance_workers = %s", (BULK_PARALLEL_WORKERS,))
+
+    for _, ddl in deferred.indexes:
+        cur.execute(_if_not_exists(ddl))
+
+    for table, name, ddl in deferred.foreign_keys:
+        cur.execute("SELECT 1 FROM pg_constraint WHERE conname = %s AND conrelid = %s::regclass", (name, f'"{table}"'))
+        if cur.fetchone() is None:
+            cur.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {ddl}')
+
+    for table in deferred.tables:
+        cur.execute(f'ANALYZE "{table}"')
+
+    log.info(
+        "✅ Bulk load: rebuilt %d index(es) and %d foreign key(s), analyzed %s.",
+        len(deferred.indexes),
+        len(deferred.foreign_keys),
+        ", ".join(deferred.tables),
+    )
+
+
+def parse_seed_unlogged(value: str | None) -> str | None:
+    """SEED_UNLOGGED value -> None, "load" (SET LOGGED after the seed) or "keep"."""
+    value = (value or "").strip()
+    if value in ("", "0", "false", "False"):
+        return None
+    if value in ("1", "true", "True"):
+        return "load"
+    if value == "keep":
+        return "keep"
+    raise SystemExit(f"Invalid SEED_UNLOGGED='{value}'. Use 0, 1 or keep.")
+
+
+def set_unlogged(cur, tables: list[str]) -> None:
+    """
+    tables in FK order (referenced first, e.g. Customer, Subscription, Payment).
+    A permanent table may not reference an unlogged one, so referencing tables
+    go unlogged first, and come back last in set_logged().
+    """
+    for table in reversed(tables):
+        cur.execute(f'ALTER TABLE "{table}" SET UNLOGGED')
+    log.info("⚙️  Unlogged load: %s set UNLOGGED.", ", ".join(tables))
+
+
+def set_logged(cur, tables: list[str]) -> None:
+    for table in tables:
+        cur.execute(f'ALTER TABLE "{table}" SET LOGGED')
+    log.info("✅ Unlogged load: %s set LOGGED again.", ", ".join(tables))
@@ -5,6 +5,9 @@ from dataclasses import dataclass
 from urllib.parse import urlparse, urlunparse
 from typing import Optional, Literal
 
+from .bulk_load import parse_seed_unlogged
+from .seed_files import parse_seed_output
+
 
 def strip_prisma_schema_query(url: str) -> str:
     # psycopg2 doesn't accept Prisma's ?schema=public
@@ -41,11 +44,19 @@ class SeedConfig:
     seed_random_seed: Optional[int]  # optional (None => true randomness)
     seed_skip_if_exists: bool
     seed_distribution: DistributionName  # ✅ new
+    seed_workers: Optional[int] = None  # None => single-process seeding
+    seed_dry_run: bool = False  # generate from the schema JSON only, no database
+    seed_output: Optional[str] = None  # SEED_OUTPUT=files:/path -> directory for seed files
+    seed_bulk_load: bool = False  # drop non-unique indexes/FKs during the load, rebuild after
+    seed_unlogged: Optional[str] = None  # SEED_UNLOGGED: "load" (SET LOGGED at the end) or "keep"
 
 
 def load_config() -> SeedConfig:
-    db_url = os.environ.get("DATABASE_URL")
-    if not db_url:
+    seed_dry_run = os.environ.get("SEED_DRY_RUN", "0").strip() in ("1", "true", "True")
+    seed_output = parse_seed_output(os.environ.get("SEED_OUTPUT"))
+
+    db_url = os.environ.get("DATABASE_URL", "")
+    if not db_url and not (seed_dry_run or seed_output):
         raise SystemExit("Missing DATABASE_URL env var.")
     db_url = strip_prisma_schema_query(db_url)
 
@@ -65,4 +76,9 @@ def load_config() -> SeedConfig:
         seed_random_seed=_parse_optional_int(os.environ.get("SEED_RANDOM_SEED")),
         seed_skip_if_exists=seed_skip_if_exists,
         seed_distribution=dist,  # type: ignore[arg-type]
+        seed_workers=_parse_optional_int(os.environ.get("SEED_WORKERS")),
+        seed_dry_run=seed_dry_run,
+        seed_output=seed_output,
+        seed_bulk_load=os.environ.get("SEED_BULK_LOAD", "0").strip() in ("1", "true", "True"),
+        seed_unlogged=parse_seed_unlogged(os.environ.get("SEED_UNLOGGED")),
     )
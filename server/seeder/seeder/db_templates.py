@@ -0,0 +1,201 @@
+# server/seeder/seeder/db_templates.py
+"""
+SEED_TEMPLATE=1: reset_and_seed.py via template databases.
+
+After a seed the database is cloned into "<db>__seed_<hash>" (CREATE DATABASE
+... TEMPLATE), where <hash> is the fixture key of the seed config (see
+fixture_cache.fixture_key). The next reset with the same config drops the
+database and recreates it from that template, which copies files instead of
+replaying inserts. Payments then catch up from the template's high-water mark.
+
+Needs CREATEDB and a deterministic seed (SEED_RANDOM_SEED). Both the clone and
+the drop kick other sessions off the database (the API reconnects). On any
+failure reset_and_seed.py falls back to truncate_all_tables + run_seed.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, make_dsn
+
+from .config import load_config, strip_prisma_schema_query
+from .db import connect
+from .log import get_logger
+from .fixture_cache import fixture_key, restore_snapshot_images, save_snapshot_images
+from .seeders import SEED_CHUNK_SIZE, detect_schema, run_payments_after_seed
+
+log = get_logger(__name__)
+
+MAINTENANCE_DB = os.environ.get("SEED_TEMPLATE_MAINTENANCE_DB", "postgres").strip() or "postgres"
+
+# Templates kept per database; older ones are dropped when a new one is made.
+TEMPLATE_KEEP = int(os.environ.get("SEED_TEMPLATE_KEEP", "3"))
+
+TEMPLATE_SNAPSHOTS_DIR = Path(os.getenv("DATA_DIR", "/app/data")) / "seed-templates"
+
+
+def seed_templates_enabled() -> bool:
+    return os.environ.get("SEED_TEMPLATE", "0").strip() in ("1", "true", "True")
+
+
+def _template_prefix(dbname: str) -> str:
+    return f"{dbname}__seed_"
+
+
+def template_name(dbname: str, key: str) -> str:
+    # Postgres identifiers are capped at 63 bytes
+    return (_template_prefix(dbname) + key)[:63]
+
+
+def _maintenance_conn(db_url: str):
+    conn = psycopg2.connect(make_dsn(strip_prisma_schema_query(db_url), dbname=MAINTENANCE_DB))
+    conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+    return conn
+
+
+def _database_exists(cur, name: str) -> bool:
+    cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (name,))
+    return cur.fetchone() is not None
+
+
+def _terminate_sessions(cur, dbname: str) -> None:
+    cur.execute(
+        "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE datname = %s AND pid <> pg_backend_pid()",
+        (dbname,),
+    )
+
+
+def _template_key(db_url: str) -> tuple[str, str] | None:
+    """(database name, fixture key) of the current seed config, or None if not deterministic."""
+    cfg = load_config()
+    if cfg.seed_random_seed is None:
+        log.info("ℹ️ SEED_TEMPLATE needs SEED_RANDOM_SEED; using a plain reset.")
+        return None
+
+    conn = connect(db_url)
+    try:
+        with conn.cursor() as cur:
+            key = fixture_key(
+                cur,
+                cfg,
+                dist_name=cfg.seed_distribution,
+                postal_dist_name=os.environ.get("SEED_POSTAL_DISTRIBUTION", "mixed_realistic").strip(),
+                chunk_size=SEED_CHUNK_SIZE,
+            )
+            return conn.info.dbname, key
+    finally:
+        conn.close()
+
+
+def restore_from_template(db_url: str, snapshot_dir: Path) -> bool:
+    """
+    Recreates the database from the template for the current seed config.
+    Returns False (database untouched) when there is no such template, and
+    raises SystemExit if the database was dropped but the copy could not
+    take its name.
+    """
+    found = _template_key(db_url)
+    if not found:
+        return False
+    dbname, key = found
+    tpl = template_name(dbname, key)
+    staging = f"{dbname}__restoring"[:63]
+
+    conn = _maintenance_conn(db_url)
+    try:
+        with conn.cursor() as cur:
+            if not _database_exists(cur, tpl):
+                log.info("ℹ️ No seed template %s yet; reseeding.", tpl)
+                return False
+
+            # clone first, so a failed clone leaves the database as it was
+            cur.execute(sql.SQL("DROP DATABASE IF EXISTS {}").format(sql.Identifier(staging)))
+            cur.execute(sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(sql.Identifier(staging), sql.Identifier(tpl)))
+
+            # FORCE (PG13+) ends the sessions in the same statement, so a reconnect cannot slip in between
+            cur.execute(sql.SQL("DROP DATABASE {} WITH (FORCE)").format(sql.Identifier(dbname)))
+            try:
+                cur.execute(
+                    sql.SQL("ALTER DATABASE {} RENAME TO {}").format(sql.Identifier(staging), sql.Identifier(dbname))
+                )
+            except psycopg2.Error as e:
+                # past the drop there is no database left to fall back to (or truncate)
+                raise SystemExit(
+                    f"Dropped {dbname} but could not rename the restored copy {staging} to it: {str(e).strip()}\n"
+                    f"Rename it by hand: ALTER DATABASE \"{staging}\" RENAME TO \"{dbname}\";"
+                ) from e
+    except psycopg2.Error as e:
+        log.warning("⚠️ Could not restore from seed template %s: %s", tpl, str(e).strip())
+        return False
+    finally:
+        conn.close()
+
+    restore_snapshot_images(TEMPLATE_SNAPSHOTS_DIR / tpl, snapshot_dir)
+    log.info("✅ Recreated %s from template %s.", dbname, tpl)
+
+    # the template's payments stop at the day it was made; catch up from its high-water mark
+    conn = connect(db_url)
+    try:
+        with conn:
+            with conn.cursor() as cur:
+                run_payments_after_seed(cur, detect_schema(cur))
+    finally:
+        conn.close()
+    return True
+
+
+def save_template(db_url: str, snapshot_dir: Path) -> str | None:
+    """Clones the freshly seeded database into the template for its config. Returns its name."""
+    found = _template_key(db_url)
+    if not found:
+        return None
+    dbname, key = found
+    tpl = template_name(dbname, key)
+
+    conn = _maintenance_conn(db_url)
+    try:
+        with conn.cursor() as cur:
+            if _database_exists(cur, tpl):
+                _drop_template(cur, tpl)
+
+            # CREATE DATABASE ... TEMPLATE needs the source to have no other sessions
+            _terminate_sessions(cur, dbname)
+            cur.execute(sql.SQL("CREATE DATABASE {} TEMPLATE {}").format(sql.Identifier(tpl), sql.Identifier(dbname)))
+            cur.execute(
+                sql.SQL("ALTER DATABASE {} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false").format(sql.Identifier(tpl))
+            )
+            _drop_old_templates(cur, dbname, keep=tpl)
+    except psycopg2.Error as e:
+        log.warning("⚠️ Could not create seed template %s: %s", tpl, str(e).strip())
+        return None
+    finally:
+        conn.close()
+
+    save_snapshot_images(snapshot_dir, TEMPLATE_SNAPSHOTS_DIR / tpl)
+    log.info("✅ Saved seed template %s.", tpl)
+    return tpl
+
+
+def _drop_template(cur, tpl: str) -> None:
+    cur.execute(sql.SQL("ALTER DATABASE {} WITH IS_TEMPLATE false").format(sql.Identifier(tpl)))
+    cur.execute(sql.SQL("DROP DATABASE {}").format(sql.Identifier(tpl)))
+
+
+def _drop_old_templates(cur, dbname: str, keep: str) -> None:
+    cur.execute(
+        """
+        SELECT datname FROM pg_database
+        WHERE datistemplate AND left(datname, length(%s)) = %s AND datname <> %s
+        ORDER BY oid DESC
+        """,
+        (_template_prefix(dbname), _template_prefix(dbname), keep),
+    )
+    old = [r[0] for r in cur.fetchall()][max(TEMPLATE_KEEP - 1, 0):]
+    for tpl in old:
+        _drop_template(cur, tpl)
+    if old:
+        log.info("🧹 Dropped %d old seed template(s).", len(old))
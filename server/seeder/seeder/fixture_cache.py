@@ -0,0 +1,206 @@
+# server/seeder/seeder/fixture_cache.py
+"""
+Seed fixture cache: a seeded dataset saved to disk under a hash of everything
+that determines it, and restored with COPY on the next run with the same hash.
+
+Key = SeedConfig fields that shape the data + postal distribution +
+SEED_CHUNK_SIZE + schema fingerprint + a hash of the generator sources (so a
+code change that alters what a seed produces misses the cache). Only used when SEED_RANDOM_SEED is set
+(otherwise no two runs produce the same data) and the Package, Customer and
+Subscription tables are empty.
+
+A fixture holds Package/Customer/Subscription as gzip CSV (seed_files layout)
+plus the snapshot images. Payments and analytics definitions are not cached,
+because they depend on today's date or are seeded separately. Dates in the
+data are relative to the day the fixture was made.
+
+Fixtures are evicted least-recently-used once the cache exceeds
+SEED_FIXTURE_CACHE_MAX_MB.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+from .log import get_logger
+from .schema import get_catalog, pick_col
+from .seed_files import MANIFEST_NAME, dump_tables, load_seed_files
+
+log = get_logger(__name__)
+
+# SEED_FIXTURE_CACHE=0 disables the cache.
+FIXTURE_CACHE_DIR = os.environ.get("SEED_FIXTURE_CACHE", "").strip() or str(
+    Path(os.getenv("DATA_DIR", "/app/data")) / "seed-fixtures"
+)
+FIXTURE_CACHE_MAX_BYTES = int(os.environ.get("SEED_FIXTURE_CACHE_MAX_MB", "2048")) * 1024 * 1024
+
+SNAPSHOTS_SUBDIR = "snapshots"
+
+# modules whose code decides the rows (and snapshot images) a given seed produces
+GENERATOR_MODULES = (
+    "seeders.py",
+    "random_data.py",
+    "subscription_distributions.py",
+    "parallel.py",
+    "payments_due.py",
+    "snapshot_aggregate.py",
+    "snapshot_render.py",
+    "snapshot_series.py",
+)
+
+
+def fixture_cache_enabled() -> bool:
+    return FIXTURE_CACHE_DIR not in ("0", "false", "False")
+
+
+def schema_fingerprint(cur) -> str:
+    """Hash of the public tables, column types and enum labels."""
+    catalog = get_catalog(cur)
+    payload = json.dumps({"tables": catalog.tables, "enums": catalog.enums}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def generator_fingerprint() -> str:
+    h = hashlib.sha256()
+    for name in GENERATOR_MODULES:
+        h.update(name.encode("utf-8"))
+        h.update(Path(__file__).with_name(name).read_bytes())
+    return h.hexdigest()
+
+
+def fixture_key(cur, cfg, *, dist_name: str, postal_dist_name: str, chunk_size: int) -> str:
+    payload = {
+        "seed_customers": cfg.seed_customers,
+        "seed_packages": cfg.seed_packages,
+        "seed_subscriptions": cfg.seed_subscriptions,
+        "seed_random_seed": cfg.seed_random_seed,
+        "distribution": dist_name,
+        "postal_distribution": postal_dist_name,
+        "chunk_size": chunk_size,
+        # parallel shards use derived sub-seeds: same data for any N, but not the serial data
+        "parallel": bool(cfg.seed_workers),
+        "schema": schema_fingerprint(cur),
+        "generator": generator_fingerprint(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+def _tables_empty(cur, tables: list[str]) -> bool:
+    exists = " OR ".join(f'EXISTS (SELECT 1 FROM "{t}")' for t in tables)
+    cur.execute(f"SELECT {exists}")
+    return not cur.fetchone()[0]
+
+
+def usable_fixture_key(cur, cfg, schema, *, dist_name: str, postal_dist_name: str, chunk_size: int) -> str | None:
+    """The run's fixture key, or None when the cache can't be used for it."""
+    if not fixture_cache_enabled() or cfg.seed_random_seed is None:
+        return None
+    if not _tables_empty(cur, [schema.PACKAGE_T, schema.CUSTOMER_T, schema.SUB_T]):
+        log.info("ℹ️ Fixture cache skipped: seed tables are not empty.")
+        return None
+    return fixture_key(cur, cfg, dist_name=dist_name, postal_dist_name=postal_dist_name, chunk_size=chunk_size)
+
+
+def save_snapshot_images(snapshot_dir: Path, dest: Path) -> None:
+    """Copies the current snapshot_* files next to a cached dataset."""
+    if not snapshot_dir.is_dir():
+        return
+    dest.mkdir(parents=True, exist_ok=True)
+    for f in snapshot_dir.glob("snapshot_*"):
+        shutil.copy2(f, dest / f.name)
+
+
+def restore_snapshot_images(src: Path, snapshot_dir: Path) -> None:
+    if not src.is_dir():
+        return
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    for f in src.iterdir():
+        shutil.copy2(f, snapshot_dir / f.name)
+
+
+def _fixture_dir(key: str) -> Path:
+    return Path(FIXTURE_CACHE_DIR) / key
+
+
+def restore_fixture(cur, key: str, snapshot_dir: Path) -> bool:
+    """Loads the fixture for key into the (empty) tables. Returns False on a miss."""
+    fixture_dir = _fixture_dir(key)
+    manifest = fixture_dir / MANIFEST_NAME
+    if not manifest.exists():
+        return False
+
+    load_seed_files(cur, fixture_dir, quiet=True)
+    restore_snapshot_images(fixture_dir / SNAPSHOTS_SUBDIR, snapshot_dir)
+
+    # LRU: the manifest's mtime is the last use
+    os.utime(manifest, None)
+    log.info("✅ Restored seed fixture %s from %s.", key, FIXTURE_CACHE_DIR)
+    return True
+
+
+def save_fixture(cur, key: str, schema, snapshot_dir: Path) -> None:
+    """Dumps the freshly seeded tables (and snapshots) as the fixture for key."""
+    root = Path(FIXTURE_CACHE_DIR)
+    fixture_dir = _fixture_dir(key)
+    tmp_dir = root / f".{key}.{os.getpid()}.tmp"
+
+    tables = [
+        (schema.PACKAGE_T, schema.pkg_cols, ["id", "packageId", "packageID"]),
+        (schema.CUSTOMER_T, schema.cust_cols, ["id", "customerId", "customerID"]),
+        (schema.SUB_T, schema.sub_cols, ["id", "subscriptionId", "subscriptionID"]),
+    ]
+    try:
+        dump_tables(
+            cur,
+            tmp_dir,
+            [(t, sorted(cols), pick_col(cols, pk_candidates)) for t, cols, pk_candidates in tables],
+            meta={"fixture_key": key},
+        )
+        save_snapshot_images(snapshot_dir, tmp_dir / SNAPSHOTS_SUBDIR)
+
+        if fixture_dir.exists():
+            shutil.rmtree(fixture_dir)
+        tmp_dir.rename(fixture_dir)
+    except OSError as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        log.warning("⚠️ Could not save seed fixture %s: %s", key, e)
+        return
+
+    log.info("✅ Saved seed fixture %s (%.1f MB).", key, _dir_size(fixture_dir) / 1e6)
+    evict_fixtures(keep=key)
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def evict_fixtures(keep: str | None = None, max_bytes: int = FIXTURE_CACHE_MAX_BYTES) -> list[str]:
+    """Deletes least-recently-used fixtures until the cache fits max_bytes. Returns evicted keys."""
+    root = Path(FIXTURE_CACHE_DIR)
+    if not root.is_dir():
+        return []
+
+    entries = []
+    for d in root.iterdir():
+        manifest = d / MANIFEST_NAME
+        if d.is_dir() and manifest.exists():
+            entries.append((manifest.stat().st_mtime, d.name, _dir_size(d)))
+
+    total = sum(size for _, _, size in entries)
+    evicted = []
+    for _, name, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if name == keep:
+            continue
+        shutil.rmtree(root / name, ignore_errors=True)
+        total -= size
+        evicted.append(name)
+
+    if evicted:
+        log.info("🧹 Evicted %d seed fixture(s) to stay under %d MB.", len(evicted), max_bytes // (1024 * 1024))
+    return evicted
@@ -0,0 +1,47 @@
+# server/seeder/seeder/log.py
+"""
+Seeder logging. SEED_LOG_LEVEL (DEBUG, INFO, WARNING, ERROR; default INFO)
+sets the level of the "seeder" logger. Records go to stdout as bare messages,
+so they read like the status lines printed around them.
+
+Log with lazy %-style arguments (log.debug("x=%s", x)) so nothing is formatted
+below the level, and put anything that costs a pass over the data behind
+log.isEnabledFor(logging.DEBUG).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+
+LOG_LEVEL = os.environ.get("SEED_LOG_LEVEL", "INFO").strip().upper() or "INFO"
+
+_ROOT = "seeder"
+_configured = False
+
+
+def _configure() -> None:
+    global _configured
+    if _configured:
+        return
+
+    level = logging.getLevelName(LOG_LEVEL)
+    if not isinstance(level, int):
+        raise SystemExit(f"Invalid SEED_LOG_LEVEL='{LOG_LEVEL}'. Allowed: DEBUG, INFO, WARNING, ERROR")
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    root = logging.getLogger(_ROOT)
+    root.addHandler(handler)
+    root.setLevel(level)
+    root.propagate = False
+    _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under "seeder" (pass __name__)."""
+    _configure()
+    if name != _ROOT and not name.startswith(_ROOT + "."):
+        name = f"{_ROOT}.{name}"
+    return logging.getLogger(name)
@@ -0,0 +1,144 @@
+# server/seeder/seeder/metrics.py
+"""
+Per-phase seeder metrics: wall time, rows/sec, peak RSS and DB round trips.
+
+run_seed() wraps each phase in SeedMetrics.phase(); store_rows() reports the
+time spent inserting, so a phase shows generation vs insert. The report is
+written as JSON to SEED_METRICS_FILE (default DATA_DIR/seed_metrics.json) and,
+when SEED_METRICS_PROM is set, as Prometheus text to that path (for the
+node_exporter textfile collector or a CI artifact).
+
+Round trips are counted by db.CountingCursor in this process only: with
+SEED_WORKERS, the workers' inserts are not included.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .db import db_round_trips
+from .log import get_logger
+
+log = get_logger(__name__)
+
+METRICS_FILE = os.environ.get("SEED_METRICS_FILE", "").strip() or str(
+    Path(os.getenv("DATA_DIR", "/app/data")) / "seed_metrics.json"
+)
+METRICS_PROM_FILE = os.environ.get("SEED_METRICS_PROM", "").strip() or None
+
+
+def peak_rss_bytes() -> int:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+@dataclass
+class PhaseMetrics:
+    phase: str
+    seconds: float = 0.0
+    rows: int | None = None
+    rows_per_sec: float | None = None
+    insert_seconds: float = 0.0
+    peak_rss_bytes: int = 0
+    db_round_trips: int = 0
+
+
+class SeedMetrics:
+    def __init__(self):
+        self.phases: list[PhaseMetrics] = []
+        self._active: list[PhaseMetrics] = []
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str, rows: int | None = None):
+        """Times the block as phase name. Set .rows on the yielded PhaseMetrics if not known up front."""
+        m = PhaseMetrics(phase=name, rows=rows)
+        round_trips = db_round_trips()
+        start = time.perf_counter()
+        self._active.append(m)
+        try:
+            yield m
+        finally:
+            self._active.pop()
+            m.seconds = time.perf_counter() - start
+            m.db_round_trips = db_round_trips() - round_trips
+            m.peak_rss_bytes = peak_rss_bytes()
+            if m.rows is not None and m.seconds > 0:
+                m.rows_per_sec = m.rows / m.seconds
+            self.phases.append(m)
+
+    def add_insert_time(self, seconds: float) -> None:
+        if self._active:
+            self._active[-1].insert_seconds += seconds
+
+    def report(self) -> dict:
+        return {
+            "generated_at_utc": datetime.now(timezone.utc).isoformat(),
+            "total_seconds": time.perf_counter() - self._started,
+            "peak_rss_bytes": peak_rss_bytes(),
+            "db_round_trips": db_round_trips(),
+            "phases": [asdict(p) for p in self.phases],
+        }
+
+    def write(self, meta: dict | None = None) -> None:
+        report = self.report()
+        report["meta"] = meta or {}
+
+        path = Path(METRICS_FILE)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+            if METRICS_PROM_FILE:
+                Path(METRICS_PROM_FILE).write_text(prometheus_text(report), encoding="utf-8")
+        except OSError as e:
+            log.warning("⚠️ Could not write seed metrics: %s", e)
+            return
+
+        log.info("✅ Seed metrics written to %s (%.1fs total).", path, report["total_seconds"])
+
+
+def prometheus_text(report: dict) -> str:
+    """The report in Prometheus text exposition format."""
+    gauges = [
+        ("seeder_phase_duration_seconds", "Wall time of the seed phase.", "seconds"),
+        ("seeder_phase_insert_seconds", "Time of the seed phase spent inserting rows.", "insert_seconds"),
+        ("seeder_phase_rows", "Rows produced by the seed phase.", "rows"),
+        ("seeder_phase_rows_per_second", "Throughput of the seed phase.", "rows_per_sec"),
+        ("seeder_phase_peak_rss_bytes", "Peak RSS of the seeder at the end of the phase.", "peak_rss_bytes"),
+        ("seeder_phase_db_round_trips", "Database round trips made during the phase.", "db_round_trips"),
+    ]
+    lines = []
+    for name, help_text, key in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for p in report["phases"]:
+            if p[key] is not None:
+                lines.append(f'{name}{{phase="{p["phase"]}"}} {p[key]}')
+
+    lines.append("# HELP seeder_duration_seconds Wall time of the whole seed.")
+    lines.append("# TYPE seeder_duration_seconds gauge")
+    lines.append(f"seeder_duration_seconds {report['total_seconds']}")
+    return "\n".join(lines) + "\n"
+
+
+# The run_seed() in progress, for store_rows() to report insert time to.
+_CURRENT: SeedMetrics | None = None
+
+
+def start_metrics() -> SeedMetrics:
+    global _CURRENT
+    _CURRENT = SeedMetrics()
+    return _CURRENT
+
+
+def current_metrics() -> SeedMetrics | None:
+    return _CURRENT
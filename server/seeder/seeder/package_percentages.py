@@ -2,6 +2,10 @@ import json
 import os
 from pathlib import Path
 
+from .log import get_logger
+
+log = get_logger(__name__)
+
 # ✅ Option 2: fixed map for demo names
 PACKAGE_NAME_BY_ID = {
     1: "Starter",
@@ -88,5 +92,5 @@ def generate_package_percentage_json(cur, output_file=None, top_n: int = 4):
         encoding="utf-8",
     )
 
-    print(f"Top {top_n} package percentage data has been saved to: {output_path}")
+    log.info("Top %d package percentage data has been saved to: %s", top_n, output_path)
     return str(output_path)
@@ -0,0 +1,183 @@
+# server/seeder/seeder/parallel.py
+"""
+SEED_WORKERS=N: customer and subscription generation spread over a process pool.
+
+Rows are split into fixed shards of SEED_CHUNK_SIZE. Shard k always gets the
+same sub-seed (derived from SEED_RANDOM_SEED) and the same slice of the
+reserved customer/subscription ids, so the seeded data depends only on the
+seed and chunk size, not on N. Each worker has its own connection, commits
+every shard it loads and closes the connection when the pool shuts down.
+
+Unlike the single-process path this is not one transaction: packages are
+committed before the pool starts, and shards become visible as they commit.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import multiprocessing
+import multiprocessing.util
+import random
+from typing import Optional
+
+import numpy as np
+
+from .db import connect, insert_many, reserve_id_block
+from .log import get_logger
+from .seeders import (
+    SEED_CHUNK_SIZE,
+    Schema,
+    SnapshotCustomers,
+    SnapshotSubscriptions,
+    SubscriptionCols,
+    build_subscription_sampler,
+    customer_pk_col,
+    customer_row_factory,
+    detect_subscription_cols,
+    sample_subscription_rows,
+)
+from .schema import pick_col
+from .subscription_distributions import SubscriptionSampler
+
+log = get_logger(__name__)
+
+
+def derive_seed(base_seed: int, *parts) -> int:
+    """Stable 64-bit sub-seed for (base_seed, *parts)."""
+    key = ":".join(str(p) for p in (base_seed, *parts)).encode("utf-8")
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+
+def _shards(n: int, size: int) -> list[tuple[int, int, int]]:
+    return [(k, start, min(size, n - start)) for k, start in enumerate(range(0, n, size))]
+
+
+# ------------------------------------------------------------
+# worker side
+# ------------------------------------------------------------
+_WORKER: dict = {}
+
+
+def _init_worker(db_url: str, state: dict) -> None:
+    _WORKER.clear()
+    _WORKER.update(state)
+    conn = _WORKER["conn"] = connect(db_url)
+    # runs when the worker exits normally, i.e. after pool.close() + join() (not terminate())
+    multiprocessing.util.Finalize(None, conn.close, exitpriority=10)
+
+
+def _customer_shard(task: tuple[int, int, int]) -> SnapshotCustomers:
+    k, start, count = task
+    schema: Schema = _WORKER["schema"]
+    first_id: int = _WORKER["first_cust_id"]
+
+    random.seed(derive_seed(_WORKER["base_seed"], "customers", k))
+
+    snapshot = SnapshotCustomers()
+    make_customer = customer_row_factory(schema, _WORKER["postal_dist_name"], snapshot)
+    cust_pk = _WORKER["cust_pk"]
+
+    rows = []
+    for cust_id in range(first_id + start, first_id + start + count):
+        row = make_customer()
+        row[cust_pk] = cust_id
+        rows.append(row)
+
+    conn = _WORKER["conn"]
+    with conn.cursor() as cur:
+        insert_many(cur, schema.CUSTOMER_T, rows, returning_col=None)
+    conn.commit()
+    return snapshot
+
+
+def _subscription_shard(task: tuple[int, int, int]):
+    k, start, count = task
+    sampler: SubscriptionSampler = _WORKER["sampler"]
+    cols: SubscriptionCols = _WORKER["sub_cols"]
+
+    sampler.rng = np.random.default_rng(derive_seed(_WORKER["base_seed"], "subscriptions", k))
+    batch, sub_rows = sample_subscription_rows(sampler, cols, count, _WORKER["pkg_costs"])
+
+    sub_pk = _WORKER["sub_pk"]
+    if sub_pk:
+        first_id = _WORKER["first_sub_id"] + start
+        for offset, row in enumerate(sub_rows):
+            row[sub_pk] = first_id + offset
+
+    conn = _WORKER["conn"]
+    with conn.cursor() as cur:
+        insert_many(cur, cols.SUB_T, sub_rows, returning_col=None)
+    conn.commit()
+    return batch
+
+
+# ------------------------------------------------------------
+# parent side
+# ------------------------------------------------------------
+def seed_customers_and_subscriptions_parallel(
+    conn,
+    cur,
+    *,
+    db_url: str,
+    schema: Schema,
+    workers: int,
+    base_seed: Optional[int],
+    n_customers: int,
+    n_subscriptions: int,
+    pkg_ids: list[int],
+    pkg_costs: dict[int, dict[str, int]],
+    dist_name: str,
+    postal_dist_name: str,
+) -> tuple[range, SnapshotCustomers, SnapshotSubscriptions]:
+    """
+    Parallel counterpart of seed_customers() + seed_subscriptions().
+    Commits the caller's open transaction (packages, reset) first so workers see it.
+    """
+    if base_seed is None:
+        base_seed = random.SystemRandom().getrandbits(64)
+
+    cust_pk = customer_pk_col(schema)
+    cust_ids = reserve_id_block(cur, schema.CUSTOMER_T, cust_pk, n_customers)
+    sub_cols = detect_subscription_cols(cur, schema)
+    sub_pk = pick_col(schema.sub_cols, ["id", "subscriptionId", "subscriptionID"])
+    sub_ids = reserve_id_block(cur, schema.SUB_T, sub_pk, n_subscriptions) if sub_pk else range(0)
+    conn.commit()
+
+    ctx = multiprocessing.get_context()
+
+    log.info("⚙️  Parallel seeding: %d workers, shard size %d", workers, SEED_CHUNK_SIZE)
+
+    state = {
+        "schema": schema,
+        "base_seed": base_seed,
+        "cust_pk": cust_pk,
+        "first_cust_id": cust_ids.start,
+        "postal_dist_name": postal_dist_name,
+    }
+    snapshot_customers = SnapshotCustomers()
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(db_url, state)) as pool:
+        for shard_snapshot in pool.imap(_customer_shard, _shards(n_customers, SEED_CHUNK_SIZE)):
+            snapshot_customers.extend(shard_snapshot)
+        pool.close()
+        pool.join()
+
+    # customer weights etc. come from the parent's (seeded) RNG, identical for any N
+    random.seed(derive_seed(base_seed, "subscription_sampler"))
+    sampler = build_subscription_sampler(dist_name, sub_cols, cust_ids, pkg_ids)
+
+    state = {
+        "base_seed": base_seed,
+        "sampler": sampler,
+        "sub_cols": sub_cols,
+        "sub_pk": sub_pk,
+        "first_sub_id": sub_ids.start,
+        "pkg_costs": pkg_costs,
+    }
+    snapshot_subscriptions = SnapshotSubscriptions()
+    with ctx.Pool(workers, initializer=_init_worker, initargs=(db_url, state)) as pool:
+        for batch in pool.imap(_subscription_shard, _shards(n_subscriptions, SEED_CHUNK_SIZE)):
+            snapshot_subscriptions.add_batch(batch)
+        pool.close()
+        pool.join()
+
+    return cust_ids, snapshot_customers, snapshot_subscriptions
@@ -3,9 +3,30 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import date, timedelta
 
-from .db import insert_many
-from .schema import find_table, get_table_columns, pick_col, get_enum_labels_for_column, list_tables
-from .verify_due import VerifySchema, find_due_monthly_active_subs, window_dates
+import numpy as np
+import psycopg2
+
+from .log import get_logger
+from .schema import (
+    find_fk_column,
+    find_table,
+    get_column_type,
+    get_table_columns,
+    pick_col,
+    get_enum_labels_for_column,
+    list_tables,
+)
+from .verify_due import (
+    VerifySchema,
+    due_label_filters,
+    due_pairs_sql,
+    due_scan_params,
+    ensure_due_day_index,
+    last_day_of_month,
+    window_dates,
+)
+
+log = get_logger(__name__)
 
 
 @dataclass
@@ -36,7 +57,10 @@ def detect_payment_schema(cur) -> PaymentInsertSchema:
 
     pay_cols = get_table_columns(cur, PAY_T)
 
-    pay_sub_fk = pick_col(pay_cols, ["subscriptionID", "subscriptionId", "subscription_id"])
+    sub_t = find_table(cur, ["Subscription", "subscription", "subscriptions"])
+    pay_sub_fk = (find_fk_column(cur, PAY_T, sub_t) if sub_t else None) or pick_col(
+        pay_cols, ["subscriptionID", "subscriptionId", "subscription_id"]
+    )
     pay_due = pick_col(pay_cols, ["dueDate", "due_date"])
     if not pay_sub_fk or not pay_due:
         raise SystemExit(
@@ -64,98 +88,243 @@ def detect_payment_schema(cur) -> PaymentInsertSchema:
     )
 
 
-def insert_due_payments(
-    cur,
-    verify_schema: VerifySchema,
+def due_status_value(cur, pay: PaymentInsertSchema) -> str | None:
+    """Status for new due payments: DUE if Payment.status allows it (enum-safe)."""
+    if not pay.pay_status:
+        return None
+    labels = get_enum_labels_for_column(cur, pay.PAY_T, pay.pay_status)
+    if labels:
+        # prefer DUE
+        return next((x for x in labels if str(x).upper() == "DUE"), labels[0])
+    return "DUE"
+
+
+def due_payment_rows(
+    pay: PaymentInsertSchema,
+    status_value: str | None,
+    sub_ids: np.ndarray,
+    start_dts: np.ndarray,
+    cycles: np.ndarray | None,
+    statuses: np.ndarray | None,
     *,
     days_ahead: int = 7,
     today: date | None = None,
-    quiet: bool = False,
-) -> int:
+) -> list[dict]:
     """
-    Uses verify_due.find_due_monthly_active_subs(...) as source of truth.
-    Inserts Payment rows for each due date in the window.
-    Skips duplicates (subscriptionID + dueDate).
-    Returns number of inserted rows.
+    In-memory counterpart of insert_due_payments() for subscriptions that are
+    not in a database (SEED_OUTPUT=files). Columns are NumPy arrays as in
+    SubscriptionBatch; pass cycles/statuses as None when Subscription has no
+    such column. Same due rule as verify_due.due_pairs_sql().
     """
     if today is None:
         today = date.today()
 
-    pay = detect_payment_schema(cur)
+    days = start_dts.astype("datetime64[D]")
+    start_day = (days - days.astype("datetime64[M]")).astype(np.int64) + 1
 
-    due_items = find_due_monthly_active_subs(cur, verify_schema, days_ahead=days_ahead, today=today)
-    if not due_items:
-        if not quiet:
-            print("ℹ️  No due MONTHLY+ACTIVE subscriptions found for Payment insertion.")
-        return 0
+    mask = np.ones(len(sub_ids), dtype=bool)
+    if cycles is not None:
+        mask &= cycles == "MONTHLY"
+    if statuses is not None:
+        mask &= statuses == "ACTIVE"
+
+    rows: list[dict] = []
+    for due_d in window_dates(today, days_ahead):
+        hit = mask & (np.minimum(start_day, last_day_of_month(due_d)) == due_d.day)
+        for sub_id in sub_ids[hit].tolist():
+            row = {pay.pay_sub_fk: sub_id, pay.pay_due: due_d}
+            if pay.pay_status:
+                row[pay.pay_status] = status_value
+            if pay.pay_amount:
+                row[pay.pay_amount] = 29
+            if pay.pay_period_start:
+                row[pay.pay_period_start] = due_d - timedelta(days=30)
+            if pay.pay_period_end:
+                row[pay.pay_period_end] = due_d
+            if pay.pay_paid_at:
+                row[pay.pay_paid_at] = None
+            rows.append(row)
+    return rows
+
+
+def payment_due_unique_name(pay: PaymentInsertSchema) -> str:
+    # Prisma's name for @@unique([subscriptionID, dueDate])
+    return f"{pay.PAY_T}_{pay.pay_sub_fk}_{pay.pay_due}_key"
 
-    # Choose a safe status value if Payment.status exists (enum-safe)
-    status_value = None
-    if pay.pay_status:
-        labels = get_enum_labels_for_column(cur, pay.PAY_T, pay.pay_status)
-        if labels:
-            # prefer DUE
-            status_value = next((x for x in labels if str(x).upper() == "DUE"), labels[0])
-        else:
-            status_value = "DUE"
 
-    # Duplicate protection: fetch existing pairs within the date window once
-    dates = window_dates(today, days_ahead)
-    min_d, max_d = dates[0], dates[-1]
+def ensure_payment_due_unique(cur, pay: PaymentInsertSchema) -> bool:
+    """
+    Creates (if missing) the unique index on (subscription FK, dueDate) that
+    insert_due_payments() relies on for ON CONFLICT DO NOTHING. The Prisma
+    migration normally creates it; this covers databases that predate it.
+
+    Runs under a savepoint: on failure (e.g. existing duplicates) it prints a
+    warning and returns False.
+    """
+    cur.execute("SAVEPOINT ensure_payment_due_unique")
+    try:
+        cur.execute(
+            f'''
+            CREATE UNIQUE INDEX IF NOT EXISTS "{payment_due_unique_name(pay)}"
+            ON "{pay.PAY_T}" ("{pay.pay_sub_fk}", "{pay.pay_due}")
+            '''
+        )
+    except psycopg2.Error as e:
+        cur.execute("ROLLBACK TO SAVEPOINT ensure_payment_due_unique")
+        log.warning(
+            "⚠️ Could not create unique index on %s(%s, %s): %s", pay.PAY_T, pay.pay_sub_fk, pay.pay_due, str(e).strip()
+        )
+        return False
+    cur.execute("RELEASE SAVEPOINT ensure_payment_due_unique")
+    return True
 
+
+def _typed_param(cur, pay: PaymentInsertSchema, col: str) -> str:
+    # Bare literals in an INSERT ... SELECT list resolve to text, which enum
+    # columns reject; cast to the column's own type.
+    col_type = get_column_type(cur, pay.PAY_T, col)
+    return f"%s::{col_type}" if col_type else "%s"
+
+
+# Small state table holding, per job, the last due date payments were generated through.
+PAYMENT_STATE_T = "PaymentGenerationState"
+DUE_PAYMENTS_JOB = "due_payments"
+
+
+def ensure_payment_state_table(cur) -> None:
+    """Creates the state table if missing (the Prisma migration normally does)."""
     cur.execute(
         f'''
-        SELECT "{pay.pay_sub_fk}", "{pay.pay_due}"
-        FROM "{pay.PAY_T}"
-        WHERE "{pay.pay_due}" BETWEEN %s AND %s
+        CREATE TABLE IF NOT EXISTS "{PAYMENT_STATE_T}" (
+          "job" TEXT PRIMARY KEY,
+          "generatedThrough" DATE NOT NULL,
+          "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        '''
+    )
+
+
+def load_generated_through(cur, job: str = DUE_PAYMENTS_JOB) -> date | None:
+    """
+    Returns the job's high-water mark, or None if it never ran.
+    Locks the row until commit so overlapping runs serialize on it.
+    """
+    cur.execute(
+        f'SELECT "generatedThrough" FROM "{PAYMENT_STATE_T}" WHERE "job" = %s FOR UPDATE',
+        (job,),
+    )
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def save_generated_through(cur, through: date, job: str = DUE_PAYMENTS_JOB) -> None:
+    # never moves the mark backwards
+    cur.execute(
+        f'''
+        INSERT INTO "{PAYMENT_STATE_T}" ("job", "generatedThrough", "updatedAt")
+        VALUES (%s, %s, CURRENT_TIMESTAMP)
+        ON CONFLICT ("job") DO UPDATE
+        SET "generatedThrough" = GREATEST("{PAYMENT_STATE_T}"."generatedThrough", EXCLUDED."generatedThrough"),
+            "updatedAt" = EXCLUDED."updatedAt"
         ''',
-        (min_d, max_d),
+        (job, through),
     )
-    existing_pairs = {(r[0], r[1]) for r in cur.fetchall()}
 
-    new_rows: list[dict] = []
 
-    for it in due_items:
-        if it.sub_id is None:
-            continue
+def insert_due_payments(
+    cur,
+    verify_schema: VerifySchema,
+    *,
+    days_ahead: int = 7,
+    today: date | None = None,
+    incremental: bool = True,
+    quiet: bool = False,
+) -> int:
+    """
+    Inserts a Payment row for each (subscription, due date) up to
+    today + days_ahead, as one INSERT ... SELECT built from
+    verify_due.due_pairs_sql(), so no rows travel through Python.
 
-        # Amount: if Payment has an amount column, we try to pull from Subscription.price
-        # If your Subscription has price and you want to use it, add it to verify logic later.
-        # For now: default 29 if needed.
-        amount_value = 29 if pay.pay_amount else None
+    The last date generated is kept in PAYMENT_STATE_T. With incremental=True
+    the window starts the day after that mark (which may be before today, so
+    missed days are caught up); otherwise, or on the first run, at today.
+    Use incremental=False after adding subscriptions: the mark says nothing
+    about rows that did not exist when it was written.
 
-        for due_d in it.due_dates:
-            if (it.sub_id, due_d) in existing_pairs:
-                continue
+    Duplicates (subscriptionID + dueDate) are skipped by ON CONFLICT DO NOTHING
+    against the unique index, which also makes overlapping runs safe.
+    Returns number of inserted rows.
+    """
+    if today is None:
+        today = date.today()
+    end = today + timedelta(days=days_ahead)
 
-            row = {
-                pay.pay_sub_fk: it.sub_id,
-                pay.pay_due: due_d,
-            }
+    pay = detect_payment_schema(cur)
+    ensure_payment_state_table(cur)
 
-            if pay.pay_status:
-                row[pay.pay_status] = status_value
+    start = today
+    generated_through = load_generated_through(cur)
+    if incremental and generated_through is not None:
+        if generated_through >= end:
+            if not quiet:
+                log.info("ℹ️  Payments already generated through %s.", generated_through.isoformat())
+            return 0
+        start = generated_through + timedelta(days=1)
+        if start < today and not quiet:
+            log.info("ℹ️  Catching up payments from %s (missed %d days).", start.isoformat(), (today - start).days)
 
-            if pay.pay_amount:
-                row[pay.pay_amount] = amount_value
+    ensure_due_day_index(cur, verify_schema)
+    if not ensure_payment_due_unique(cur, pay):
+        raise SystemExit(
+            f"{pay.PAY_T}: unique index on ({pay.pay_sub_fk}, {pay.pay_due}) is required "
+            "for duplicate-safe Payment insertion."
+        )
 
-            # Optional period columns (simple approximation for monthly billing)
-            if pay.pay_period_start:
-                row[pay.pay_period_start] = due_d - timedelta(days=30)
-            if pay.pay_period_end:
-                row[pay.pay_period_end] = due_d
-            if pay.pay_paid_at:
-                row[pay.pay_paid_at] = None
+    cols = [pay.pay_sub_fk, pay.pay_due]
+    exprs = ["due.sub_id", "due.due_date"]
+    params: list = []
+
+    if pay.pay_status:
+        cols.append(pay.pay_status)
+        exprs.append(_typed_param(cur, pay, pay.pay_status))
+        params.append(due_status_value(cur, pay))
+
+    # Amount: Subscription.price is not part of the due scan yet; default 29.
+    if pay.pay_amount:
+        cols.append(pay.pay_amount)
+        exprs.append(_typed_param(cur, pay, pay.pay_amount))
+        params.append(29)
+
+    # Optional period columns (simple approximation for monthly billing)
+    if pay.pay_period_start:
+        cols.append(pay.pay_period_start)
+        exprs.append("due.due_date - 30")
+    if pay.pay_period_end:
+        cols.append(pay.pay_period_end)
+        exprs.append("due.due_date")
+    if pay.pay_paid_at:
+        cols.append(pay.pay_paid_at)
+        exprs.append("NULL")
 
-            new_rows.append(row)
+    label_where, label_params = due_label_filters(cur, verify_schema)
+    col_sql = ", ".join(f'"{c}"' for c in cols)
+    cur.execute(
+        f'''
+        INSERT INTO "{pay.PAY_T}" ({col_sql})
+        SELECT {", ".join(exprs)}
+        FROM ({due_pairs_sql(verify_schema, label_where)}) AS due
+        ON CONFLICT ("{pay.pay_sub_fk}", "{pay.pay_due}") DO NOTHING
+        ''',
+        (*params, *due_scan_params(start, (end - start).days), *label_params),
+    )
+    inserted = cur.rowcount
+    save_generated_through(cur, end)
 
-    if not new_rows:
+    if not inserted:
         if not quiet:
-            print("ℹ️  No new Payment rows to insert (already exists for window).")
+            log.info("ℹ️  No new Payment rows to insert (none due, or already exist for window).")
         return 0
 
-    insert_many(cur, pay.PAY_T, new_rows, returning_col=None)
-
     if not quiet:
-        print(f"✅ Inserted {len(new_rows)} Payment rows into {pay.PAY_T}.")
-    return len(new_rows)
+        log.info("✅ Inserted %d Payment rows into %s.", inserted, pay.PAY_T)
+    return inserted
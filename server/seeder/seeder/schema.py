@@ -1,32 +1,379 @@
-def list_tables(cur) -> set[str]:
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .log import get_logger
+
+log = get_logger(__name__)
+
+
+_DB_INFO_DIR = Path(os.getenv("DATA_DIR", "/app/data")) / "db-info"
+
+# JSON copy of the live catalog, reused while _prisma_migrations is unchanged.
+# SEED_SCHEMA_CACHE=0 disables it.
+SCHEMA_CACHE_FILE = os.environ.get("SEED_SCHEMA_CACHE", "").strip() or str(_DB_INFO_DIR / "schema_catalog.json")
+
+# prisma_schema_to_json.py output; preferred over live introspection when present.
+# SEED_SCHEMA_JSON=0 disables it.
+SCHEMA_JSON_FILE = (
+    os.environ.get("SEED_SCHEMA_JSON", "").strip()
+    or os.environ.get("OUT_JSON", "").strip()
+    or str(_DB_INFO_DIR / "db_schema.json")
+)
+
+# Postgres types Prisma maps its scalars to (no @db attribute).
+_PRISMA_PG_TYPES = {
+    "String": "text",
+    "Int": "integer",
+    "BigInt": "bigint",
+    "Float": "double precision",
+    "Decimal": "numeric(65,30)",
+    "Boolean": "boolean",
+    "DateTime": "timestamp(3) without time zone",
+    "Json": "jsonb",
+    "Bytes": "bytea",
+}
+
+# @db.<native type> -> format_type() spelling ("{}" takes the arguments, if any).
+_PRISMA_DB_TYPES = {
+    "Text": "text",
+    "VarChar": "character varying{}",
+    "Char": "character{}",
+    "Integer": "integer",
+    "SmallInt": "smallint",
+    "BigInt": "bigint",
+    "Real": "real",
+    "DoublePrecision": "double precision",
+    "Decimal": "numeric{}",
+    "Date": "date",
+    "Time": "time{} without time zone",
+    "Timestamp": "timestamp{} without time zone",
+    "Timestamptz": "timestamp{} with time zone",
+    "Uuid": "uuid",
+    "Json": "json",
+    "JsonB": "jsonb",
+    "Boolean": "boolean",
+}
+
+
+def _quote_type(name: str) -> str:
+    # format_type() quotes names that are not plain lower-case identifiers
+    if name.isidentifier() and name == name.lower():
+        return name
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def _prisma_pg_type(prisma_type: str, db_type: str | None) -> str:
+    if db_type:
+        native, _, args = db_type.partition("(")
+        template = _PRISMA_DB_TYPES.get(native)
+        if template:
+            return template.format(f"({args}" if args else "")
+        return db_type.lower()
+    return _PRISMA_PG_TYPES.get(prisma_type, "text")
+
+
+@dataclass
+class SchemaCatalog:
+    """
+    Tables, columns (with SQL types), enum labels and single-column foreign
+    keys of the public schema, answered from memory. Built either from two
+    pg_catalog queries (load) or offline from prisma_schema_to_json.py output
+    (from_prisma_json).
+    """
+
+    tables: dict[str, dict[str, str]]  # table -> column -> format_type()
+    column_enums: dict[str, dict[str, str]] = field(default_factory=dict)  # table -> column -> enum type
+    enums: dict[str, list[str]] = field(default_factory=dict)  # enum type -> labels in sort order
+    foreign_keys: dict[str, dict[str, list[str]]] = field(default_factory=dict)  # table -> column -> [ref table, ref column]
+    key: str | None = None  # migrations fingerprint it was loaded under
+    source: str = "live"  # "live" or "prisma"
+
+    @classmethod
+    def load(cls, cur) -> "SchemaCatalog":
+        cur.execute(
+            """
+            SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod),
+                   CASE WHEN t.typtype = 'e' THEN t.typname END,
+                   CASE WHEN t.typtype = 'e' THEN ARRAY(
+                     SELECT e.enumlabel FROM pg_enum e
+                     WHERE e.enumtypid = t.oid
+                     ORDER BY e.enumsortorder
+                   ) END
+            FROM pg_attribute a
+            JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_type t ON t.oid = a.atttypid
+            WHERE n.nspname = 'public'
+              AND c.relkind IN ('r', 'p')
+              AND a.attnum > 0
+              AND NOT a.attisdropped
+            """
+        )
+        tables: dict[str, dict[str, str]] = {}
+        column_enums: dict[str, dict[str, str]] = {}
+        enums: dict[str, list[str]] = {}
+        for table, col, col_type, enum_type, labels in cur.fetchall():
+            tables.setdefault(table, {})[col] = col_type
+            if enum_type:
+                column_enums.setdefault(table, {})[col] = enum_type
+                enums[enum_type] = list(labels)
+
+        cur.execute(
+            """
+            SELECT c.relname, a.attname, rc.relname, ra.attname
+            FROM pg_constraint k
+            JOIN pg_class c ON c.oid = k.conrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_class rc ON rc.oid = k.confrelid
+            JOIN pg_attribute a ON a.attrelid = k.conrelid AND a.attnum = k.conkey[1]
+            JOIN pg_attribute ra ON ra.attrelid = k.confrelid AND ra.attnum = k.confkey[1]
+            WHERE k.contype = 'f'
+              AND n.nspname = 'public'
+              AND cardinality(k.conkey) = 1
+            """
+        )
+        foreign_keys: dict[str, dict[str, list[str]]] = {}
+        for table, col, ref_table, ref_col in cur.fetchall():
+            foreign_keys.setdefault(table, {})[col] = [ref_table, ref_col]
+
+        return cls(tables=tables, column_enums=column_enums, enums=enums, foreign_keys=foreign_keys)
+
+    @classmethod
+    def from_prisma_json(cls, data: dict) -> "SchemaCatalog":
+        """
+        Builds the catalog from prisma_schema_to_json.py output, applying
+        @@map/@map names and Prisma's default Postgres type mapping.
+        """
+        enum_types = {e["enum"]: e.get("db_type") or e["enum"] for e in data.get("enums", [])}
+        enums = {enum_types[e["enum"]]: list(e["values"]) for e in data.get("enums", [])}
+
+        models = {m["model"]: m for m in data.get("models", [])}
+        table_of = {name: m.get("db_table") or name for name, m in models.items()}
+        column_of = {
+            name: {f["name"]: f.get("db_column") or f["name"] for f in m["fields"]}
+            for name, m in models.items()
+        }
+
+        tables: dict[str, dict[str, str]] = {}
+        column_enums: dict[str, dict[str, str]] = {}
+        foreign_keys: dict[str, dict[str, list[str]]] = {}
+
+        for name, m in models.items():
+            table = table_of[name]
+            cols = tables.setdefault(table, {})
+
+            for f in m["fields"]:
+                ftype = f["type"]
+                if ftype in models:
+                    # relation field: no column of its own, but names the FK columns
+                    local = f.get("relation_fields") or []
+                    refs = f.get("relation_references") or []
+                    if len(local) == 1 and len(refs) == 1:
+                        foreign_keys.setdefault(table, {})[column_of[name].get(local[0], local[0])] = [
+                            table_of[ftype],
+                            column_of[ftype].get(refs[0], refs[0]),
+                        ]
+                    continue
+
+                col = column_of[name][f["name"]]
+                if ftype in enum_types:
+                    column_enums.setdefault(table, {})[col] = enum_types[ftype]
+                    col_type = _quote_type(enum_types[ftype])
+                else:
+                    col_type = _prisma_pg_type(ftype, f.get("db_type"))
+                cols[col] = col_type + ("[]" if f.get("list") else "")
+
+        return cls(
+            tables=tables,
+            column_enums=column_enums,
+            enums=enums,
+            foreign_keys=foreign_keys,
+            source="prisma",
+        )
+
+    def table_names(self) -> set[str]:
+        return set(self.tables)
+
+    def find_table(self, candidates: list[str]) -> str | None:
+        for name in candidates:
+            if name in self.tables:
+                return name
+        return None
+
+    def columns(self, table_name: str) -> set[str]:
+        return set(self.tables.get(table_name, {}))
+
+    def column_type(self, table_name: str, column_name: str) -> str | None:
+        return self.tables.get(table_name, {}).get(column_name)
+
+    def enum_labels(self, table_name: str, column_name: str) -> list[str]:
+        enum_type = self.column_enums.get(table_name, {}).get(column_name)
+        return list(self.enums.get(enum_type, [])) if enum_type else []
+
+    def fk_column(self, table_name: str, ref_table: str) -> str | None:
+        """The column of table_name referencing ref_table (first one, if several)."""
+        for col, (target, _) in self.foreign_keys.get(table_name, {}).items():
+            if target == ref_table:
+                return col
+        return None
+
+    # ---------- JSON persistence ----------
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(asdict(self), indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(path)
+
+    @classmethod
+    def from_file(cls, path: str | Path) -> "SchemaCatalog | None":
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            return cls(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+
+def migrations_fingerprint(cur) -> str | None:
+    """
+    Hash of the applied Prisma migrations (names + checksums), or None when
+    there is no _prisma_migrations table. Changes whenever a migration lands.
+    """
+    cur.execute("SELECT to_regclass('public._prisma_migrations') IS NOT NULL")
+    if not cur.fetchone()[0]:
+        return None
     cur.execute(
         """
-        SELECT table_name
-        FROM information_schema.tables
-        WHERE table_schema='public' AND table_type='BASE TABLE'
+        SELECT string_agg(migration_name || ':' || checksum, ',' ORDER BY migration_name)
+        FROM "_prisma_migrations"
+        WHERE finished_at IS NOT NULL AND rolled_back_at IS NULL
         """
     )
-    return {r[0] for r in cur.fetchall()}
+    joined = cur.fetchone()[0]
+    if not joined:
+        return None
+    return hashlib.sha256(joined.encode("utf-8")).hexdigest()
 
 
-def find_table(cur, candidates: list[str]) -> str | None:
-    existing = list_tables(cur)
-    for name in candidates:
-        if name in existing:
-            return name
-    return None
+# One catalog per database (DSN) for the lifetime of the process; None = offline.
+_CATALOGS: dict[str | None, SchemaCatalog] = {}
 
 
-def get_table_columns(cur, table_name: str) -> set[str]:
+def _prisma_catalog() -> SchemaCatalog | None:
+    if SCHEMA_JSON_FILE in ("0", "false", "False"):
+        return None
+    try:
+        data = json.loads(Path(SCHEMA_JSON_FILE).read_text(encoding="utf-8"))
+        return SchemaCatalog.from_prisma_json(data)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _matches_database(cur, catalog: SchemaCatalog) -> bool:
+    """
+    True when catalog has exactly the public tables of cur's database
+    (Prisma's own excluded), each with exactly its columns.
+    """
     cur.execute(
         """
-        SELECT column_name
-        FROM information_schema.columns
-        WHERE table_schema='public' AND table_name=%s
-        """,
-        (table_name,),
+        SELECT c.relname, a.attname
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public'
+          AND c.relkind IN ('r', 'p')
+          AND c.relname NOT LIKE '\\_prisma%'
+          AND a.attnum > 0
+          AND NOT a.attisdropped
+        """
     )
-    return {r[0] for r in cur.fetchall()}
+    live: dict[str, set[str]] = {}
+    for table, col in cur.fetchall():
+        live.setdefault(table, set()).add(col)
+    return live == {table: set(cols) for table, cols in catalog.tables.items()}
+
+
+def _live_catalog(cur) -> SchemaCatalog:
+    """
+    Catalog of cur's database: read from SCHEMA_CACHE_FILE if it was saved
+    under the current migrations fingerprint, otherwise loaded live (and saved).
+    """
+    use_file = SCHEMA_CACHE_FILE not in ("0", "false", "False")
+    key = migrations_fingerprint(cur) if use_file else None
+
+    if key:
+        cached = SchemaCatalog.from_file(SCHEMA_CACHE_FILE)
+        if cached is not None and cached.key == key:
+            return cached
+
+    catalog = SchemaCatalog.load(cur)
+    catalog.key = key
+    if key:
+        try:
+            catalog.save(SCHEMA_CACHE_FILE)
+        except OSError as e:
+            log.warning("⚠️ Could not write schema cache %s: %s", SCHEMA_CACHE_FILE, e)
+    return catalog
+
+
+def get_catalog(cur=None) -> SchemaCatalog:
+    """
+    Memoized SchemaCatalog for cur's database.
+
+    Resolved from SCHEMA_JSON_FILE (prisma_schema_to_json.py output) when it
+    exists and has the same tables and columns as the database (one round
+    trip), otherwise from the live catalog. Either way every lookup is then
+    answered from memory, empty answers included. With cur=None (dry run)
+    the JSON is required.
+    """
+    memo_key = cur.connection.dsn if cur is not None else None
+    catalog = _CATALOGS.get(memo_key)
+    if catalog is not None:
+        return catalog
+
+    catalog = _prisma_catalog()
+    if catalog is not None and cur is not None and not _matches_database(cur, catalog):
+        log.info("ℹ️ Schema JSON does not match the database; using live introspection.")
+        catalog = None
+    if catalog is None:
+        if cur is None:
+            raise SystemExit(
+                f"No database connection and no schema JSON at {SCHEMA_JSON_FILE}.\n"
+                "Run prisma_schema_to_json.py first (or set SEED_SCHEMA_JSON)."
+            )
+        catalog = _live_catalog(cur)
+
+    _CATALOGS[memo_key] = catalog
+    return catalog
+
+
+def invalidate_catalog(cur=None) -> None:
+    """Drops the memoized catalog for cur's database (all databases if cur is None)."""
+    if cur is None:
+        _CATALOGS.clear()
+    else:
+        _CATALOGS.pop(cur.connection.dsn, None)
+
+
+def list_tables(cur) -> set[str]:
+    return get_catalog(cur).table_names()
+
+
+def find_table(cur, candidates: list[str]) -> str | None:
+    return get_catalog(cur).find_table(candidates)
+
+
+def get_table_columns(cur, table_name: str) -> set[str]:
+    return get_catalog(cur).columns(table_name)
+
+
+def find_fk_column(cur, table_name: str, ref_table: str) -> str | None:
+    return get_catalog(cur).fk_column(table_name, ref_table)
 
 
 def pick_col(cols: set[str], candidates: list[str]) -> str | None:
@@ -40,33 +387,12 @@ def get_enum_labels_for_column(cur, table_name: str, column_name: str) -> list[s
     """
     If public.<table>.<column> is a Postgres enum type, return allowed labels, else [].
     """
-    cur.execute(
-        """
-        SELECT t.typname
-        FROM pg_attribute a
-        JOIN pg_class c ON c.oid = a.attrelid
-        JOIN pg_namespace n ON n.oid = c.relnamespace
-        JOIN pg_type t ON t.oid = a.atttypid
-        WHERE n.nspname = 'public'
-          AND c.relname = %s
-          AND a.attname = %s
-          AND t.typtype = 'e'
-        """,
-        (table_name, column_name),
-    )
-    row = cur.fetchone()
-    if not row:
-        return []
+    return get_catalog(cur).enum_labels(table_name, column_name)
 
-    enum_type = row[0]
-    cur.execute(
-        """
-        SELECT e.enumlabel
-        FROM pg_enum e
-        JOIN pg_type t ON t.oid = e.enumtypid
-        WHERE t.typname = %s
-        ORDER BY e.enumsortorder
-        """,
-        (enum_type,),
-    )
-    return [r[0] for r in cur.fetchall()]
+
+def get_column_type(cur, table_name: str, column_name: str) -> str | None:
+    """
+    SQL type of public.<table>.<column> as format_type() spells it
+    (e.g. 'integer', '"PaymentStatus"'), usable in a ::cast. None if missing.
+    """
+    return get_catalog(cur).column_type(table_name, column_name)
@@ -3,30 +3,49 @@
 import os
 import random
 import base64
-import traceback
+import logging
+import time
+from array import array
 from pathlib import Path
 from datetime import datetime, timezone, date
 from calendar import monthrange
-from collections import Counter, defaultdict
-from typing import Any
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Sequence
 
-from .subscription_distributions import pick_subscription_by_distribution
+import numpy as np
+
+from .subscription_distributions import DISTRIBUTIONS, SubscriptionBatch, SubscriptionSampler, cached_sampler
 from .config import load_config
 from .db import connect, insert_many
 from .random_data import rand_first, rand_last, rand_email, rand_past_date
 from .schema import (
     list_tables,
     find_table,
+    find_fk_column,
     get_table_columns,
     pick_col,
     get_enum_labels_for_column,
 )
 from .verify_due import VerifySchema
-from .payments_due import insert_due_payments
+from .payments_due import detect_payment_schema, due_payment_rows, due_status_value, insert_due_payments
+from .seed_files import SeedFileWriter
+from .fixture_cache import restore_fixture, save_fixture, usable_fixture_key
+from .bulk_load import DeferredIndexes, defer_indexes, rebuild_deferred, set_logged, set_unlogged
+from .metrics import current_metrics, start_metrics
+from .log import get_logger
+from .snapshot_aggregate import infer_country_from_postal
+from .snapshot_generator import SNAPSHOT_TEST_FILES, aggregate_snapshots, generate_snapshots, write_snapshots
+from .snapshot_render import SNAPSHOT_THEME
 from .package_percentages import generate_package_percentage_json
 
+log = get_logger(__name__)
+
 
 SNAPSHOT_OUTPUT_DIR = Path("/app/client/public/snapshots")
+# dry runs chart data that is not in the database: keep it away from the served charts
+DRY_RUN_SNAPSHOT_DIR = Path(os.getenv("DATA_DIR", "/app/data")) / "dry-run-snapshots"
 
 
 # ============================================================
@@ -63,479 +82,11 @@ def write_test_snapshot_image() -> str:
     fig.savefig(out_path, bbox_inches="tight", facecolor=fig.get_facecolor(), edgecolor="none")
     plt.close(fig)
 
-    print(f"✅ TEST IMAGE WRITTEN: {out_path}")
-    print(f"✅ TEST IMAGE EXISTS: {out_path.exists()}")
-    print(f"✅ TEST IMAGE SIZE: {out_path.stat().st_size} bytes")
+    log.debug("test image written: %s (%d bytes)", out_path, out_path.stat().st_size)
 
     return str(out_path)
 
 
-# ============================================================
-# INLINE SNAPSHOT GENERATOR HELPERS
-# ============================================================
-def _snap_first_present(row: dict[str, Any], keys: list[str], default: Any = None) -> Any:
-    for key in keys:
-        if key in row and row[key] is not None:
-            return row[key]
-    return default
-
-
-def _snap_safe_float(value: Any) -> float | None:
-    if value is None:
-        return None
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
-
-
-def _snap_safe_dt(value: Any) -> datetime | None:
-    if value is None:
-        return None
-
-    if isinstance(value, datetime):
-        return value
-
-    if isinstance(value, date):
-        return datetime(value.year, value.month, value.day)
-
-    if isinstance(value, str):
-        text = value.strip()
-        if not text:
-            return None
-
-        if text.endswith("Z"):
-            text = text[:-1] + "+00:00"
-
-        fmts = [
-            "%Y-%m-%d",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%d %H:%M:%S.%f",
-        ]
-        for fmt in fmts:
-            try:
-                return datetime.strptime(text, fmt)
-            except ValueError:
-                pass
-
-        try:
-            return datetime.fromisoformat(text)
-        except ValueError:
-            return None
-
-    return None
-
-
-def _snap_infer_country_from_postal(postal_code: Any) -> str:
-    if postal_code is None:
-        return "Unknown"
-
-    text = str(postal_code).strip()
-    if len(text) >= 7 and " " in text and text[0].isalpha():
-        return "Canada"
-    if text:
-        return "USA"
-    return "Unknown"
-
-
-def _snap_normalize_cycle(value: Any) -> str:
-    if value is None:
-        return "Unknown"
-
-    text = str(value).strip().upper()
-    if text in {"MONTHLY", "MONTH", "M"}:
-        return "Monthly"
-    if text in {"ANNUAL", "YEARLY", "YEAR", "Y"}:
-        return "Annual"
-    return text.title() if text else "Unknown"
-
-
-def _snap_normalize_status(value: Any) -> str:
-    if value is None:
-        return "Unknown"
-
-    text = str(value).strip().upper()
-    if "ACTIVE" in text:
-        return "Active"
-    if "CANCEL" in text:
-        return "Cancelled"
-    if "PAST" in text:
-        return "Past Due"
-    if "PAUSE" in text:
-        return "Paused"
-    if "TRIAL" in text:
-        return "Trial"
-    return text.title() if text else "Unknown"
-
-
-def _snap_ensure_output_dir(output_dir: str | Path) -> Path:
-    path = Path(output_dir).resolve()
-    path.mkdir(parents=True, exist_ok=True)
-    return path
-
-
-def _snap_extract_customer_points(customers: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    points = []
-    for row in customers:
-        postal = _snap_first_present(row, ["postalCode", "postal_code", "zip", "zipcode", "postal"])
-        lat = _snap_safe_float(_snap_first_present(row, ["latitude", "lat"]))
-        lon = _snap_safe_float(_snap_first_present(row, ["longitude", "lon", "lng"]))
-        created = _snap_safe_dt(
-            _snap_first_present(row, ["memberSince", "member_since", "createdAt", "created_at"])
-        )
-
-        points.append(
-            {
-                "postal": postal,
-                "country": _snap_infer_country_from_postal(postal),
-                "lat": lat,
-                "lon": lon,
-                "created": created,
-            }
-        )
-    return points
-
-
-def _snap_extract_subscription_rows(subscriptions: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    rows = []
-    for row in subscriptions:
-        pkg_id = _snap_first_present(row, ["packageID", "packageId", "package_id"])
-        cycle = _snap_normalize_cycle(_snap_first_present(row, ["billingCycle", "billing_cycle", "cycle"]))
-        status = _snap_normalize_status(_snap_first_present(row, ["status", "state"]))
-        start_dt = _snap_safe_dt(
-            _snap_first_present(row, ["startDate", "start_date", "createdAt", "created_at"])
-        )
-
-        rows.append(
-            {
-                "package_id": pkg_id,
-                "cycle": cycle,
-                "status": status,
-                "start_dt": start_dt,
-            }
-        )
-    return rows
-
-
-# ============================================================
-# MATPLOTLIB SNAPSHOTS
-# ============================================================
-def _generate_snapshots_with_matplotlib(
-    *,
-    customer_points: list[dict[str, Any]],
-    subscription_rows: list[dict[str, Any]],
-    package_lookup: dict[Any, str],
-    out_dir: Path,
-    postal_distribution: str | None,
-    subscription_distribution: str | None,
-) -> dict[str, str]:
-    import matplotlib
-    matplotlib.use("Agg")
-    import matplotlib.pyplot as plt
-
-    BG = "#000000"
-    GREEN = "#39FF14"
-
-    print("========== MATPLOTLIB INPUT DEBUG ==========")
-    print(f"customer_points count: {len(customer_points)}")
-    print(f"subscription_rows count: {len(subscription_rows)}")
-    print(f"package_lookup size: {len(package_lookup)}")
-    print(f"package_lookup sample: {list(package_lookup.items())[:10]}")
-    print(f"customer_points sample: {customer_points[:5]}")
-    print(f"subscription_rows sample: {subscription_rows[:5]}")
-    print("============================================")
-
-    def _style_axes(ax):
-        ax.set_facecolor(BG)
-
-        for spine in ax.spines.values():
-            spine.set_color(GREEN)
-            spine.set_linewidth(1.0)
-
-        ax.tick_params(axis="x", colors=GREEN)
-        ax.tick_params(axis="y", colors=GREEN)
-        ax.xaxis.label.set_color(GREEN)
-        ax.yaxis.label.set_color(GREEN)
-        ax.title.set_color(GREEN)
-        ax.grid(True, color=GREEN, alpha=0.18, linewidth=0.8)
-
-    def _new_figure(figsize=(12, 8)):
-        fig, ax = plt.subplots(figsize=figsize, dpi=200)
-        fig.patch.set_facecolor(BG)
-        _style_axes(ax)
-        return fig, ax
-
-    def _save(fig, path: Path):
-        fig.tight_layout()
-        fig.savefig(
-            path,
-            bbox_inches="tight",
-            facecolor=fig.get_facecolor(),
-            edgecolor="none",
-        )
-        plt.close(fig)
-        print(f"✅ wrote {path}")
-
-    def _style_legend(legend):
-        if legend is None:
-            return
-        frame = legend.get_frame()
-        frame.set_facecolor(BG)
-        frame.set_edgecolor(GREEN)
-        frame.set_alpha(1.0)
-        for txt in legend.get_texts():
-            txt.set_color(GREEN)
-
-    paths = {
-        "geo_distribution": out_dir / "snapshot_1_geo_distribution.png",
-        "country_split": out_dir / "snapshot_2_country_split.png",
-        "package_distribution": out_dir / "snapshot_3_package_distribution.png",
-        "subscription_status": out_dir / "snapshot_4_subscription_status.png",
-        "billing_cycle": out_dir / "snapshot_5_billing_cycle.png",
-        "customer_creation_timeline": out_dir / "snapshot_6_customer_creation_timeline.png",
-    }
-
-    # 1) Geographic distribution
-    fig, ax = _new_figure()
-    ca_x, ca_y, us_x, us_y, unk_x, unk_y = [], [], [], [], [], []
-
-    for p in customer_points:
-        lat = p.get("lat")
-        lon = p.get("lon")
-        if lat is None or lon is None:
-            continue
-
-        if p.get("country") == "Canada":
-            ca_x.append(lon)
-            ca_y.append(lat)
-        elif p.get("country") == "USA":
-            us_x.append(lon)
-            us_y.append(lat)
-        else:
-            unk_x.append(lon)
-            unk_y.append(lat)
-
-    print(f"DEBUG CHART 1: Canada points={len(ca_x)}, USA points={len(us_x)}, Unknown points={len(unk_x)}")
-
-    if ca_x:
-        ax.scatter(
-            ca_x,
-            ca_y,
-            s=22,
-            c=GREEN,
-            alpha=0.95,
-            linewidths=0.0,
-            label="Canada",
-        )
-    if us_x:
-        ax.scatter(
-            us_x,
-            us_y,
-            s=22,
-            c=GREEN,
-            alpha=0.55,
-            linewidths=0.0,
-            label="USA",
-        )
-    if unk_x:
-        ax.scatter(
-            unk_x,
-            unk_y,
-            s=22,
-            c=GREEN,
-            alpha=0.30,
-            linewidths=0.0,
-            label="Unknown",
-        )
-
-    ax.set_title(
-        f"Snapshot 1 - Geographic Distribution ({postal_distribution or 'n/a'})",
-        color=GREEN,
-        fontsize=14,
-        fontweight="bold",
-    )
-    ax.set_xlabel("Longitude", color=GREEN)
-    ax.set_ylabel("Latitude", color=GREEN)
-
-    if ca_x or us_x or unk_x:
-        legend = ax.legend(facecolor=BG, edgecolor=GREEN)
-        _style_legend(legend)
-    else:
-        ax.text(0.5, 0.5, "No valid geo points", ha="center", va="center", color=GREEN, fontsize=14)
-
-    _save(fig, paths["geo_distribution"])
-
-    # 2) Country split
-    fig, ax = _new_figure()
-    country_counts = Counter(
-        p["country"]
-        for p in customer_points
-        if p.get("country") and p.get("lat") is not None and p.get("lon") is not None
-    )
-    print(f"DEBUG CHART 2: country_counts={country_counts}")
-
-    if country_counts:
-        labels = list(country_counts.keys())
-        values = list(country_counts.values())
-
-        wedges, texts, autotexts = ax.pie(
-            values,
-            labels=labels,
-            autopct="%1.1f%%",
-            startangle=90,
-            colors=[GREEN] * len(values),
-            wedgeprops={"edgecolor": BG, "linewidth": 1.5},
-            textprops={"color": GREEN, "fontsize": 11},
-        )
-
-        alphas = [1.0, 0.65, 0.35, 0.20]
-        for idx, wedge in enumerate(wedges):
-            wedge.set_alpha(alphas[idx % len(alphas)])
-
-        for t in texts:
-            t.set_color(GREEN)
-        for t in autotexts:
-            t.set_color(BG)
-            t.set_fontweight("bold")
-
-        ax.set_title("Snapshot 2 - Country Split", color=GREEN, fontsize=14, fontweight="bold")
-        ax.set_facecolor(BG)
-    else:
-        ax.text(0.5, 0.5, "No country data", ha="center", va="center", color=GREEN, fontsize=14)
-        ax.set_axis_off()
-
-    _save(fig, paths["country_split"])
-
-    # 3) Package distribution
-    fig, ax = _new_figure(figsize=(13, 8))
-    pkg_counts = Counter()
-    for row in subscription_rows:
-        pkg_id = row.get("package_id")
-        if pkg_id is None:
-            continue
-        pkg_name = package_lookup.get(pkg_id, f"Package {pkg_id}")
-        pkg_counts[pkg_name] += 1
-
-    print(f"DEBUG CHART 3: pkg_counts={pkg_counts}")
-
-    if pkg_counts:
-        pairs = sorted(pkg_counts.items(), key=lambda x: x[1], reverse=True)
-        labels = [p[0] for p in pairs]
-        values = [p[1] for p in pairs]
-
-        bars = ax.bar(labels, values, color=GREEN, edgecolor=GREEN, linewidth=1.0, alpha=0.85)
-        for i, bar in enumerate(bars):
-            bar.set_alpha([1.0, 0.9, 0.75, 0.6][i % 4])
-
-        ax.set_title("Snapshot 3 - Package Distribution", color=GREEN, fontsize=14, fontweight="bold")
-        ax.set_xlabel("Package", color=GREEN)
-        ax.set_ylabel("Subscriptions", color=GREEN)
-        ax.tick_params(axis="x", rotation=30, colors=GREEN)
-    else:
-        ax.text(0.5, 0.5, "No package data", ha="center", va="center", color=GREEN, fontsize=14)
-        ax.set_axis_off()
-
-    _save(fig, paths["package_distribution"])
-
-    # 4) Subscription status
-    fig, ax = _new_figure()
-    status_counts = Counter(
-        row["status"]
-        for row in subscription_rows
-        if row.get("status") not in (None, "", "Unknown")
-    )
-    print(f"DEBUG CHART 4: status_counts={status_counts}")
-
-    if status_counts:
-        labels = list(status_counts.keys())
-        values = list(status_counts.values())
-
-        wedges, texts, autotexts = ax.pie(
-            values,
-            labels=labels,
-            autopct="%1.1f%%",
-            startangle=90,
-            colors=[GREEN] * len(values),
-            wedgeprops={"edgecolor": BG, "linewidth": 1.5},
-            textprops={"color": GREEN, "fontsize": 11},
-        )
-
-        alphas = [1.0, 0.8, 0.55, 0.35, 0.2]
-        for idx, wedge in enumerate(wedges):
-            wedge.set_alpha(alphas[idx % len(alphas)])
-
-        for t in texts:
-            t.set_color(GREEN)
-        for t in autotexts:
-            t.set_color(BG)
-            t.set_fontweight("bold")
-
-        ax.set_title("Snapshot 4 - Subscription Status", color=GREEN, fontsize=14, fontweight="bold")
-        ax.set_facecolor(BG)
-    else:
-        ax.text(0.5, 0.5, "No status data", ha="center", va="center", color=GREEN, fontsize=14)
-        ax.set_axis_off()
-
-    _save(fig, paths["subscription_status"])
-
-    # 5) Billing cycle
-    fig, ax = _new_figure()
-    cycle_counts = Counter(
-        row["cycle"]
-        for row in subscription_rows
-        if row.get("cycle") not in (None, "", "Unknown")
-    )
-    print(f"DEBUG CHART 5: cycle_counts={cycle_counts}")
-
-    if cycle_counts:
-        pairs = sorted(cycle_counts.items(), key=lambda x: x[0])
-        labels = [p[0] for p in pairs]
-        values = [p[1] for p in pairs]
-
-        bars = ax.bar(labels, values, color=GREEN, edgecolor=GREEN, linewidth=1.0, alpha=0.85)
-        for i, bar in enumerate(bars):
-            bar.set_alpha([1.0, 0.7, 0.5][i % 3])
-
-        ax.set_title("Snapshot 5 - Billing Cycle", color=GREEN, fontsize=14, fontweight="bold")
-        ax.set_xlabel("Cycle", color=GREEN)
-        ax.set_ylabel("Subscriptions", color=GREEN)
-    else:
-        ax.text(0.5, 0.5, "No cycle data", ha="center", va="center", color=GREEN, fontsize=14)
-        ax.set_axis_off()
-
-    _save(fig, paths["billing_cycle"])
-
-    # 6) Customer creation timeline
-    fig, ax = _new_figure(figsize=(14, 8))
-    month_counts = defaultdict(int)
-    for p in customer_points:
-        dt = p.get("created")
-        if dt:
-            month_counts[dt.strftime("%Y-%m")] += 1
-
-    print(f"DEBUG CHART 6: month_counts={dict(month_counts)}")
-
-    if month_counts:
-        labels = sorted(month_counts.keys())
-        values = [month_counts[k] for k in labels]
-
-        bars = ax.bar(labels, values, color=GREEN, edgecolor=GREEN, linewidth=1.0, alpha=0.85)
-        for i, bar in enumerate(bars):
-            bar.set_alpha(0.55 + (0.45 * ((i % 4) / 3.0)))
-
-        ax.set_title("Snapshot 6 - Customer Creation Timeline", color=GREEN, fontsize=14, fontweight="bold")
-        ax.set_xlabel("Year-Month", color=GREEN)
-        ax.set_ylabel("Customers", color=GREEN)
-        ax.tick_params(axis="x", rotation=45, colors=GREEN)
-    else:
-        ax.text(0.5, 0.5, "No timeline data", ha="center", va="center", color=GREEN, fontsize=14)
-        ax.set_axis_off()
-
-    _save(fig, paths["customer_creation_timeline"])
-
-    return {key: str(path) for key, path in paths.items()}
-
-
 # ============================================================
 # SNAPSHOT ORCHESTRATOR
 # ============================================================
@@ -546,56 +97,15 @@ def generate_snapshots_inline(
     package_lookup: dict[Any, str],
     output_dir: str | Path = SNAPSHOT_OUTPUT_DIR,
     postal_distribution: str | None = None,
-    subscription_distribution: str | None = None,
 ) -> dict[str, str]:
-    print("DEBUG SG 1: generate_snapshots_inline() entered")
-
-    out_dir = _snap_ensure_output_dir(output_dir)
-    print(f"DEBUG SG 2: output dir = {out_dir}")
-
-    test_file = out_dir / "snapshot_test.txt"
-    test_file.write_text("snapshot generator inline ran", encoding="utf-8")
-    print(f"DEBUG SG 3: wrote test file = {test_file}")
-
-    customer_points = _snap_extract_customer_points(customers)
-    subscription_rows = _snap_extract_subscription_rows(subscriptions)
-
-    print("========== SNAPSHOT DEBUG ==========")
-    print(f"customers arg count: {len(customers)}")
-    print(f"subscriptions arg count: {len(subscriptions)}")
-    print(f"customer_points count: {len(customer_points)}")
-    print(f"subscription_rows count: {len(subscription_rows)}")
-
-    valid_geo = [p for p in customer_points if p.get('lat') is not None and p.get('lon') is not None]
-    print(f"valid_geo count: {len(valid_geo)}")
-
-    valid_created = [p for p in customer_points if p.get('created') is not None]
-    print(f"valid_created count: {len(valid_created)}")
-
-    valid_pkg = [r for r in subscription_rows if r.get('package_id') is not None]
-    print(f"valid package rows: {len(valid_pkg)}")
-
-    valid_cycle = [r for r in subscription_rows if r.get('cycle') not in (None, '', 'Unknown')]
-    print(f"valid cycle rows: {len(valid_cycle)}")
-
-    valid_status = [r for r in subscription_rows if r.get('status') not in (None, '', 'Unknown')]
-    print(f"valid status rows: {len(valid_status)}")
-
-    print("sample customer_points:", customer_points[:5])
-    print("sample subscription_rows:", subscription_rows[:5])
-    print("package_lookup:", package_lookup)
-    print("====================================")
-
-    result = _generate_snapshots_with_matplotlib(
-        customer_points=customer_points,
-        subscription_rows=subscription_rows,
+    return generate_snapshots(
+        customers=customers,
+        subscriptions=subscriptions,
         package_lookup=package_lookup,
-        out_dir=out_dir,
+        output_dir=output_dir,
         postal_distribution=postal_distribution,
-        subscription_distribution=subscription_distribution,
+        theme=SNAPSHOT_THEME,
     )
-    print("✅ Snapshot images generated with matplotlib.")
-    return result
 
 
 # ============================================================
@@ -789,14 +299,16 @@ US_WEST_CENTERS = [
 ]
 
 
+CA_SUBURBAN_CENTERS = CA_CITY_CENTERS + CA_SECONDARY_CENTERS
+US_SUBURBAN_CENTERS = US_CITY_CENTERS + US_SECONDARY_CENTERS
+
+
 def weighted_choice_city(city_rows):
-    weights = [row[3] for row in city_rows]
-    return random.choices(city_rows, weights=weights, k=1)[0]
+    return cached_sampler(city_rows, weight_index=3).draw()
 
 
 def weighted_choice_region(rows):
-    weights = [row[-1] for row in rows]
-    return random.choices(rows, weights=weights, k=1)[0]
+    return cached_sampler(rows, weight_index=-1).draw()
 
 
 def rand_ca_lat_lon() -> tuple[float, float]:
@@ -868,10 +380,10 @@ def generate_secondary_city_postal_and_coords(ca_ratio: float = 0.45) -> tuple[s
 def generate_suburban_postal_and_coords(ca_ratio: float = 0.45) -> tuple[str, float, float]:
     country = pick_country(ca_ratio=ca_ratio)
     if country == "CA":
-        _, lat, lon, _ = weighted_choice_city(CA_CITY_CENTERS + CA_SECONDARY_CENTERS)
+        _, lat, lon, _ = weighted_choice_city(CA_SUBURBAN_CENTERS)
         lat, lon = jitter_coord(lat, lon, lat_jitter=0.55, lon_jitter=0.70)
         return make_postal_for_country("CA"), lat, lon
-    _, lat, lon, _ = weighted_choice_city(US_CITY_CENTERS + US_SECONDARY_CENTERS)
+    _, lat, lon, _ = weighted_choice_city(US_SUBURBAN_CENTERS)
     lat, lon = jitter_coord(lat, lon, lat_jitter=0.65, lon_jitter=0.80)
     return make_postal_for_country("US"), lat, lon
 
@@ -953,10 +465,16 @@ def generate_rural_heavy_postal_and_coords(ca_ratio: float = 0.45) -> tuple[str,
     return generate_urban_postal_and_coords(ca_ratio=ca_ratio)
 
 
+@lru_cache(maxsize=None)
+def _warn_unknown_postal_distribution(dist_name: str) -> None:
+    # called per customer; warn once per name
+    log.warning("⚠️ Unknown SEED_POSTAL_DISTRIBUTION='%s', falling back to 'mixed_realistic'", dist_name)
+
+
 def generate_postal_and_coords(dist_name: str) -> tuple[str, float, float]:
     dist_name = (dist_name or "mixed_realistic").strip() or "mixed_realistic"
     if dist_name not in POSTAL_DISTRIBUTIONS:
-        print(f"⚠️ Unknown SEED_POSTAL_DISTRIBUTION='{dist_name}', falling back to 'mixed_realistic'")
+        _warn_unknown_postal_distribution(dist_name)
         dist_name = "mixed_realistic"
 
     if dist_name == "urban_only":
@@ -1055,6 +573,7 @@ def maybe_reset_db(cur):
     existing = set(list_tables(cur))
     preferred_order = [
         "Payment",
+        "PaymentGenerationState",
         "Subscription",
         "Customer",
         "Package",
@@ -1066,12 +585,44 @@ def maybe_reset_db(cur):
     to_truncate = [t for t in preferred_order if t in existing]
 
     if not to_truncate:
-        print("ℹ️ SEED_RESET=1 but no known tables found to truncate.")
+        log.info("ℹ️ SEED_RESET=1 but no known tables found to truncate.")
         return
 
     quoted = ", ".join([f'"{t}"' for t in to_truncate])
     cur.execute(f"TRUNCATE {quoted} RESTART IDENTITY CASCADE;")
-    print(f"🧹 Reset DB: truncated {len(to_truncate)} tables ({', '.join(to_truncate)}).")
+    log.info("🧹 Reset DB: truncated %d tables (%s).", len(to_truncate), ", ".join(to_truncate))
+
+
+# ============================================================
+# ROW STORAGE
+# ============================================================
+def store_rows(
+    cur,
+    table: str,
+    rows: list[dict],
+    returning_col: str | None = None,
+    *,
+    first_id: int = 1,
+    sink: SeedFileWriter | None = None,
+) -> list:
+    """
+    insert_many(), except:
+      - with a sink (SEED_OUTPUT=files): the rows go to the sink's files and it numbers the ids
+      - in a dry run (cur is None): nothing is written and, if returning_col is
+        given, the rows are numbered from first_id the way a fresh sequence would
+    """
+    if sink is not None:
+        ids = sink.write(table, rows)
+        return ids if returning_col else []
+    if cur is None:
+        return list(range(first_id, first_id + len(rows))) if returning_col else []
+
+    started = time.perf_counter()
+    ids = insert_many(cur, table, rows, returning_col=returning_col)
+    metrics = current_metrics()
+    if metrics:
+        metrics.add_insert_time(time.perf_counter() - started)
+    return ids
 
 
 # ============================================================
@@ -1096,7 +647,9 @@ def _build_package_lookup(pkg_ids: list[int]) -> dict[int, str]:
 # ============================================================
 # SEED PACKAGES
 # ============================================================
-def seed_packages(cur, schema: Schema, n: int) -> tuple[list[int], dict[int, dict[str, int]], dict[int, str]]:
+def seed_packages(
+    cur, schema: Schema, n: int, *, sink: SeedFileWriter | None = None
+) -> tuple[list[int], dict[int, dict[str, int]], dict[int, str]]:
     pkg_cols = schema.pkg_cols
     PACKAGE_T = schema.PACKAGE_T
 
@@ -1136,28 +689,13 @@ def seed_packages(cur, schema: Schema, n: int) -> tuple[list[int], dict[int, dic
             raise SystemExit(f'{PACKAGE_T}: no recognized columns to insert.')
         package_rows.append(row)
 
-    pkg_ids = insert_many(cur, PACKAGE_T, package_rows, returning_col=pkg_pk)
+    pkg_ids = store_rows(cur, PACKAGE_T, package_rows, returning_col=pkg_pk, sink=sink)
 
+    # costs of the packages just inserted (no need to read them back)
     pkg_costs: dict[int, dict[str, int]] = {}
     if pkg_monthly_col or pkg_annual_col:
-        select_cols = [f'"{pkg_pk}"']
-        if pkg_monthly_col:
-            select_cols.append(f'"{pkg_monthly_col}"')
-        if pkg_annual_col:
-            select_cols.append(f'"{pkg_annual_col}"')
-
-        cur.execute(f'SELECT {",".join(select_cols)} FROM "{PACKAGE_T}"')
-        for r in cur.fetchall():
-            pid = r[0]
-            idx = 1
-            monthly = None
-            annual = None
-            if pkg_monthly_col:
-                monthly = r[idx]
-                idx += 1
-            if pkg_annual_col:
-                annual = r[idx] if idx < len(r) else None
-            pkg_costs[pid] = {"MONTHLY": monthly, "ANNUAL": annual}
+        for pid, row in zip(pkg_ids, package_rows):
+            pkg_costs[pid] = {"MONTHLY": row.get(pkg_monthly_col), "ANNUAL": row.get(pkg_annual_col)}
 
     package_lookup = _build_package_lookup(pkg_ids)
     return pkg_ids, pkg_costs, package_lookup
@@ -1166,13 +704,85 @@ def seed_packages(cur, schema: Schema, n: int) -> tuple[list[int], dict[int, dic
 # ============================================================
 # SEED CUSTOMERS
 # ============================================================
-def seed_customers(cur, schema: Schema, n: int, postal_dist_name: str) -> tuple[list[int], list[dict]]:
-    cust_cols = schema.cust_cols
-    CUSTOMER_T = schema.CUSTOMER_T
+# Customers/subscriptions are generated and inserted this many at a time.
+# This is also the shard size for SEED_WORKERS (see parallel.py).
+SEED_CHUNK_SIZE = int(os.environ.get("SEED_CHUNK_SIZE", "50000"))
+
+
+class SnapshotCustomers:
+    """
+    Compact column store of the customer fields the snapshots need
+    (country, lat/lon, member-since date), one fixed-width slot per customer.
+    Iterating or indexing yields the same dicts the snapshot helpers accept.
+    """
+
+    def __init__(self):
+        self.is_ca = array("b")
+        self.lat = array("d")
+        self.lon = array("d")
+        self.created = array("l")  # date.toordinal()
+
+    def append(self, postal_code: str, lat: float, lon: float, created_dt: date) -> None:
+        self.is_ca.append(1 if infer_country_from_postal(postal_code) == "Canada" else 0)
+        self.lat.append(lat)
+        self.lon.append(lon)
+        self.created.append(created_dt.toordinal())
+
+    def extend(self, other: "SnapshotCustomers") -> None:
+        self.is_ca.extend(other.is_ca)
+        self.lat.extend(other.lat)
+        self.lon.extend(other.lon)
+        self.created.extend(other.created)
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """(is_ca, lat, lon, created ordinal) as NumPy copies of the columns."""
+        return (
+            np.frombuffer(self.is_ca, dtype=np.int8).copy(),
+            np.frombuffer(self.lat, dtype=np.float64).copy(),
+            np.frombuffer(self.lon, dtype=np.float64).copy(),
+            np.frombuffer(self.created, dtype=self.created.typecode).astype(np.int64),
+        )
+
+    def _row(self, i: int) -> dict[str, Any]:
+        return {
+            "country": "Canada" if self.is_ca[i] else "USA",
+            "latitude": self.lat[i],
+            "longitude": self.lon[i],
+            "memberSince": date.fromordinal(self.created[i]),
+        }
 
-    cust_pk = pick_col(cust_cols, ["id", "customerId", "customerID"])
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._row(i) for i in range(*key.indices(len(self)))]
+        return self._row(range(len(self))[key])
+
+
+def _iter_chunks(n: int, chunk_size: int, make_item):
+    for start in range(0, n, chunk_size):
+        yield [make_item() for _ in range(min(chunk_size, n - start))]
+
+
+def customer_pk_col(schema: Schema) -> str:
+    cust_pk = pick_col(schema.cust_cols, ["id", "customerId", "customerID"])
     if not cust_pk:
         raise SystemExit("Could not detect Customer PK column.")
+    return cust_pk
+
+
+def customer_row_factory(schema: Schema, postal_dist_name: str, snapshot_customers: SnapshotCustomers):
+    """
+    Returns a no-arg function producing one random Customer row dict
+    (without the PK) and recording its snapshot fields.
+    """
+    cust_cols = schema.cust_cols
+    CUSTOMER_T = schema.CUSTOMER_T
 
     cust_first_col = pick_col(cust_cols, ["firstName", "first_name"])
     cust_last_col = pick_col(cust_cols, ["lastName", "last_name"])
@@ -1187,10 +797,7 @@ def seed_customers(cur, schema: Schema, n: int, postal_dist_name: str) -> tuple[
     if not cust_postal_col:
         raise SystemExit(f'{CUSTOMER_T}: postalCode is required by schema but was not detected. Cols={sorted(list(cust_cols))}')
 
-    customer_rows = []
-    snapshot_customers = []
-
-    for _ in range(n):
+    def _make_customer() -> dict:
         first = rand_first()
         last = rand_last()
         full = f"{first} {last}"
@@ -1220,45 +827,102 @@ def seed_customers(cur, schema: Schema, n: int, postal_dist_name: str) -> tuple[
         if cust_cc_exp_col:
             row[cust_cc_exp_col] = cc_exp_from_created(created_dt)
 
-        if not row:
-            raise SystemExit(f'{CUSTOMER_T}: no recognized columns to insert.')
+        snapshot_customers.append(postal_code, lat, lon, created_dt)
+        return row
 
-        customer_rows.append(row)
-        snapshot_customers.append(
-            {
-                "postalCode": postal_code,
-                "latitude": lat,
-                "longitude": lon,
-                "memberSince": created_dt,
-            }
+    return _make_customer
+
+
+def seed_customers(
+    cur, schema: Schema, n: int, postal_dist_name: str, *, sink: SeedFileWriter | None = None
+) -> tuple[array, SnapshotCustomers]:
+    cust_pk = customer_pk_col(schema)
+
+    cust_ids = array("q")
+    snapshot_customers = SnapshotCustomers()
+    make_customer = customer_row_factory(schema, postal_dist_name, snapshot_customers)
+
+    for chunk in _iter_chunks(n, SEED_CHUNK_SIZE, make_customer):
+        cust_ids.extend(
+            store_rows(cur, schema.CUSTOMER_T, chunk, returning_col=cust_pk, first_id=len(cust_ids) + 1, sink=sink)
         )
 
-    print("===== seed_customers DEBUG =====")
-    print(f"snapshot_customers count: {len(snapshot_customers)}")
-    print("sample snapshot_customers:", snapshot_customers[:5])
-    print("================================")
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("seed_customers: %d snapshot customers, sample: %s", len(snapshot_customers), snapshot_customers[:5])
 
-    cust_ids = insert_many(cur, CUSTOMER_T, customer_rows, returning_col=cust_pk)
     return cust_ids, snapshot_customers
 
 
 # ============================================================
 # SEED SUBSCRIPTIONS
 # ============================================================
-def seed_subscriptions(
-    cur,
-    schema: Schema,
-    n: int,
-    cust_ids: list[int],
-    pkg_ids: list[int],
-    pkg_costs: dict[int, dict[str, int]],
-    dist_name: str,
-) -> list[dict]:
+class SnapshotSubscriptions:
+    """
+    Keeps the sampled SubscriptionBatch chunks (NumPy columns) for the snapshots
+    instead of one dict per subscription. Iterating or indexing yields the
+    same dicts the snapshot helpers accept.
+    """
+
+    def __init__(self):
+        self.batches: list[SubscriptionBatch] = []
+
+    def add_batch(self, batch: SubscriptionBatch) -> None:
+        self.batches.append(batch)
+
+    def __len__(self) -> int:
+        return sum(len(b) for b in self.batches)
+
+    def columns(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(package_ids, cycles, statuses) over all batches."""
+        if not self.batches:
+            return np.array([], dtype=np.int64), np.array([], dtype=str), np.array([], dtype=str)
+        return (
+            np.concatenate([b.package_ids for b in self.batches]),
+            np.concatenate([b.cycles for b in self.batches]),
+            np.concatenate([b.statuses for b in self.batches]),
+        )
+
+    def __iter__(self):
+        for b in self.batches:
+            for cust_id, pkg_id, cycle, status, start_dt in zip(
+                b.customer_ids.tolist(),
+                b.package_ids.tolist(),
+                b.cycles.tolist(),
+                b.statuses.tolist(),
+                b.start_dts.tolist(),
+            ):
+                yield {
+                    "packageID": pkg_id,
+                    "billingCycle": cycle,
+                    "status": status,
+                    "startDate": start_dt,
+                    "customerID": cust_id,
+                }
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return list(islice(self, *key.indices(len(self))))
+        return next(islice(self, range(len(self))[key], None))
+
+
+@dataclass
+class SubscriptionCols:
+    SUB_T: str
+    cust_fk: str
+    pkg_fk: str
+    start: str
+    cycle: str | None
+    status: str | None
+    price: str | None
+    allowed_statuses: list[str]
+
+
+def detect_subscription_cols(cur, schema: Schema) -> SubscriptionCols:
     sub_cols = schema.sub_cols
     SUB_T = schema.SUB_T
 
-    sub_cust_fk = pick_col(sub_cols, ["customerID", "customerId", "customer_id"])
-    sub_pkg_fk = pick_col(sub_cols, ["packageID", "packageId", "package_id"])
+    sub_cust_fk = find_fk_column(cur, SUB_T, schema.CUSTOMER_T) or pick_col(sub_cols, ["customerID", "customerId", "customer_id"])
+    sub_pkg_fk = find_fk_column(cur, SUB_T, schema.PACKAGE_T) or pick_col(sub_cols, ["packageID", "packageId", "package_id"])
     if not sub_cust_fk or not sub_pkg_fk:
         raise SystemExit(f"Could not detect Subscription FK columns. Cols={sorted(list(sub_cols))}")
 
@@ -1272,11 +936,29 @@ def seed_subscriptions(
     if not sub_start_col:
         raise SystemExit(f'{SUB_T}: could not find a start date column (startDate/createdAt). Cols={sorted(list(sub_cols))}')
 
-    if not cust_ids or not pkg_ids:
+    return SubscriptionCols(
+        SUB_T=SUB_T,
+        cust_fk=sub_cust_fk,
+        pkg_fk=sub_pkg_fk,
+        start=sub_start_col,
+        cycle=sub_cycle_col,
+        status=sub_status_col,
+        price=sub_price_col,
+        allowed_statuses=allowed_statuses,
+    )
+
+
+def build_subscription_sampler(
+    dist_name: str,
+    cols: SubscriptionCols,
+    cust_ids: Sequence[int],
+    pkg_ids: Sequence[int],
+) -> SubscriptionSampler:
+    if not len(cust_ids) or not len(pkg_ids):
         raise SystemExit("Cannot seed subscriptions: cust_ids or pkg_ids is empty.")
 
-    if dist_name not in ("uniform", "popular_packages", "heavy_monthly", "realistic_default"):
-        print(f"⚠️ Unknown SEED_DISTRIBUTION='{dist_name}', falling back to 'uniform'")
+    if dist_name not in DISTRIBUTIONS:
+        log.warning("⚠️ Unknown SEED_DISTRIBUTION='%s', falling back to 'uniform'", dist_name)
         dist_name = "uniform"
 
     pkg_weights = None
@@ -1291,58 +973,88 @@ def seed_subscriptions(
     cycle_weights = (85, 15)
     status_weights_by_key = {"ACTIVE": 85, "CANCEL": 10, "PAST": 5, "OTHER": 3}
 
-    sub_rows = []
-    snapshot_subscriptions = []
-
-    for _ in range(n):
-        pick = pick_subscription_by_distribution(
-            dist_name,
-            cust_ids=cust_ids,
-            pkg_ids=pkg_ids,
-            allowed_statuses=allowed_statuses,
-            pkg_weights=pkg_weights,
-            cust_weights=cust_weights,
-            cycle_weights=cycle_weights,
-            status_weights_by_key=status_weights_by_key,
-            max_days_back=1200,
-            recent_mean_days=180,
-        )
-
-        cycle = pick.cycle if sub_cycle_col else "MONTHLY"
-        row = {sub_cust_fk: pick.customer_id, sub_pkg_fk: pick.package_id}
+    return SubscriptionSampler(
+        dist_name,
+        cust_ids=cust_ids,
+        pkg_ids=pkg_ids,
+        allowed_statuses=cols.allowed_statuses,
+        pkg_weights=pkg_weights,
+        cust_weights=cust_weights,
+        cycle_weights=cycle_weights,
+        status_weights_by_key=status_weights_by_key,
+        max_days_back=1200,
+        recent_mean_days=180,
+    )
 
-        if sub_cycle_col:
-            row[sub_cycle_col] = cycle
-        row[sub_start_col] = pick.start_dt
 
-        if sub_status_col:
-            row[sub_status_col] = pick.status if allowed_statuses else "ACTIVE"
+def sample_subscription_rows(
+    sampler: SubscriptionSampler,
+    cols: SubscriptionCols,
+    n: int,
+    pkg_costs: dict[int, dict[str, int]],
+) -> tuple[SubscriptionBatch, list[dict]]:
+    batch = sampler.sample(n)
+    if not cols.cycle:
+        batch = replace(batch, cycles=np.full(len(batch), "MONTHLY"))
 
-        if sub_price_col:
+    sub_rows = []
+    for cust_id, pkg_id, cycle, status, start_dt in zip(
+        batch.customer_ids.tolist(),
+        batch.package_ids.tolist(),
+        batch.cycles.tolist(),
+        batch.statuses.tolist(),
+        batch.start_dts.tolist(),
+    ):
+        row = {cols.cust_fk: cust_id, cols.pkg_fk: pkg_id}
+
+        if cols.cycle:
+            row[cols.cycle] = cycle
+        row[cols.start] = start_dt
+
+        if cols.status:
+            row[cols.status] = status
+
+        if cols.price:
             price = None
-            if pick.package_id in pkg_costs:
-                price = pkg_costs[pick.package_id].get(cycle)
+            if pkg_id in pkg_costs:
+                price = pkg_costs[pkg_id].get(cycle)
             if price is None:
                 price = 29 if cycle == "MONTHLY" else 299
-            row[sub_price_col] = price
+            row[cols.price] = price
 
         sub_rows.append(row)
-        snapshot_subscriptions.append(
-            {
-                "packageID": pick.package_id,
-                "billingCycle": cycle,
-                "status": pick.status if allowed_statuses else "ACTIVE",
-                "startDate": pick.start_dt,
-                "customerID": pick.customer_id,
-            }
-        )
 
-    print("===== seed_subscriptions DEBUG =====")
-    print(f"snapshot_subscriptions count: {len(snapshot_subscriptions)}")
-    print("sample snapshot_subscriptions:", snapshot_subscriptions[:5])
-    print("====================================")
+    return batch, sub_rows
+
+
+def seed_subscriptions(
+    cur,
+    schema: Schema,
+    n: int,
+    cust_ids: Sequence[int],
+    pkg_ids: list[int],
+    pkg_costs: dict[int, dict[str, int]],
+    dist_name: str,
+    *,
+    sink: SeedFileWriter | None = None,
+) -> SnapshotSubscriptions:
+    cols = detect_subscription_cols(cur, schema)
+    sampler = build_subscription_sampler(dist_name, cols, cust_ids, pkg_ids)
+
+    snapshot_subscriptions = SnapshotSubscriptions()
+
+    for start in range(0, n, SEED_CHUNK_SIZE):
+        batch, sub_rows = sample_subscription_rows(sampler, cols, min(SEED_CHUNK_SIZE, n - start), pkg_costs)
+        store_rows(cur, cols.SUB_T, sub_rows, sink=sink)
+        snapshot_subscriptions.add_batch(batch)
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug(
+            "seed_subscriptions: %d snapshot subscriptions, sample: %s",
+            len(snapshot_subscriptions),
+            snapshot_subscriptions[:5],
+        )
 
-    insert_many(cur, SUB_T, sub_rows, returning_col=None)
     return snapshot_subscriptions
 
 
@@ -1352,7 +1064,7 @@ def seed_subscriptions(
 def seed_analytics_definitions(cur):
     ANALYTICS_DEF_T = find_table(cur, ["AnalyticsDefinition", "analyticsdefinition", "analytics_definitions", "analyticsDefinitions"])
     if not ANALYTICS_DEF_T:
-        print("ℹ️ AnalyticsDefinition table not found; skipping analytics definitions seed.")
+        log.info("ℹ️ AnalyticsDefinition table not found; skipping analytics definitions seed.")
         return
 
     cols = get_table_columns(cur, ANALYTICS_DEF_T)
@@ -1363,12 +1075,16 @@ def seed_analytics_definitions(cur):
     updated_col = pick_col(cols, ["updatedAt", "updated_at"])
 
     if not name_col or not json_col:
-        print(f"⚠️ {ANALYTICS_DEF_T}: missing required columns (need analyticsName + nameOfJSONFile). Cols={sorted(list(cols))}")
+        log.warning(
+            "⚠️ %s: missing required columns (need analyticsName + nameOfJSONFile). Cols=%s",
+            ANALYTICS_DEF_T,
+            sorted(cols),
+        )
         return
 
     cur.execute(f'SELECT COUNT(*) FROM "{ANALYTICS_DEF_T}"')
     if cur.fetchone()[0] > 0:
-        print(f"ℹ️ Seed skipped: {ANALYTICS_DEF_T} already has rows.")
+        log.info("ℹ️ Seed skipped: %s already has rows.", ANALYTICS_DEF_T)
         return
 
     now = datetime.now(timezone.utc)
@@ -1390,13 +1106,13 @@ def seed_analytics_definitions(cur):
     ]
 
     insert_many(cur, ANALYTICS_DEF_T, rows, returning_col=None)
-    print(f"✅ Seeded {len(rows)} analytics definitions into {ANALYTICS_DEF_T}.")
+    log.info("✅ Seeded %d analytics definitions into %s.", len(rows), ANALYTICS_DEF_T)
 
 
 # ============================================================
 # PAYMENTS
 # ============================================================
-def run_payments_after_seed(cur, schema: Schema):
+def run_payments_after_seed(cur, schema: Schema, *, incremental: bool = True) -> int:
     vs = VerifySchema(
         sub_table=schema.SUB_T,
         cust_table=schema.CUSTOMER_T,
@@ -1417,10 +1133,110 @@ def run_payments_after_seed(cur, schema: Schema):
     )
 
     if not vs.sub_cust_fk or not vs.sub_start_col:
-        print("⚠️ Payment insert skipped: missing required Subscription columns for customer/startDate.")
-        return
+        log.warning("⚠️ Payment insert skipped: missing required Subscription columns for customer/startDate.")
+        return 0
+
+    return insert_due_payments(cur, vs, days_ahead=7, incremental=incremental, quiet=False)
 
-    insert_due_payments(cur, vs, days_ahead=7, quiet=False)
+
+def write_due_payments_to_files(
+    sink: SeedFileWriter,
+    schema: Schema,
+    snapshot_subscriptions: SnapshotSubscriptions,
+    *,
+    days_ahead: int = 7,
+) -> int:
+    """
+    Payments for SEED_OUTPUT=files, computed from the subscription batches
+    (the sink numbered subscriptions 1..n in batch order).
+    """
+    pay = detect_payment_schema(None)
+    cols = detect_subscription_cols(None, schema)
+    status_value = due_status_value(None, pay)
+
+    written = 0
+    first_sub_id = 1
+    for batch in snapshot_subscriptions.batches:
+        sub_ids = np.arange(first_sub_id, first_sub_id + len(batch), dtype=np.int64)
+        first_sub_id += len(batch)
+
+        rows = due_payment_rows(
+            pay,
+            status_value,
+            sub_ids,
+            batch.start_dts,
+            batch.cycles if cols.cycle else None,
+            batch.statuses if cols.status else None,
+            days_ahead=days_ahead,
+        )
+        sink.write(pay.PAY_T, rows)
+        written += len(rows)
+    return written
+
+
+def run_dry_seed(cfg, dist_name: str, postal_dist_name: str) -> None:
+    """
+    SEED_DRY_RUN=1 or SEED_OUTPUT=files:/path: generates the same data as
+    run_seed() with no database. Schema comes from the prisma_schema_to_json.py
+    output and ids are numbered from 1. With SEED_OUTPUT the packages,
+    customers, subscriptions and due payments are written as file shards
+    (see seed_files.py) and the snapshots go to <path>/snapshots; otherwise
+    only the snapshots are written, to DRY_RUN_SNAPSHOT_DIR. Neither touches
+    the snapshots served for the database.
+    """
+    schema = detect_schema(None)
+
+    sink = None
+    if cfg.seed_output:
+        pay = detect_payment_schema(None)
+        sink = SeedFileWriter(
+            cfg.seed_output,
+            id_cols={
+                schema.PACKAGE_T: pick_col(schema.pkg_cols, ["id", "packageId", "packageID"]),
+                schema.CUSTOMER_T: customer_pk_col(schema),
+                schema.SUB_T: pick_col(schema.sub_cols, ["id", "subscriptionId", "subscriptionID"]),
+                pay.PAY_T: pick_col(pay.pay_cols, ["id", "paymentId", "paymentID"]),
+            },
+        )
+
+    pkg_ids, pkg_costs, package_lookup = seed_packages(None, schema, cfg.seed_packages, sink=sink)
+    cust_ids, snapshot_customers = seed_customers(None, schema, cfg.seed_customers, postal_dist_name, sink=sink)
+    snapshot_subscriptions = seed_subscriptions(
+        None,
+        schema,
+        cfg.seed_subscriptions,
+        cust_ids,
+        pkg_ids,
+        pkg_costs,
+        dist_name,
+        sink=sink,
+    )
+
+    generate_snapshots_inline(
+        customers=snapshot_customers,
+        subscriptions=snapshot_subscriptions,
+        package_lookup=package_lookup,
+        output_dir=sink.out_dir / "snapshots" if sink is not None else DRY_RUN_SNAPSHOT_DIR,
+        postal_distribution=postal_dist_name,
+    )
+
+    if sink is not None:
+        n_payments = write_due_payments_to_files(sink, schema, snapshot_subscriptions)
+        manifest = sink.close(
+            meta={
+                "seed_random_seed": cfg.seed_random_seed,
+                "distribution": dist_name,
+                "postal_distribution": postal_dist_name,
+            }
+        )
+        log.info("✅ Seed files written (%s): %s", sink.fmt, manifest)
+        log.info("  Payments: %d", n_payments)
+    else:
+        log.info("✅ Dry run complete (nothing written to the database):")
+    log.info("  Customers: %d", len(snapshot_customers))
+    log.info("  Subscriptions: %d", len(snapshot_subscriptions))
+    log.info("  Distribution: %s", dist_name)
+    log.info("  Postal distribution: %s", postal_dist_name)
 
 
 # ============================================================
@@ -1438,76 +1254,185 @@ def run_seed():
     else:
         random.seed()
 
+    if cfg.seed_dry_run or cfg.seed_output:
+        run_dry_seed(cfg, dist_name, postal_dist_name)
+        return
+
+    metrics = start_metrics()
+    status = "ok"
+    deferred: DeferredIndexes | None = None
+    unlogged: list[str] = []
     conn = connect(cfg.db_url)
     try:
         with conn:
             with conn.cursor() as cur:
-                schema = detect_schema(cur)
+                with metrics.phase("schema"):
+                    schema = detect_schema(cur)
 
                 if seed_reset:
-                    maybe_reset_db(cur)
+                    with metrics.phase("reset"):
+                        maybe_reset_db(cur)
 
                 if (not seed_reset) and cfg.seed_skip_if_exists and seed_guard(cur, schema.CUSTOMER_T):
-                    print(f"ℹ️ Seed skipped: {schema.CUSTOMER_T} already has rows.")
+                    log.info("ℹ️ Seed skipped: %s already has rows.", schema.CUSTOMER_T)
+                    status = "skipped"
                     seed_analytics_definitions(cur)
-                    run_payments_after_seed(cur, schema)
+                    with metrics.phase("payments") as m:
+                        m.rows = run_payments_after_seed(cur, schema)
                     return
 
-                pkg_ids, pkg_costs, package_lookup = seed_packages(cur, schema, cfg.seed_packages)
-                cust_ids, snapshot_customers = seed_customers(cur, schema, cfg.seed_customers, postal_dist_name)
-
-                snapshot_subscriptions = seed_subscriptions(
+                fixture = usable_fixture_key(
                     cur,
+                    cfg,
                     schema,
-                    cfg.seed_subscriptions,
-                    cust_ids,
-                    pkg_ids,
-                    pkg_costs,
-                    dist_name,
+                    dist_name=dist_name,
+                    postal_dist_name=postal_dist_name,
+                    chunk_size=SEED_CHUNK_SIZE,
                 )
 
-                seed_analytics_definitions(cur)
-
-                print("===== BEFORE SNAPSHOT GENERATION =====")
-                print(f"snapshot_customers count: {len(snapshot_customers)}")
-                print(f"snapshot_subscriptions count: {len(snapshot_subscriptions)}")
-                print("sample snapshot_customers:", snapshot_customers[:5])
-                print("sample snapshot_subscriptions:", snapshot_subscriptions[:5])
-                print("package_lookup:", package_lookup)
-                print("======================================")
-
-                test_result = write_test_snapshot_image()
-                print(f"DEBUG test_result = {test_result}")
-
-                result = generate_snapshots_inline(
-                    customers=snapshot_customers,
-                    subscriptions=snapshot_subscriptions,
-                    package_lookup=package_lookup,
-                    postal_distribution=postal_dist_name,
-                    subscription_distribution=dist_name,
-                )
+                pay_t = find_table(cur, ["Payment", "payment", "payments"])
+                if cfg.seed_bulk_load:
+                    deferred = defer_indexes(cur, [schema.SUB_T] + ([pay_t] if pay_t else []))
+                if cfg.seed_unlogged:
+                    unlogged = [schema.CUSTOMER_T, schema.SUB_T] + ([pay_t] if pay_t else [])
+                    set_unlogged(cur, unlogged)
+
+                restored = False
+                if fixture:
+                    with metrics.phase("fixture_restore") as m:
+                        restored = restore_fixture(cur, fixture, SNAPSHOT_OUTPUT_DIR)
+                        m.rows = cfg.seed_customers + cfg.seed_subscriptions if restored else 0
+                if restored:
+                    status = "fixture"
+                    seed_analytics_definitions(cur)
+                    with metrics.phase("payments") as m:
+                        m.rows = run_payments_after_seed(cur, schema, incremental=False)
+                    if deferred or cfg.seed_unlogged == "load":
+                        with metrics.phase("index_rebuild"):
+                            if cfg.seed_unlogged == "load":
+                                set_logged(cur, unlogged)
+                            if deferred:
+                                rebuild_deferred(cur, deferred)
+                    with metrics.phase("package_percentages"):
+                        generate_package_percentage_json(cur)
+                    return
 
-                print(f"DEBUG snapshot result = {result}")
+                with metrics.phase("packages", rows=cfg.seed_packages):
+                    pkg_ids, pkg_costs, package_lookup = seed_packages(cur, schema, cfg.seed_packages)
+
+                if cfg.seed_workers:
+                    from .parallel import seed_customers_and_subscriptions_parallel
+
+                    with metrics.phase("customers_subscriptions", rows=cfg.seed_customers + cfg.seed_subscriptions):
+                        cust_ids, snapshot_customers, snapshot_subscriptions = seed_customers_and_subscriptions_parallel(
+                            conn,
+                            cur,
+                            db_url=cfg.db_url,
+                            schema=schema,
+                            workers=cfg.seed_workers,
+                            base_seed=cfg.seed_random_seed,
+                            n_customers=cfg.seed_customers,
+                            n_subscriptions=cfg.seed_subscriptions,
+                            pkg_ids=pkg_ids,
+                            pkg_costs=pkg_costs,
+                            dist_name=dist_name,
+                            postal_dist_name=postal_dist_name,
+                        )
+                else:
+                    with metrics.phase("customers", rows=cfg.seed_customers):
+                        cust_ids, snapshot_customers = seed_customers(cur, schema, cfg.seed_customers, postal_dist_name)
+
+                    with metrics.phase("subscriptions", rows=cfg.seed_subscriptions):
+                        snapshot_subscriptions = seed_subscriptions(
+                            cur,
+                            schema,
+                            cfg.seed_subscriptions,
+                            cust_ids,
+                            pkg_ids,
+                            pkg_costs,
+                            dist_name,
+                        )
 
-                print("✅ Seed complete:")
-                print(f"  Tables: {schema.CUSTOMER_T}, {schema.PACKAGE_T}, {schema.SUB_T}")
-                print("  Packages: 10 (fixed names)")
-                print(f"  Customers: {cfg.seed_customers}")
-                print(f"  Subscriptions: {cfg.seed_subscriptions}")
-                print(f"  Distribution: {dist_name}")
-                print(f"  Postal distribution: {postal_dist_name}")
-                print(f"  Reset first: {'YES' if seed_reset else 'NO'}")
+                seed_analytics_definitions(cur)
 
-                run_payments_after_seed(cur, schema)
-                generate_package_percentage_json(cur)
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug(
+                        "before snapshots: %d customers, %d subscriptions, package_lookup=%s",
+                        len(snapshot_customers),
+                        len(snapshot_subscriptions),
+                        package_lookup,
+                    )
+
+                # charts are drawn after the commit; only their inputs are computed here
+                with metrics.phase("snapshot_aggregate", rows=len(snapshot_customers) + len(snapshot_subscriptions)):
+                    snapshot_aggs = aggregate_snapshots(snapshot_customers, snapshot_subscriptions, package_lookup)
+
+                log.info("✅ Seed complete:")
+                log.info("  Tables: %s, %s, %s", schema.CUSTOMER_T, schema.PACKAGE_T, schema.SUB_T)
+                log.info("  Packages: 10 (fixed names)")
+                log.info("  Customers: %d", cfg.seed_customers)
+                log.info("  Subscriptions: %d", cfg.seed_subscriptions)
+                log.info("  Distribution: %s", dist_name)
+                log.info("  Postal distribution: %s", postal_dist_name)
+                log.info("  Workers: %d", cfg.seed_workers or 1)
+                log.info("  Reset first: %s", "YES" if seed_reset else "NO")
+
+                # new subscriptions: cover the whole window, not just days past the mark
+                with metrics.phase("payments") as m:
+                    m.rows = run_payments_after_seed(cur, schema, incremental=False)
+                if deferred or cfg.seed_unlogged == "load":
+                    with metrics.phase("index_rebuild"):
+                        if cfg.seed_unlogged == "load":
+                            set_logged(cur, unlogged)
+                        if deferred:
+                            rebuild_deferred(cur, deferred)
+                with metrics.phase("package_percentages"):
+                    generate_package_percentage_json(cur)
+
+            with metrics.phase("commit"):
+                conn.commit()
+
+            with metrics.phase("snapshots"):
+                if SNAPSHOT_TEST_FILES:
+                    write_test_snapshot_image()
+                result = write_snapshots(snapshot_aggs, output_dir=SNAPSHOT_OUTPUT_DIR, postal_distribution=postal_dist_name)
+            log.debug("snapshot result = %s", result)
+
+            # the fixture includes the snapshot images, so it is saved once they exist
+            if fixture:
+                with metrics.phase("fixture_save"):
+                    with conn.cursor() as cur:
+                        save_fixture(cur, fixture, schema, SNAPSHOT_OUTPUT_DIR)
 
     except Exception as e:
-        print("❌ run_seed failed")
-        print(f"Reason: {e}")
-        traceback.print_exc()
+        status = "failed"
+        log.error("❌ run_seed failed")
+        log.exception("Reason: %s", e)
+        # parallel seeding commits the index drops / UNLOGGED before the pool starts; put them back
+        # (SEED_UNLOGGED=keep leaves the tables UNLOGGED, as on success)
+        relog = unlogged if cfg.seed_unlogged == "load" else []
+        if cfg.seed_workers and (deferred or relog):
+            with conn:
+                with conn.cursor() as cur:
+                    if relog:
+                        set_logged(cur, relog)
+                    if deferred:
+                        rebuild_deferred(cur, deferred)
         raise
     finally:
         conn.close()
+        metrics.write(
+            {
+                "status": status,
+                "customers": cfg.seed_customers,
+                "subscriptions": cfg.seed_subscriptions,
+                "distribution": dist_name,
+                "postal_distribution": postal_dist_name,
+                "workers": cfg.seed_workers or 1,
+                "bulk_load": cfg.seed_bulk_load,
+                "unlogged": cfg.seed_unlogged,
+            }
+        )
 
 
 if __name__ == "__main__":
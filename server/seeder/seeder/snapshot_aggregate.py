@@ -0,0 +1,360 @@
+# server/seeder/seeder/snapshot_aggregate.py
+"""
+Snapshot chart inputs, computed in one pass.
+
+aggregate_snapshot_inputs() turns the seeded customers and subscriptions into
+NumPy columns once and computes everything the six charts draw:
+  - geo points bucketed by country (Canada / USA / other)
+  - country counts, package counts, status counts, cycle counts
+  - the monthly customer-creation histogram
+
+SnapshotCustomers / SnapshotSubscriptions are read straight from their
+columns (see their columns() methods); plain lists of row dicts go through
+one extraction loop. Renderers only see the resulting SnapshotAggregates.
+
+SEED_SNAPSHOT_GEO_MODE picks how the geo chart is fed:
+  - scatter: every customer's lon/lat (one marker each)
+  - density: per-country 2D histograms of SEED_SNAPSHOT_GEO_BINS columns,
+    so the chart costs the same for 10k or 10M customers
+  - auto (default): density from SEED_SNAPSHOT_GEO_DENSITY_MIN points up
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any
+
+import numpy as np
+
+GEO_MODES = ("auto", "scatter", "density")
+
+
+def parse_geo_mode(raw: str | None) -> str:
+    mode = (raw or "auto").strip().lower() or "auto"
+    if mode not in GEO_MODES:
+        raise SystemExit(f"Invalid SEED_SNAPSHOT_GEO_MODE='{raw}'. Allowed: {', '.join(GEO_MODES)}")
+    return mode
+
+
+GEO_MODE = parse_geo_mode(os.environ.get("SEED_SNAPSHOT_GEO_MODE"))
+GEO_DENSITY_MIN = int(os.environ.get("SEED_SNAPSHOT_GEO_DENSITY_MIN", "50000"))
+# histogram columns; rows follow the 12x8 chart (2:3)
+GEO_BINS = int(os.environ.get("SEED_SNAPSHOT_GEO_BINS", "480"))
+
+
+# ------------------------------------------------------------
+# row helpers (for plain dict rows)
+# ------------------------------------------------------------
+def first_present(row: dict[str, Any], keys: list[str], default: Any = None) -> Any:
+    for key in keys:
+        if key in row and row[key] is not None:
+            return row[key]
+    return default
+
+
+def _safe_float(value: Any) -> float | None:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _safe_dt(value: Any) -> datetime | None:
+    if value is None:
+        return None
+
+    if isinstance(value, datetime):
+        return value
+
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+
+    if isinstance(value, str):
+        text = value.strip()
+        if not text:
+            return None
+
+        if text.endswith("Z"):
+            text = text[:-1] + "+00:00"
+
+        fmts = [
+            "%Y-%m-%d",
+            "%Y-%m-%d %H:%M:%S",
+            "%Y-%m-%d %H:%M:%S.%f",
+        ]
+        for fmt in fmts:
+            try:
+                return datetime.strptime(text, fmt)
+            except ValueError:
+                pass
+
+        try:
+            return datetime.fromisoformat(text)
+        except ValueError:
+            return None
+
+    return None
+
+
+def infer_country_from_postal(postal_code: Any) -> str:
+    if postal_code is None:
+        return "Unknown"
+
+    text = str(postal_code).strip()
+    if len(text) >= 7 and " " in text and text[0].isalpha():
+        return "Canada"
+    if text:
+        return "USA"
+    return "Unknown"
+
+
+def normalize_cycle(value: Any) -> str:
+    if value is None:
+        return "Unknown"
+
+    text = str(value).strip().upper()
+    if text in {"MONTHLY", "MONTH", "M"}:
+        return "Monthly"
+    if text in {"ANNUAL", "YEARLY", "YEAR", "Y"}:
+        return "Annual"
+    return text.title() if text else "Unknown"
+
+
+def normalize_status(value: Any) -> str:
+    if value is None:
+        return "Unknown"
+
+    text = str(value).strip().upper()
+    if "ACTIVE" in text:
+        return "Active"
+    if "CANCEL" in text:
+        return "Cancelled"
+    if "PAST" in text:
+        return "Past Due"
+    if "PAUSE" in text:
+        return "Paused"
+    if "TRIAL" in text:
+        return "Trial"
+    return text.title() if text else "Unknown"
+
+
+# ------------------------------------------------------------
+# columns
+# ------------------------------------------------------------
+# datetime64[D] value of date.fromordinal(1)
+_ORDINAL_EPOCH = np.datetime64("0001-01-01", "D")
+
+
+@dataclass
+class CustomerColumns:
+    country: np.ndarray  # str
+    lat: np.ndarray  # float64, NaN = missing
+    lon: np.ndarray  # float64, NaN = missing
+    created_month: np.ndarray  # datetime64[M], NaT = missing
+
+
+@dataclass
+class SubscriptionColumns:
+    package_id: np.ndarray  # package ids; rows without one are dropped by has_package
+    has_package: np.ndarray  # bool
+    cycle: np.ndarray  # raw values (str / None)
+    status: np.ndarray  # raw values (str / None)
+
+
+def customer_columns(customers) -> CustomerColumns:
+    cols = getattr(customers, "columns", None)
+    if cols is not None:
+        is_ca, lat, lon, created_ordinal = cols()
+        return CustomerColumns(
+            country=np.where(is_ca.astype(bool), "Canada", "USA"),
+            lat=lat,
+            lon=lon,
+            created_month=(_ORDINAL_EPOCH + (created_ordinal - 1)).astype("datetime64[M]"),
+        )
+
+    country, lat, lon, created = [], [], [], []
+    for row in customers:
+        postal = first_present(row, ["postalCode", "postal_code", "zip", "zipcode", "postal"])
+        country.append(row.get("country") or infer_country_from_postal(postal))
+        lat.append(_safe_float(first_present(row, ["latitude", "lat"])))
+        lon.append(_safe_float(first_present(row, ["longitude", "lon", "lng"])))
+        dt = _safe_dt(first_present(row, ["memberSince", "member_since", "createdAt", "created_at"]))
+        created.append(np.datetime64(dt.replace(tzinfo=None), "M") if dt else np.datetime64("NaT", "M"))
+
+    return CustomerColumns(
+        country=np.array(country, dtype=str),
+        lat=np.array(lat, dtype=np.float64),
+        lon=np.array(lon, dtype=np.float64),
+        created_month=np.array(created, dtype="datetime64[M]"),
+    )
+
+
+def subscription_columns(subscriptions) -> SubscriptionColumns:
+    cols = getattr(subscriptions, "columns", None)
+    if cols is not None:
+        package_ids, cycles, statuses = cols()
+        return SubscriptionColumns(
+            package_id=package_ids,
+            has_package=np.ones(len(package_ids), dtype=bool),
+            cycle=cycles,
+            status=statuses,
+        )
+
+    pkg, cycle, status = [], [], []
+    for row in subscriptions:
+        pkg.append(first_present(row, ["packageID", "packageId", "package_id"]))
+        cycle.append(first_present(row, ["billingCycle", "billing_cycle", "cycle"]))
+        status.append(first_present(row, ["status", "state"]))
+
+    pkg_arr = np.array(pkg, dtype=object)
+    return SubscriptionColumns(
+        package_id=pkg_arr,
+        has_package=np.array([p is not None for p in pkg], dtype=bool),
+        cycle=np.array(cycle, dtype=object),
+        status=np.array(status, dtype=object),
+    )
+
+
+# ------------------------------------------------------------
+# aggregation
+# ------------------------------------------------------------
+@dataclass
+class GeoDensity:
+    # counts[label][row, col]: customers per lat (row) / lon (col) cell
+    counts: dict[str, np.ndarray]
+    # (lon_min, lon_max, lat_min, lat_max), shared by every grid
+    extent: tuple[float, float, float, float]
+
+
+@dataclass
+class SnapshotAggregates:
+    # geo points by country bucket: {"Canada": (lon, lat), "USA": ..., "Unknown": ...}
+    # (scatter mode; empty when geo_density is set)
+    geo: dict[str, tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)
+    geo_density: GeoDensity | None = None
+    # (label, count), in the order each chart draws them
+    country_counts: list[tuple[str, int]] = field(default_factory=list)
+    package_counts: list[tuple[str, int]] = field(default_factory=list)
+    status_counts: list[tuple[str, int]] = field(default_factory=list)
+    cycle_counts: list[tuple[str, int]] = field(default_factory=list)
+    month_counts: list[tuple[str, int]] = field(default_factory=list)
+    n_customers: int = 0
+    n_subscriptions: int = 0
+
+
+def _counts_first_seen(values: np.ndarray) -> list[tuple[Any, int]]:
+    """Counts of each value, ordered by first occurrence (like Counter)."""
+    if len(values) == 0:
+        return []
+    uniq, first, counts = np.unique(values, return_index=True, return_counts=True)
+    order = np.argsort(first, kind="stable")
+    return [(uniq[i].item() if hasattr(uniq[i], "item") else uniq[i], int(counts[i])) for i in order]
+
+
+def _normalized(raw: np.ndarray, normalize) -> np.ndarray:
+    """normalize() applied per distinct raw value, not per row."""
+    if len(raw) == 0:
+        return np.array([], dtype=str)
+    # None sorts with nothing in np.unique; map it to "" first (both normalize to "Unknown")
+    if raw.dtype == object:
+        raw = np.array(["" if v is None else str(v) for v in raw], dtype=str)
+    uniq, inverse = np.unique(raw, return_inverse=True)
+    labels = np.array([normalize(v if v != "" else None) for v in uniq.tolist()], dtype=str)
+    return labels[inverse]
+
+
+def density_extent(lon_min: float, lon_max: float, lat_min: float, lat_max: float) -> tuple[float, float, float, float]:
+    """The grid extent for points in these bounds (never empty, as histogram2d needs)."""
+    if lon_min == lon_max:
+        lon_min, lon_max = lon_min - 0.5, lon_max + 0.5
+    if lat_min == lat_max:
+        lat_min, lat_max = lat_min - 0.5, lat_max + 0.5
+    return (lon_min, lon_max, lat_min, lat_max)
+
+
+def density_shape(bins: int = GEO_BINS) -> tuple[int, int]:
+    """(rows, cols) of the density grid."""
+    return (max(1, bins * 2 // 3), max(1, bins))
+
+
+def geo_density(points: dict[str, tuple[np.ndarray, np.ndarray]], bins: int = GEO_BINS) -> GeoDensity:
+    """Bins each country's points on one lon/lat grid covering all of them."""
+    lons = np.concatenate([np.asarray(xs, dtype=np.float64) for xs, _ in points.values()] or [np.empty(0)])
+    lats = np.concatenate([np.asarray(ys, dtype=np.float64) for _, ys in points.values()] or [np.empty(0)])
+    if len(lons):
+        extent = density_extent(float(lons.min()), float(lons.max()), float(lats.min()), float(lats.max()))
+    else:
+        extent = (0.0, 1.0, 0.0, 1.0)
+
+    shape = density_shape(bins)
+    counts = {}
+    for label, (xs, ys) in points.items():
+        grid, _, _ = np.histogram2d(ys, xs, bins=shape, range=[extent[2:], extent[:2]])
+        counts[label] = grid.astype(np.int64)
+    return GeoDensity(counts=counts, extent=extent)
+
+
+def aggregate_snapshot_inputs(
+    customers,
+    subscriptions,
+    package_lookup: dict[Any, str],
+    *,
+    geo_mode: str = GEO_MODE,
+) -> SnapshotAggregates:
+    return aggregate_columns(
+        customer_columns(customers),
+        subscription_columns(subscriptions),
+        package_lookup,
+        geo_mode=geo_mode,
+    )
+
+
+def aggregate_columns(
+    cust: CustomerColumns,
+    subs: SubscriptionColumns,
+    package_lookup: dict[Any, str],
+    *,
+    geo_mode: str = GEO_MODE,
+) -> SnapshotAggregates:
+    agg = SnapshotAggregates(n_customers=len(cust.lat), n_subscriptions=len(subs.package_id))
+
+    # geo + country split: customers with both coordinates
+    has_geo = ~np.isnan(cust.lat) & ~np.isnan(cust.lon)
+    is_ca = cust.country == "Canada"
+    is_us = cust.country == "USA"
+    points = {}
+    for label, mask in (("Canada", is_ca), ("USA", is_us), ("Unknown", ~(is_ca | is_us))):
+        m = has_geo & mask
+        points[label] = (cust.lon[m], cust.lat[m])
+
+    n_points = int(has_geo.sum())
+    if geo_mode == "density" or (geo_mode == "auto" and n_points >= GEO_DENSITY_MIN):
+        agg.geo_density = geo_density(points)
+    else:
+        agg.geo = points
+    agg.country_counts = _counts_first_seen(cust.country[has_geo & (cust.country != "")])
+
+    # creation timeline: YYYY-MM, sorted
+    months = cust.created_month[~np.isnat(cust.created_month)]
+    if len(months):
+        uniq, counts = np.unique(months, return_counts=True)
+        agg.month_counts = [(str(m), int(c)) for m, c in zip(uniq, counts)]
+
+    # packages: counted by id, labelled by name, most subscribed first
+    by_name: dict[str, int] = {}
+    for pkg_id, count in _counts_first_seen(subs.package_id[subs.has_package]):
+        name = package_lookup.get(pkg_id, f"Package {pkg_id}")
+        by_name[name] = by_name.get(name, 0) + count
+    agg.package_counts = sorted(by_name.items(), key=lambda x: x[1], reverse=True)
+
+    statuses = _normalized(subs.status, normalize_status)
+    agg.status_counts = _counts_first_seen(statuses[statuses != "Unknown"])
+
+    cycles = _normalized(subs.cycle, normalize_cycle)
+    agg.cycle_counts = sorted(_counts_first_seen(cycles[cycles != "Unknown"]), key=lambda x: x[0])
+
+    return agg
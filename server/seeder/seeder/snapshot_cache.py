@@ -0,0 +1,103 @@
+# server/seeder/seeder/snapshot_cache.py
+"""
+Content-addressed snapshot cache.
+
+Each chart's inputs (its renderer kwargs, minus the output path) are hashed
+together with the source of the modules that shape its files (snapshot_render,
+snapshot_series, snapshot_aggregate). snapshot_manifest.json, next to the
+PNGs, maps every chart to its files, hash and an ETag derived from the hash.
+A chart whose hash matches the manifest and whose file is still there is not drawn
+again, so an unchanged chart keeps its bytes and mtime, and its HTTP ETag.
+
+SEED_SNAPSHOT_CACHE=0 ignores the manifest and redraws every chart (the
+manifest is still written).
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+MANIFEST_NAME = "snapshot_manifest.json"
+SNAPSHOT_CACHE = os.environ.get("SEED_SNAPSHOT_CACHE", "1").strip() not in ("0", "false", "False")
+
+
+def _feed(h, value: Any) -> None:
+    """Stable, type-tagged encoding of the chart inputs."""
+    if value is None:
+        h.update(b"N")
+    elif isinstance(value, np.ndarray):
+        arr = np.ascontiguousarray(value)
+        h.update(f"A{arr.dtype.str}{arr.shape}".encode())
+        h.update(arr.tobytes())
+    elif isinstance(value, (bool, int, float, str, np.generic)):
+        h.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, (list, tuple)):
+        h.update(f"L{len(value)}[".encode())
+        for item in value:
+            _feed(h, item)
+        h.update(b"]")
+    elif isinstance(value, dict):
+        h.update(f"D{len(value)}{{".encode())
+        for key in sorted(value, key=str):
+            _feed(h, key)
+            _feed(h, value[key])
+        h.update(b"}")
+    elif dataclasses.is_dataclass(value):
+        _feed(h, {f.name: getattr(value, f.name) for f in dataclasses.fields(value)})
+    else:
+        raise TypeError(f"Cannot hash snapshot input of type {type(value).__name__}")
+
+
+def chart_hash(key: str, inputs: dict[str, Any], renderer_source: bytes) -> str:
+    h = hashlib.sha256()
+    h.update(renderer_source)
+    _feed(h, key)
+    _feed(h, inputs)
+    return h.hexdigest()
+
+
+def load_manifest(out_dir: Path) -> dict[str, dict]:
+    """The "charts" section of the manifest, or {} when missing / unreadable."""
+    try:
+        data = json.loads((out_dir / MANIFEST_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    charts = data.get("charts") if isinstance(data, dict) else None
+    return charts if isinstance(charts, dict) else {}
+
+
+def is_fresh(charts: dict[str, dict], key: str, digest: str, out_dir: Path) -> bool:
+    entry = charts.get(key) or {}
+    files = [entry.get("file"), entry.get("json")] + ([entry["svg"]] if entry.get("svg") else [])
+    return SNAPSHOT_CACHE and entry.get("hash") == digest and all(f and (out_dir / f).is_file() for f in files)
+
+
+def manifest_entry(path: Path, digest: str, *, svg: bool = False) -> dict:
+    """Entry for a freshly drawn chart (skipped charts keep their old entry)."""
+    entry = {
+        "file": path.name,
+        "json": path.with_suffix(".json").name,
+        "hash": digest,
+        "etag": f'"{digest[:32]}"',
+        "bytes": path.stat().st_size,
+        "rendered_at_utc": datetime.now(timezone.utc).isoformat(),
+    }
+    if svg:
+        entry["svg"] = path.with_suffix(".svg").name
+    return entry
+
+
+def write_manifest(out_dir: Path, charts: dict[str, dict]) -> Path:
+    path = out_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps({"version": 1, "charts": charts}, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+    return path
@@ -0,0 +1,251 @@
+# server/seeder/seeder/snapshot_db.py
+"""
+Snapshot aggregates computed by the database instead of from the seeder's
+in-memory rows, so a live (or production-sized) database can be charted
+without reseeding.
+
+aggregate_from_db(cur) needs at most four queries, whatever the table sizes:
+  - customers: one GROUPING SETS scan for the country split (country is
+    derived from the postal code in SQL, same rule as
+    infer_country_from_postal), the geo bounds and the month histogram
+  - subscriptions: one GROUPING SETS scan for package, status and cycle
+  - geo: the density grid binned with width_bucket(), or, below
+    SEED_SNAPSHOT_GEO_DENSITY_MIN points in auto mode, the points themselves
+  - the package names
+
+Groups are ordered by their lowest primary key, i.e. the order the in-memory
+path first sees them in, so a fresh seed charts identically either way.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from .schema import find_fk_column, find_table, get_table_columns, pick_col
+from .snapshot_aggregate import (
+    GEO_DENSITY_MIN,
+    GEO_MODE,
+    GeoDensity,
+    SnapshotAggregates,
+    density_extent,
+    density_shape,
+    normalize_cycle,
+    normalize_status,
+)
+
+_GEO_LABELS = ("Canada", "USA", "Unknown")
+
+
+def country_sql(postal_col: str | None) -> str:
+    """SQL for infer_country_from_postal() on postal_col."""
+    if not postal_col:
+        return "'Unknown'"
+    p = f'btrim("{postal_col}"::text)'
+    return (
+        f'CASE WHEN "{postal_col}" IS NULL THEN \'Unknown\' '
+        f"WHEN length({p}) >= 7 AND strpos({p}, ' ') > 0 AND {p} ~ '^[[:alpha:]]' THEN 'Canada' "
+        f"WHEN {p} <> '' THEN 'USA' "
+        f"ELSE 'Unknown' END"
+    )
+
+
+def _col(name: str | None, cast: str = "") -> str:
+    return f'"{name}"{cast}' if name else "NULL"
+
+
+def snapshot_tables(cur) -> dict[str, Any]:
+    """Tables and columns the snapshot charts read (missing columns are None)."""
+    customer_t = find_table(cur, ["Customer", "customer", "customers"])
+    package_t = find_table(cur, ["Package", "package", "packages"])
+    sub_t = find_table(cur, ["Subscription", "subscription", "subscriptions"])
+    if not customer_t or not package_t or not sub_t:
+        raise SystemExit(
+            "Could not find the Customer / Package / Subscription tables to chart.\n"
+            f"Detected: Customer={customer_t}, Package={package_t}, Subscription={sub_t}"
+        )
+
+    cust_cols = get_table_columns(cur, customer_t)
+    pkg_cols = get_table_columns(cur, package_t)
+    sub_cols = get_table_columns(cur, sub_t)
+    return {
+        "customer_t": customer_t,
+        "package_t": package_t,
+        "sub_t": sub_t,
+        "cust_pk": pick_col(cust_cols, ["id", "customerId", "customerID"]),
+        "postal": pick_col(cust_cols, ["postalCode", "postal_code", "zip", "zipcode", "postal"]),
+        "lat": pick_col(cust_cols, ["latitude", "lat"]),
+        "lon": pick_col(cust_cols, ["longitude", "lon", "lng"]),
+        "since": pick_col(cust_cols, ["memberSince", "member_since", "createdAt", "created_at"]),
+        "pkg_pk": pick_col(pkg_cols, ["id", "packageId", "packageID"]),
+        "pkg_name": pick_col(pkg_cols, ["name", "title", "packageName"]),
+        "sub_pk": pick_col(sub_cols, ["id", "subscriptionId", "subscriptionID"]),
+        "sub_pkg": find_fk_column(cur, sub_t, package_t) or pick_col(sub_cols, ["packageID", "packageId", "package_id"]),
+        "cycle": pick_col(sub_cols, ["billingCycle", "billing_cycle", "cycle"]),
+        "status": pick_col(sub_cols, ["status", "state"]),
+    }
+
+
+def read_package_lookup(cur, t: dict[str, Any]) -> dict[Any, str]:
+    if not t["pkg_pk"] or not t["pkg_name"]:
+        return {}
+    cur.execute(f'SELECT "{t["pkg_pk"]}", "{t["pkg_name"]}" FROM "{t["package_t"]}"')
+    return {pkg_id: str(name) for pkg_id, name in cur.fetchall() if name is not None}
+
+
+def _merge_normalized(groups: list[tuple[Any, int]], normalize) -> list[tuple[str, int]]:
+    """Raw (value, count) groups, in first-seen order -> normalized label counts, Unknown dropped."""
+    merged: dict[str, int] = {}
+    for raw, count in groups:
+        label = normalize(raw)
+        if label != "Unknown":
+            merged[label] = merged.get(label, 0) + count
+    return list(merged.items())
+
+
+def _customer_aggregates(cur, t: dict[str, Any], agg: SnapshotAggregates) -> tuple[int, tuple | None]:
+    """Fills country_counts / month_counts; returns (geo point count, geo bounds)."""
+    cur.execute(
+        f"""
+        SELECT GROUPING(country, month), country, month,
+               count(*), count(*) FILTER (WHERE lat IS NOT NULL AND lon IS NOT NULL),
+               min(k) FILTER (WHERE lat IS NOT NULL AND lon IS NOT NULL),
+               min(lon), max(lon), min(lat), max(lat)
+        FROM (
+            SELECT {_col(t['cust_pk'])} AS k,
+                   {_col(t['lat'], '::float8')} AS lat,
+                   {_col(t['lon'], '::float8')} AS lon,
+                   {country_sql(t['postal'])} AS country,
+                   to_char({_col(t['since'], '::date')}, 'YYYY-MM') AS month
+            FROM "{t['customer_t']}"
+        ) c
+        GROUP BY GROUPING SETS ((country), (month))
+        ORDER BY 1, 6, 3
+        """
+    )
+
+    countries, months = [], []
+    n_points, bounds = 0, None
+    for grouping, country, month, n, n_geo, _, lon_min, lon_max, lat_min, lat_max in cur.fetchall():
+        if grouping == 1:  # country set
+            agg.n_customers += n
+            if n_geo:
+                countries.append((country, n_geo))
+                n_points += n_geo
+                b = (lon_min, lon_max, lat_min, lat_max)
+                bounds = b if bounds is None else (
+                    min(bounds[0], b[0]), max(bounds[1], b[1]), min(bounds[2], b[2]), max(bounds[3], b[3])
+                )
+        elif month is not None:
+            months.append((month, n))
+
+    agg.country_counts = countries
+    agg.month_counts = sorted(months)
+    return n_points, bounds
+
+
+def _geo_density(cur, t: dict[str, Any], bounds: tuple) -> GeoDensity:
+    extent = density_extent(*bounds)
+    rows, cols = density_shape()
+    lat, lon = _col(t["lat"], "::float8"), _col(t["lon"], "::float8")
+    cur.execute(
+        f"""
+        SELECT {country_sql(t['postal'])},
+               LEAST(width_bucket({lat}, %s, %s, %s), %s) - 1,
+               LEAST(width_bucket({lon}, %s, %s, %s), %s) - 1,
+               count(*)
+        FROM "{t['customer_t']}"
+        WHERE {lat} IS NOT NULL AND {lon} IS NOT NULL
+        GROUP BY 1, 2, 3
+        """,
+        (extent[2], extent[3], rows, rows, extent[0], extent[1], cols, cols),
+    )
+
+    counts = {label: np.zeros((rows, cols), dtype=np.int64) for label in _GEO_LABELS}
+    for country, r, c, n in cur.fetchall():
+        counts[country if country in counts else "Unknown"][r, c] += n
+    return GeoDensity(counts=counts, extent=extent)
+
+
+def _geo_points(cur, t: dict[str, Any]) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+    lat, lon = _col(t["lat"], "::float8"), _col(t["lon"], "::float8")
+    order = f'ORDER BY "{t["cust_pk"]}"' if t["cust_pk"] else ""
+    cur.execute(
+        f"""
+        SELECT {country_sql(t['postal'])}, {lon}, {lat}
+        FROM "{t['customer_t']}"
+        WHERE {lat} IS NOT NULL AND {lon} IS NOT NULL
+        {order}
+        """
+    )
+    rows = cur.fetchall()
+    country = np.array([r[0] for r in rows], dtype=str)
+    xs = np.array([r[1] for r in rows], dtype=np.float64)
+    ys = np.array([r[2] for r in rows], dtype=np.float64)
+
+    is_ca, is_us = country == "Canada", country == "USA"
+    return {
+        label: (xs[mask], ys[mask])
+        for label, mask in (("Canada", is_ca), ("USA", is_us), ("Unknown", ~(is_ca | is_us)))
+    }
+
+
+def _subscription_aggregates(cur, t: dict[str, Any], agg: SnapshotAggregates, package_lookup: dict[Any, str]) -> None:
+    cur.execute(
+        f"""
+        SELECT GROUPING(pkg, cycle, status), pkg, cycle, status, count(*), min(k)
+        FROM (
+            SELECT {_col(t['sub_pk'])} AS k,
+                   {_col(t['sub_pkg'])} AS pkg,
+                   {_col(t['cycle'], '::text')} AS cycle,
+                   {_col(t['status'], '::text')} AS status
+            FROM "{t['sub_t']}"
+        ) s
+        GROUP BY GROUPING SETS ((pkg), (cycle), (status))
+        ORDER BY 1, 6
+        """
+    )
+
+    pkgs, cycles, statuses = [], [], []
+    for grouping, pkg_id, cyc, st, n, _ in cur.fetchall():
+        if grouping == 0b011:  # (pkg)
+            agg.n_subscriptions += n
+            if pkg_id is not None:
+                pkgs.append((pkg_id, n))
+        elif grouping == 0b101:  # (cycle)
+            cycles.append((cyc, n))
+        else:  # (status)
+            statuses.append((st, n))
+
+    by_name: dict[str, int] = {}
+    for pkg_id, n in pkgs:
+        name = package_lookup.get(pkg_id, f"Package {pkg_id}")
+        by_name[name] = by_name.get(name, 0) + n
+    agg.package_counts = sorted(by_name.items(), key=lambda x: x[1], reverse=True)
+    agg.status_counts = _merge_normalized(statuses, normalize_status)
+    agg.cycle_counts = sorted(_merge_normalized(cycles, normalize_cycle), key=lambda x: x[0])
+
+
+def aggregate_from_db(
+    cur,
+    package_lookup: dict[Any, str] | None = None,
+    *,
+    geo_mode: str = GEO_MODE,
+) -> tuple[SnapshotAggregates, dict[Any, str]]:
+    """SnapshotAggregates for the tables behind cur, and the package lookup used."""
+    t = snapshot_tables(cur)
+    package_lookup = package_lookup or read_package_lookup(cur, t)
+    agg = SnapshotAggregates()
+
+    n_points, bounds = _customer_aggregates(cur, t, agg)
+    if geo_mode == "density" or (geo_mode == "auto" and n_points >= GEO_DENSITY_MIN):
+        agg.geo_density = _geo_density(cur, t, bounds) if bounds else GeoDensity(
+            counts={label: np.zeros(density_shape(), dtype=np.int64) for label in _GEO_LABELS},
+            extent=(0.0, 1.0, 0.0, 1.0),
+        )
+    else:
+        agg.geo = _geo_points(cur, t)
+
+    _subscription_aggregates(cur, t, agg, package_lookup)
+    return agg, package_lookup
@@ -0,0 +1,429 @@
+# server/seeder/seeder/snapshot_render.py
+"""
+Draws the six snapshot PNGs from SnapshotAggregates (see snapshot_aggregate.py).
+
+Every chart is a module-level function that takes only its own aggregates, so
+render_snapshots() can hand each one to a separate worker process.
+SEED_SNAPSHOT_WORKERS sets the pool size (default: one per chart, capped at
+the CPU count); 0 or 1 draws them one after the other in this process.
+
+Colors come from a Theme: "neon" (black / green, the seeder's look) or
+"light" (white, matplotlib's default palette). SEED_SNAPSHOT_THEME picks the
+seeder's theme.
+
+The geo chart is a scatter of every customer, or, when the aggregates carry
+a GeoDensity (large seeds, see SEED_SNAPSHOT_GEO_MODE), one log-scaled density
+image per country.
+
+Each PNG gets a JSON file with the chart's series (and an SVG with
+SEED_SNAPSHOT_SVG=1), see snapshot_series.py. Charts whose inputs are
+unchanged since the last run are not redrawn; see snapshot_cache.py.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from . import snapshot_aggregate, snapshot_series
+from .log import get_logger
+from .snapshot_aggregate import GeoDensity, SnapshotAggregates
+from .snapshot_cache import chart_hash, is_fresh, load_manifest, manifest_entry, write_manifest
+from .snapshot_series import CHARTS, JSON_GEO_BINS, SNAPSHOT_SVG, chart_json, write_chart_json
+
+log = get_logger(__name__)
+
+SNAPSHOT_WORKERS = int(os.environ.get("SEED_SNAPSHOT_WORKERS", str(min(6, os.cpu_count() or 1))))
+
+SNAPSHOT_FILES = {
+    "geo_distribution": "snapshot_1_geo_distribution.png",
+    "country_split": "snapshot_2_country_split.png",
+    "package_distribution": "snapshot_3_package_distribution.png",
+    "subscription_status": "snapshot_4_subscription_status.png",
+    "billing_cycle": "snapshot_5_billing_cycle.png",
+    "customer_creation_timeline": "snapshot_6_customer_creation_timeline.png",
+}
+
+
+# ------------------------------------------------------------
+# themes
+# ------------------------------------------------------------
+@dataclass(frozen=True)
+class Theme:
+    name: str
+    background: str
+    foreground: str
+    palette: tuple[str, ...]
+    grid_color: str
+    grid_alpha: float
+    # True: one color, bars / wedges told apart by alpha; False: palette colors
+    fade: bool
+    # scatter / density alpha for Canada, USA, Unknown
+    geo_alphas: tuple[float, float, float]
+    # pie percentage labels
+    on_fill: str
+
+    def color(self, i: int) -> str:
+        return self.palette[i % len(self.palette)]
+
+
+NEON = Theme(
+    name="neon",
+    background="#000000",
+    foreground="#39FF14",
+    palette=("#39FF14",),
+    grid_color="#39FF14",
+    grid_alpha=0.18,
+    fade=True,
+    geo_alphas=(0.95, 0.55, 0.30),
+    on_fill="#000000",
+)
+
+LIGHT = Theme(
+    name="light",
+    background="#FFFFFF",
+    foreground="#000000",
+    palette=("#1F77B4", "#FF7F0E", "#2CA02C", "#D62728", "#9467BD", "#8C564B", "#E377C2", "#7F7F7F"),
+    grid_color="#B0B0B0",
+    grid_alpha=0.25,
+    fade=False,
+    geo_alphas=(0.75, 0.75, 0.75),
+    on_fill="#FFFFFF",
+)
+
+THEMES = {t.name: t for t in (NEON, LIGHT)}
+
+
+def get_theme(name: str) -> Theme:
+    theme = THEMES.get((name or "").strip().lower())
+    if theme is None:
+        raise SystemExit(f"Invalid snapshot theme='{name}'. Allowed: {', '.join(THEMES)}")
+    return theme
+
+
+SNAPSHOT_THEME = get_theme(os.environ.get("SEED_SNAPSHOT_THEME", "neon"))
+
+
+# ------------------------------------------------------------
+# styling
+# ------------------------------------------------------------
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _style_axes(ax, theme: Theme):
+    ax.set_facecolor(theme.background)
+
+    for spine in ax.spines.values():
+        spine.set_color(theme.foreground)
+        spine.set_linewidth(1.0)
+
+    ax.tick_params(axis="x", colors=theme.foreground)
+    ax.tick_params(axis="y", colors=theme.foreground)
+    ax.xaxis.label.set_color(theme.foreground)
+    ax.yaxis.label.set_color(theme.foreground)
+    ax.title.set_color(theme.foreground)
+    ax.grid(True, color=theme.grid_color, alpha=theme.grid_alpha, linewidth=0.8)
+
+
+def _new_figure(theme: Theme, figsize=(12, 8)):
+    fig, ax = _pyplot().subplots(figsize=figsize, dpi=200)
+    fig.patch.set_facecolor(theme.background)
+    _style_axes(ax, theme)
+    return fig, ax
+
+
+def _save(fig, path: str) -> str:
+    fig.tight_layout()
+    for out in [path] + ([str(Path(path).with_suffix(".svg"))] if SNAPSHOT_SVG else []):
+        fig.savefig(
+            out,
+            bbox_inches="tight",
+            facecolor=fig.get_facecolor(),
+            edgecolor="none",
+        )
+    _pyplot().close(fig)
+    return path
+
+
+def _style_legend(legend, theme: Theme):
+    if legend is None:
+        return
+    frame = legend.get_frame()
+    frame.set_facecolor(theme.background)
+    frame.set_edgecolor(theme.foreground)
+    frame.set_alpha(1.0)
+    for txt in legend.get_texts():
+        txt.set_color(theme.foreground)
+
+
+def _title(ax, key: str, theme: Theme, suffix: str = ""):
+    ax.set_title(CHARTS[key]["title"] + suffix, color=theme.foreground, fontsize=14, fontweight="bold")
+
+
+def _no_data(ax, text: str, theme: Theme):
+    ax.text(0.5, 0.5, text, ha="center", va="center", color=theme.foreground, fontsize=14)
+    ax.set_axis_off()
+
+
+def _pie(ax, key: str, counts, alphas, theme: Theme):
+    wedges, texts, autotexts = ax.pie(
+        [c for _, c in counts],
+        labels=[label for label, _ in counts],
+        autopct="%1.1f%%",
+        startangle=90,
+        colors=[theme.color(i) for i in range(len(counts))],
+        wedgeprops={"edgecolor": theme.background, "linewidth": 1.5},
+        textprops={"color": theme.foreground, "fontsize": 11},
+    )
+
+    if theme.fade:
+        for idx, wedge in enumerate(wedges):
+            wedge.set_alpha(alphas[idx % len(alphas)])
+
+    for t in texts:
+        t.set_color(theme.foreground)
+    for t in autotexts:
+        t.set_color(theme.on_fill)
+        t.set_fontweight("bold")
+
+    _title(ax, key, theme)
+    ax.set_facecolor(theme.background)
+
+
+def _bar(ax, key: str, counts, alpha_of, theme: Theme):
+    color = theme.color(0)
+    bars = ax.bar(
+        [label for label, _ in counts],
+        [c for _, c in counts],
+        color=color,
+        edgecolor=color,
+        linewidth=1.0,
+        alpha=0.85 if theme.fade else None,
+    )
+    if theme.fade:
+        for i, bar in enumerate(bars):
+            bar.set_alpha(alpha_of(i))
+
+    _title(ax, key, theme)
+    ax.set_xlabel(CHARTS[key]["x"], color=theme.foreground)
+    ax.set_ylabel(CHARTS[key]["y"], color=theme.foreground)
+
+
+# ------------------------------------------------------------
+# charts
+# ------------------------------------------------------------
+_GEO_LABELS = ("Canada", "USA", "Unknown")
+
+
+def _density_rgba(counts: np.ndarray, color: str, alpha: float, log_max: float) -> np.ndarray:
+    """color image whose opacity grows with log(count); empty cells are transparent."""
+    from matplotlib.colors import to_rgb
+
+    rgba = np.zeros(counts.shape + (4,), dtype=np.float32)
+    rgba[..., :3] = to_rgb(color)
+    level = np.log1p(counts) / log_max
+    rgba[..., 3] = np.where(counts > 0, alpha * (0.25 + 0.75 * level), 0.0)
+    return rgba
+
+
+def render_geo_distribution(
+    path: str,
+    geo,
+    postal_distribution: str | None,
+    density: GeoDensity | None = None,
+    theme: Theme = NEON,
+) -> str:
+    fig, ax = _new_figure(theme)
+
+    any_points = False
+    handles = None  # scatter: legend from the artists' labels
+    if density is not None:
+        from matplotlib.patches import Patch
+
+        log_max = max((np.log1p(c.max()) for c in density.counts.values() if c.size), default=0.0) or 1.0
+        handles = []
+        for i, (label, alpha) in enumerate(zip(_GEO_LABELS, theme.geo_alphas)):
+            counts = density.counts.get(label)
+            if counts is None or not counts.any():
+                continue
+            any_points = True
+            ax.imshow(
+                _density_rgba(counts, theme.color(i), alpha, log_max),
+                extent=density.extent,
+                origin="lower",
+                aspect="auto",
+                interpolation="nearest",
+            )
+            handles.append(Patch(facecolor=theme.color(i), alpha=alpha, label=label))
+        ax.set_xlim(density.extent[0], density.extent[1])
+        ax.set_ylim(density.extent[2], density.extent[3])
+    else:
+        for i, (label, alpha) in enumerate(zip(_GEO_LABELS, theme.geo_alphas)):
+            xs, ys = geo.get(label, ((), ()))
+            if len(xs):
+                any_points = True
+                ax.scatter(xs, ys, s=22, c=theme.color(i), alpha=alpha, linewidths=0.0, label=label)
+
+    _title(ax, "geo_distribution", theme, f" ({postal_distribution or 'n/a'})")
+    ax.set_xlabel(CHARTS["geo_distribution"]["x"], color=theme.foreground)
+    ax.set_ylabel(CHARTS["geo_distribution"]["y"], color=theme.foreground)
+
+    if any_points:
+        legend = ax.legend(handles=handles, facecolor=theme.background, edgecolor=theme.foreground)
+        _style_legend(legend, theme)
+    else:
+        ax.text(0.5, 0.5, "No valid geo points", ha="center", va="center", color=theme.foreground, fontsize=14)
+
+    return _save(fig, path)
+
+
+def render_country_split(path: str, counts, theme: Theme = NEON) -> str:
+    fig, ax = _new_figure(theme)
+    if counts:
+        _pie(ax, "country_split", counts, [1.0, 0.65, 0.35, 0.20], theme)
+    else:
+        _no_data(ax, "No country data", theme)
+    return _save(fig, path)
+
+
+def render_package_distribution(path: str, counts, theme: Theme = NEON) -> str:
+    fig, ax = _new_figure(theme, figsize=(13, 8))
+    if counts:
+        _bar(ax, "package_distribution", counts, lambda i: [1.0, 0.9, 0.75, 0.6][i % 4], theme)
+        ax.tick_params(axis="x", rotation=30, colors=theme.foreground)
+    else:
+        _no_data(ax, "No package data", theme)
+    return _save(fig, path)
+
+
+def render_subscription_status(path: str, counts, theme: Theme = NEON) -> str:
+    fig, ax = _new_figure(theme)
+    if counts:
+        _pie(ax, "subscription_status", counts, [1.0, 0.8, 0.55, 0.35, 0.2], theme)
+    else:
+        _no_data(ax, "No status data", theme)
+    return _save(fig, path)
+
+
+def render_billing_cycle(path: str, counts, theme: Theme = NEON) -> str:
+    fig, ax = _new_figure(theme)
+    if counts:
+        _bar(ax, "billing_cycle", counts, lambda i: [1.0, 0.7, 0.5][i % 3], theme)
+    else:
+        _no_data(ax, "No cycle data", theme)
+    return _save(fig, path)
+
+
+def render_customer_creation_timeline(path: str, counts, theme: Theme = NEON) -> str:
+    fig, ax = _new_figure(theme, figsize=(14, 8))
+    if counts:
+        _bar(ax, "customer_creation_timeline", counts, lambda i: 0.55 + (0.45 * ((i % 4) / 3.0)), theme)
+        ax.tick_params(axis="x", rotation=45, colors=theme.foreground)
+    else:
+        _no_data(ax, "No timeline data", theme)
+    return _save(fig, path)
+
+
+_RENDERERS = {
+    "geo_distribution": render_geo_distribution,
+    "country_split": render_country_split,
+    "package_distribution": render_package_distribution,
+    "subscription_status": render_subscription_status,
+    "billing_cycle": render_billing_cycle,
+    "customer_creation_timeline": render_customer_creation_timeline,
+}
+
+
+def _render_job(job: tuple[str, dict]) -> tuple[str, str]:
+    key, kwargs = job
+    return key, _RENDERERS[key](**kwargs)
+
+
+# ------------------------------------------------------------
+# entry point
+# ------------------------------------------------------------
+def snapshot_jobs(
+    aggs: SnapshotAggregates,
+    out_dir: Path,
+    *,
+    postal_distribution: str | None,
+    theme: Theme = NEON,
+) -> list[tuple[str, dict]]:
+    """(chart key, renderer kwargs) per chart; the slowest (geo) first."""
+    paths = {key: str(out_dir / name) for key, name in SNAPSHOT_FILES.items()}
+    return [
+        (
+            "geo_distribution",
+            {
+                "path": paths["geo_distribution"],
+                "geo": aggs.geo,
+                "postal_distribution": postal_distribution,
+                "density": aggs.geo_density,
+                "theme": theme,
+            },
+        ),
+        ("country_split", {"path": paths["country_split"], "counts": aggs.country_counts, "theme": theme}),
+        ("package_distribution", {"path": paths["package_distribution"], "counts": aggs.package_counts, "theme": theme}),
+        ("subscription_status", {"path": paths["subscription_status"], "counts": aggs.status_counts, "theme": theme}),
+        ("billing_cycle", {"path": paths["billing_cycle"], "counts": aggs.cycle_counts, "theme": theme}),
+        ("customer_creation_timeline", {"path": paths["customer_creation_timeline"], "counts": aggs.month_counts, "theme": theme}),
+    ]
+
+
+def _output_source() -> bytes:
+    # every module that shapes a chart's PNG / JSON / SVG, so editing any of them redraws
+    files = (__file__, snapshot_series.__file__, snapshot_aggregate.__file__)
+    return b"".join(Path(f).read_bytes() for f in files)
+
+
+def _series_kwargs(kwargs: dict) -> dict:
+    return {k: v for k, v in kwargs.items() if k not in ("path", "theme")}
+
+
+def render_snapshots(
+    aggs: SnapshotAggregates,
+    out_dir: Path,
+    *,
+    postal_distribution: str | None = None,
+    theme: Theme = NEON,
+    workers: int = SNAPSHOT_WORKERS,
+) -> dict[str, str]:
+    """Draws the charts whose inputs changed since the manifest was written (see snapshot_cache.py)."""
+    jobs = snapshot_jobs(aggs, out_dir, postal_distribution=postal_distribution, theme=theme)
+
+    renderer_source = _output_source()
+    cached = load_manifest(out_dir)
+    charts, digests, todo = {}, {}, []
+    for key, kwargs in jobs:
+        inputs = {k: v for k, v in kwargs.items() if k != "path"}
+        digests[key] = chart_hash(key, {**inputs, "svg": SNAPSHOT_SVG, "json_geo_bins": JSON_GEO_BINS}, renderer_source)
+        if is_fresh(cached, key, digests[key], out_dir):
+            charts[key] = cached[key]
+            log.info("ℹ️ unchanged %s", kwargs["path"])
+        else:
+            todo.append((key, kwargs))
+
+    if workers > 1 and len(todo) > 1:
+        ctx = multiprocessing.get_context()
+        with ctx.Pool(min(workers, len(todo))) as pool:
+            results = dict(pool.imap_unordered(_render_job, todo))
+    else:
+        results = dict(_render_job(job) for job in todo)
+
+    for key, kwargs in todo:
+        path = results[key]
+        write_chart_json(path, chart_json(key, **_series_kwargs(kwargs)))
+        charts[key] = manifest_entry(Path(path), digests[key], svg=SNAPSHOT_SVG)
+        log.info("✅ wrote %s", path)
+
+    write_manifest(out_dir, {key: charts[key] for key in SNAPSHOT_FILES})
+    return {key: str(out_dir / charts[key]["file"]) for key in SNAPSHOT_FILES}
@@ -0,0 +1,105 @@
+# server/seeder/seeder/snapshot_series.py
+"""
+The data behind each snapshot chart as compact JSON, written next to its PNG
+(snapshot_N_<chart>.json), so the client can draw the charts itself.
+
+Bar and pie charts carry their labels and values. The geo chart carries one
+sparse density grid per country ("cells" is a flat [row, col, count, ...]
+list, row 0 at lat_min) of at most SEED_SNAPSHOT_JSON_GEO_BINS columns, so
+its size does not grow with the customer count.
+
+SEED_SNAPSHOT_SVG=1 also saves every chart as SVG. Scatter-mode geo charts
+hold one element per customer there; use it with small seeds or the density
+mode.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .snapshot_aggregate import GeoDensity, geo_density
+
+SNAPSHOT_SVG = os.environ.get("SEED_SNAPSHOT_SVG", "0").strip() in ("1", "true", "True")
+JSON_GEO_BINS = int(os.environ.get("SEED_SNAPSHOT_JSON_GEO_BINS", "120"))
+
+CHARTS = {
+    "geo_distribution": {"type": "geo_density", "title": "Snapshot 1 - Geographic Distribution", "x": "Longitude", "y": "Latitude"},
+    "country_split": {"type": "pie", "title": "Snapshot 2 - Country Split"},
+    "package_distribution": {"type": "bar", "title": "Snapshot 3 - Package Distribution", "x": "Package", "y": "Subscriptions"},
+    "subscription_status": {"type": "pie", "title": "Snapshot 4 - Subscription Status"},
+    "billing_cycle": {"type": "bar", "title": "Snapshot 5 - Billing Cycle", "x": "Cycle", "y": "Subscriptions"},
+    "customer_creation_timeline": {"type": "bar", "title": "Snapshot 6 - Customer Creation Timeline", "x": "Year-Month", "y": "Customers"},
+}
+
+
+def _coarsen(density: GeoDensity, max_cols: int) -> GeoDensity:
+    """Sums f x f blocks so the grid is at most max_cols wide (extent grows to the padded edge)."""
+    if not density.counts:
+        return density
+    rows, cols = next(iter(density.counts.values())).shape
+    f = math.ceil(cols / max_cols) if max_cols > 0 else 1
+    if f <= 1:
+        return density
+
+    pad_r, pad_c = -rows % f, -cols % f
+    lon_min, lon_max, lat_min, lat_max = density.extent
+    cell_w, cell_h = (lon_max - lon_min) / cols, (lat_max - lat_min) / rows
+    extent = (lon_min, lon_max + pad_c * cell_w, lat_min, lat_max + pad_r * cell_h)
+
+    counts = {}
+    for label, grid in density.counts.items():
+        grid = np.pad(grid, ((0, pad_r), (0, pad_c)))
+        counts[label] = grid.reshape(grid.shape[0] // f, f, grid.shape[1] // f, f).sum(axis=(1, 3))
+    return GeoDensity(counts=counts, extent=extent)
+
+
+def _geo_series(geo, density: GeoDensity | None) -> dict[str, Any]:
+    if density is None:
+        density = geo_density(geo, bins=JSON_GEO_BINS)
+    else:
+        density = _coarsen(density, JSON_GEO_BINS)
+
+    series = []
+    for label, grid in density.counts.items():
+        rows, cols = np.nonzero(grid)
+        if len(rows) == 0:
+            continue
+        cells = np.column_stack([rows, cols, grid[rows, cols]]).ravel()
+        series.append({"label": label, "total": int(grid.sum()), "cells": cells.tolist()})
+
+    shape = next(iter(density.counts.values())).shape if density.counts else (0, 0)
+    return {
+        "extent": [round(v, 6) for v in density.extent],
+        "shape": list(shape),
+        "series": series,
+    }
+
+
+def chart_json(
+    key: str,
+    *,
+    counts: list[tuple[str, int]] | None = None,
+    geo: dict[str, tuple[np.ndarray, np.ndarray]] | None = None,
+    density: GeoDensity | None = None,
+    postal_distribution: str | None = None,
+) -> dict[str, Any]:
+    doc: dict[str, Any] = {"version": 1, "chart": key, **CHARTS[key]}
+    if key == "geo_distribution":
+        doc["postal_distribution"] = postal_distribution
+        doc.update(_geo_series(geo or {}, density))
+    else:
+        doc["labels"] = [str(label) for label, _ in counts or []]
+        doc["values"] = [int(v) for _, v in counts or []]
+    return doc
+
+
+def write_chart_json(png_path: str | Path, doc: dict[str, Any]) -> Path:
+    path = Path(png_path).with_suffix(".json")
+    path.write_text(json.dumps(doc, separators=(",", ":")), encoding="utf-8")
+    return path
@@ -5,8 +5,13 @@ from __future__ import annotations
 import math
 import random
 from dataclasses import dataclass
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Sequence
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+DISTRIBUTIONS = ("uniform", "popular_packages", "heavy_monthly", "realistic_default")
 
 
 @dataclass(frozen=True)
@@ -18,19 +23,141 @@ class SubscriptionPick:
     start_dt: datetime         # timezone-aware UTC datetime
 
 
+# ============================================================
+# WEIGHTED SAMPLING (Vose alias method)
+# ============================================================
+def _alias_tables(weights: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Vose's prob / alias tables, built in vectorized rounds. Every small item
+    (scaled weight < 1) is paired with the large item whose slice of the total
+    surplus holds the start of its deficit; a large item drawn below 1 that way
+    is a small item in the next round. Each round settles all of its small
+    items, and there are only a few rounds on real weights.
+    """
+    n = len(weights)
+    scaled = weights * (n / weights.sum())
+    prob = np.ones(n, dtype=np.float64)
+    alias = np.arange(n, dtype=np.int64)
+    small = np.flatnonzero(scaled < 1.0)
+    large = np.flatnonzero(scaled >= 1.0)
+
+    while len(small) and len(large):
+        deficit = 1.0 - scaled[small]
+        starts = np.cumsum(deficit) - deficit
+        surplus_ends = np.cumsum(scaled[large] - 1.0)
+        donor = np.minimum(np.searchsorted(surplus_ends, starts, side="right"), len(large) - 1)
+
+        prob[small] = scaled[small]
+        alias[small] = large[donor]
+        scaled[large] -= np.bincount(donor, weights=deficit, minlength=len(large))
+
+        below = scaled[large] < 1.0
+        small, large = large[below], large[~below]
+
+    # leftovers are 1.0 up to float rounding
+    return prob, alias
+
+
+class WeightedSampler:
+    """
+    Weighted picker over a fixed list of items (Vose's alias method).
+    Building is O(n) in NumPy (16 bytes per item); every draw is O(1)
+    regardless of the number of items. weights=None means uniform.
+
+    draw() uses the stdlib `random` module (so random.seed() pins it);
+    sample_indices() draws many at once from a NumPy Generator.
+    """
+
+    def __init__(self, items: Sequence, weights: Optional[Sequence[float]] = None):
+        if len(items) == 0:
+            raise ValueError("Cannot pick from empty items.")
+        if weights is not None and len(weights) != len(items):
+            raise ValueError("weights length must match items length.")
+
+        self.items = items
+        self.n = len(items)
+        self.uniform = weights is None
+        self.prob = np.ones(0, dtype=np.float64)
+        self.alias = np.zeros(0, dtype=np.int64)
+        self._py_tables: Optional[tuple[list[float], list[int]]] = None
+
+        if self.uniform:
+            return
+
+        w = np.asarray(weights, dtype=np.float64)
+        if w.sum() <= 0 or (w < 0).any():
+            raise ValueError("weights must be non-negative and sum to a positive value.")
+        self.prob, self.alias = _alias_tables(w)
+
+    def draw_index(self) -> int:
+        u = random.random() * self.n
+        i = int(u)
+        if self.uniform:
+            return i
+        # one draw at a time: plain lists index faster than the arrays
+        if self._py_tables is None:
+            self._py_tables = (self.prob.tolist(), self.alias.tolist())
+        prob, alias = self._py_tables
+        return i if (u - i) < prob[i] else alias[i]
+
+    def draw(self):
+        return self.items[self.draw_index()]
+
+    def sample_indices(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        i = rng.integers(0, self.n, n)
+        if self.uniform:
+            return i
+        return np.where(rng.random(n) < self.prob[i], i, self.alias[i])
+
+
+_SAMPLER_CACHE: dict[tuple, tuple[Sequence, Any, WeightedSampler]] = {}
+_SAMPLER_CACHE_MAX = 64
+
+
+def cached_sampler(items: Sequence, weights: Optional[Sequence[float]] = None, *, weight_index: Optional[int] = None) -> WeightedSampler:
+    """
+    Returns a WeightedSampler for items, built once per (items, weights) object pair.
+
+    weight_index reads each item's weight from item[weight_index] instead
+    (e.g. the city/region tables in seeders.py). The cache keys on object
+    identity, so lists must not be mutated in place after first use.
+    """
+    source = weights if weight_index is None else weight_index
+    key = (id(items), id(source) if weight_index is None else weight_index)
+
+    hit = _SAMPLER_CACHE.get(key)
+    if hit is not None and hit[0] is items and hit[1] is source:
+        return hit[2]
+
+    if weight_index is not None:
+        weights = [row[weight_index] for row in items]
+    sampler = WeightedSampler(items, weights)
+
+    if len(_SAMPLER_CACHE) >= _SAMPLER_CACHE_MAX:
+        _SAMPLER_CACHE.clear()
+    _SAMPLER_CACHE[key] = (items, source, sampler)
+    return sampler
+
+
 def _pick_weighted(items: Sequence[int], weights: Optional[Sequence[float]] = None) -> int:
-    if not items:
-        raise ValueError("Cannot pick from empty items.")
-    if weights is None:
-        return random.choice(list(items))
-    if len(weights) != len(items):
-        raise ValueError("weights length must match items length.")
-    return random.choices(list(items), weights=list(weights), k=1)[0]
+    return cached_sampler(items, weights).draw()
+
+
+@lru_cache(maxsize=32)
+def _cycle_sampler(monthly_pct: int, annual_pct: int) -> WeightedSampler:
+    return WeightedSampler(("MONTHLY", "ANNUAL"), (monthly_pct, annual_pct))
 
 
 def _pick_cycle(monthly_pct: int, annual_pct: int) -> str:
     # e.g. monthly_pct=85, annual_pct=15
-    return random.choices(["MONTHLY", "ANNUAL"], weights=[monthly_pct, annual_pct], k=1)[0]
+    return _cycle_sampler(monthly_pct, annual_pct).draw()
+
+
+@lru_cache(maxsize=32)
+def _status_sampler(allowed_statuses: tuple[str, ...], weights_items: Optional[tuple[tuple[str, int], ...]]) -> WeightedSampler:
+    if weights_items is None:
+        return WeightedSampler(allowed_statuses)
+    return WeightedSampler(allowed_statuses, _status_weights(allowed_statuses, dict(weights_items)))
 
 
 def _pick_status(allowed_statuses: Sequence[str], weights_by_key: Optional[dict[str, int]] = None) -> str:
@@ -39,9 +166,11 @@ def _pick_status(allowed_statuses: Sequence[str], weights_by_key: Optional[dict[
     if not allowed_statuses:
         return "ACTIVE"
 
-    if not weights_by_key:
-        return random.choice(list(allowed_statuses))
+    weights_items = tuple(sorted(weights_by_key.items())) if weights_by_key else None
+    return _status_sampler(tuple(allowed_statuses), weights_items).draw()
 
+
+def _status_weights(allowed_statuses: Sequence[str], weights_by_key: dict[str, int]) -> list[int]:
     weights = []
     for s in allowed_statuses:
         s_up = (s or "").upper()
@@ -53,8 +182,7 @@ def _pick_status(allowed_statuses: Sequence[str], weights_by_key: Optional[dict[
             weights.append(weights_by_key.get("PAST", 10))
         else:
             weights.append(weights_by_key.get("OTHER", 5))
-
-    return random.choices(list(allowed_statuses), weights=weights, k=1)[0]
+    return weights
 
 
 def _start_date_uniform(max_days_back: int) -> datetime:
@@ -150,3 +278,126 @@ def pick_subscription_by_distribution(
         status=str(status),
         start_dt=start_dt,
     )
+
+
+# ============================================================
+# BATCHED (NumPy) SAMPLING
+# ============================================================
+@dataclass(frozen=True)
+class SubscriptionBatch:
+    """Column-wise equivalent of n SubscriptionPick values."""
+    customer_ids: np.ndarray   # int64
+    package_ids: np.ndarray    # int64
+    cycles: np.ndarray         # str: "MONTHLY" / "ANNUAL"
+    statuses: np.ndarray       # str, drawn from allowed_statuses
+    start_dts: np.ndarray      # datetime64[us], UTC (naive)
+
+    def __len__(self) -> int:
+        return len(self.customer_ids)
+
+
+def _as_int64(ids: Sequence[int]) -> np.ndarray:
+    if isinstance(ids, range):
+        return np.arange(ids.start, ids.stop, ids.step, dtype=np.int64)
+    return np.asarray(ids, dtype=np.int64)
+
+
+class SubscriptionSampler:
+    """
+    Builds the WeightedSampler tables for one distribution once, so that
+    sample(n) draws all five fields for n subscriptions with vectorized NumPy.
+
+    Same knobs and per-distribution semantics as pick_subscription_by_distribution().
+    """
+
+    def __init__(
+        self,
+        distribution: str,
+        cust_ids: Sequence[int],
+        pkg_ids: Sequence[int],
+        allowed_statuses: Sequence[str],
+        *,
+        pkg_weights: Optional[Sequence[float]] = None,
+        cust_weights: Optional[Sequence[float]] = None,
+        cycle_weights: tuple[int, int] = (50, 50),
+        status_weights_by_key: Optional[dict[str, int]] = None,
+        max_days_back: int = 1200,
+        recent_mean_days: int = 180,
+        rng: Optional[np.random.Generator] = None,
+    ):
+        dist = (distribution or "uniform").strip().lower()
+        if dist not in DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown subscription distribution '{distribution}'. "
+                f"Try: uniform, popular_packages, heavy_monthly, realistic_default"
+            )
+        if len(cust_ids) == 0 or len(pkg_ids) == 0:
+            raise ValueError("Cannot pick from empty items.")
+
+        self.distribution = dist
+        self.max_days_back = max_days_back
+        self.recent_mean_days = recent_mean_days
+        # default: derive from the stdlib RNG so SEED_RANDOM_SEED also pins NumPy draws
+        self.rng = rng if rng is not None else np.random.default_rng(random.getrandbits(64))
+
+        self.cust_ids = _as_int64(cust_ids)
+        self.pkg_ids = _as_int64(pkg_ids)
+
+        use_pkg_w = dist in ("popular_packages", "heavy_monthly", "realistic_default")
+        use_cust_w = dist in ("heavy_monthly", "realistic_default")
+        self.pkg_sampler = WeightedSampler(pkg_ids, pkg_weights if use_pkg_w else None)
+        self.cust_sampler = WeightedSampler(cust_ids, cust_weights if use_cust_w else None)
+
+        monthly, annual = cycle_weights
+        if dist == "realistic_default" and (monthly, annual) == (50, 50):
+            monthly, annual = (85, 15)
+        self.cycle_labels = np.array(["MONTHLY", "ANNUAL"])
+        self.cycle_sampler = _cycle_sampler(monthly, annual)
+
+        self.status_labels = np.array(list(allowed_statuses) or ["ACTIVE"])
+        weights_items = None
+        if allowed_statuses and dist == "realistic_default":
+            weights_map = status_weights_by_key or {"ACTIVE": 80, "CANCEL": 10, "PAST": 10, "OTHER": 5}
+            weights_items = tuple(sorted(weights_map.items()))
+        self.status_sampler = _status_sampler(tuple(self.status_labels.tolist()), weights_items)
+
+    def sample(self, n: int) -> SubscriptionBatch:
+        rng = self.rng
+
+        cust = self.cust_ids[self.cust_sampler.sample_indices(n, rng)]
+        pkg = self.pkg_ids[self.pkg_sampler.sample_indices(n, rng)]
+        cycles = self.cycle_labels[self.cycle_sampler.sample_indices(n, rng)]
+        statuses = self.status_labels[self.status_sampler.sample_indices(n, rng)]
+
+        if self.distribution == "realistic_default":
+            # exponential: many recent, fewer old
+            days_ago = np.minimum(rng.exponential(self.recent_mean_days, n).astype(np.int64), self.max_days_back)
+        else:
+            days_ago = rng.integers(0, self.max_days_back + 1, n)
+
+        now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "us")
+        start_dts = now - days_ago.astype("timedelta64[D]")
+
+        return SubscriptionBatch(
+            customer_ids=cust,
+            package_ids=pkg,
+            cycles=cycles,
+            statuses=statuses,
+            start_dts=start_dts,
+        )
+
+
+def pick_subscriptions_batch(
+    distribution: str,
+    n: int,
+    cust_ids: Sequence[int],
+    pkg_ids: Sequence[int],
+    allowed_statuses: Sequence[str],
+    **kwargs,
+) -> SubscriptionBatch:
+    """
+    Batched pick_subscription_by_distribution(): draws n subscriptions at once.
+    For repeated batches over the same ids, build a SubscriptionSampler once instead.
+    """
+    sampler = SubscriptionSampler(distribution, cust_ids, pkg_ids, allowed_statuses, **kwargs)
+    return sampler.sample(n)
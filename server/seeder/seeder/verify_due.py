@@ -4,6 +4,13 @@ from dataclasses import dataclass
 from datetime import date, timedelta
 import calendar
 
+import psycopg2
+
+from .log import get_logger
+from .schema import get_column_type, get_enum_labels_for_column
+
+log = get_logger(__name__)
+
 
 def last_day_of_month(d: date) -> int:
     return calendar.monthrange(d.year, d.month)[1]
@@ -69,24 +76,113 @@ def _select_or_null(alias: str, table_alias: str, col: str | None, pg_type: str
     return f"NULL::{pg_type} AS {alias}"
 
 
-def find_due_monthly_active_subs(
-    cur,
-    schema: VerifySchema,
-    days_ahead: int = 7,
-    today: date | None = None,
-) -> list[DueItem]:
-    """
-    Returns MONTHLY + ACTIVE subscriptions whose "startDate day-of-month"
-    is due within [today, today+days_ahead].
+# Rows fetched per round trip by the server-side cursor in iter_due_monthly_active_subs.
+DUE_SCAN_ITERSIZE = 5000
 
-    IMPORTANT: This function does NOT print and does NOT insert anything.
+
+def due_start_days(today: date, days_ahead: int) -> list[int]:
     """
-    if today is None:
-        today = date.today()
+    Start days-of-month that can fall due in the window: each date's day, plus
+    29..31 style overflow days when the window crosses a short month's last day.
+    """
+    days = set()
+    for d in window_dates(today, days_ahead):
+        days.add(d.day)
+        if d.day == last_day_of_month(d):
+            days.update(range(d.day + 1, 32))
+    return sorted(days)
+
+
+def due_day_index_name(schema: VerifySchema) -> str:
+    return f"{schema.sub_table}_due_day_idx"
 
-    dates = window_dates(today, days_ahead)
 
-    # --- stable SELECT list ---
+def due_label_filters(cur, schema: VerifySchema, alias: str | None = "s") -> tuple[list[str], list]:
+    """
+    MONTHLY / ACTIVE predicates for the cycle / status columns that exist,
+    case-insensitive: an enum column is compared with those of its labels
+    that upper-case to the value, a text column through ILIKE (the values
+    hold no wildcards, and unlike upper() it keeps the column statistics in play).
+    Returns (predicates with %s placeholders, their parameters).
+    """
+    where: list[str] = []
+    params: list = []
+    for col, value in ((schema.sub_cycle_col, "MONTHLY"), (schema.sub_status_col, "ACTIVE")):
+        if not col:
+            continue
+        ref = f'{alias}."{col}"' if alias else f'"{col}"'
+        labels = get_enum_labels_for_column(cur, schema.sub_table, col)
+        if labels:
+            where.append(f"{ref} = ANY(%s::{get_column_type(cur, schema.sub_table, col)}[])")
+            params.append([label for label in labels if label.upper() == value])
+        else:
+            where.append(f"{ref}::text ILIKE %s")
+            params.append(value)
+    return where, params
+
+
+def ensure_due_day_index(cur, schema: VerifySchema) -> bool:
+    """
+    Creates (if missing) the partial expression index the due scan relies on:
+      (EXTRACT(DAY FROM startDate)::int) WHERE <billingCycle is MONTHLY> AND <status is ACTIVE>
+    (predicates from due_label_filters), so the scan reads only the
+    ~window/31 slice of active monthly subscriptions.
+
+    Runs under a savepoint: on failure (permissions, non-immutable column type)
+    it logs a warning and the scan falls back to a sequential scan.
+    Returns True if the index exists afterwards.
+    """
+    where, params = due_label_filters(cur, schema, alias=None)
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+    cur.execute("SAVEPOINT ensure_due_day_index")
+    try:
+        cur.execute(
+            f'''
+            CREATE INDEX IF NOT EXISTS "{due_day_index_name(schema)}"
+            ON "{schema.sub_table}" ((EXTRACT(DAY FROM "{schema.sub_start_col}")::int))
+            {where_sql}
+            ''',
+            params,
+        )
+    except psycopg2.Error as e:
+        cur.execute("ROLLBACK TO SAVEPOINT ensure_due_day_index")
+        log.warning("⚠️ Could not create due-day index on %s: %s", schema.sub_table, str(e).strip())
+        return False
+    cur.execute("RELEASE SAVEPOINT ensure_due_day_index")
+    return True
+
+
+# Every date in [%s, %s] with its day-of-month and the last day of its month.
+_DUE_WINDOW_CTE = """
+        WITH win AS (
+          SELECT
+            g.d::date AS due_date,
+            EXTRACT(DAY FROM g.d)::int AS dom,
+            EXTRACT(DAY FROM date_trunc('month', g.d) + interval '1 month' - interval '1 day')::int AS last_dom
+          FROM generate_series(%s::date, %s::date, interval '1 day') AS g(d)
+        )"""
+
+
+def _due_filters(schema: VerifySchema, label_where: list[str]) -> list[str]:
+    # The day-of-month, cycle and status predicates mirror ensure_due_day_index()
+    # exactly so the planner can use that partial index.
+    return [
+        f's."{schema.sub_start_col}" IS NOT NULL',
+        f'EXTRACT(DAY FROM s."{schema.sub_start_col}")::int = ANY(%s)',
+        *label_where,
+    ]
+
+
+def _due_scan_sql(schema: VerifySchema, label_where: list[str]) -> str:
+    """
+    One set-based query for the due scan:
+      - win: every date in the window with its day-of-month and the month's last day
+      - LATERAL: the window dates where LEAST(start day, last day of month) matches
+      - WHERE: MONTHLY + ACTIVE (only if the columns exist), at least one due date
+    Parameters: (window_start, window_end, candidate start days, *label params),
+    label_where / label params from due_label_filters().
+    """
     sub_start_expr = _select_or_null("sub_start", "s", schema.sub_start_col, pg_type="date")
     sub_id_expr = _select_or_null("sub_id", "s", schema.sub_pk, pg_type="int")
     cust_id_expr = _select_or_null("cust_id", "s", schema.sub_cust_fk, pg_type="int")
@@ -114,7 +210,10 @@ def find_due_monthly_active_subs(
     cust_email_expr = _select_or_null("cust_email", "c", schema.cust_email, "text") if can_join_customer else "NULL::text AS cust_email"
     pkg_name_expr = _select_or_null("pkg_name", "p", schema.pkg_name, "text") if can_join_package else "NULL::text AS pkg_name"
 
-    sql = f"""
+    where = _due_filters(schema, label_where) + ["d.due_dates IS NOT NULL"]
+
+    return f"""
+        {_DUE_WINDOW_CTE}
         SELECT
           {sub_start_expr},
           {sub_id_expr},
@@ -126,58 +225,90 @@ def find_due_monthly_active_subs(
           {cust_first_expr},
           {cust_last_expr},
           {cust_email_expr},
-          {pkg_name_expr}
+          {pkg_name_expr},
+          d.due_dates
         FROM "{schema.sub_table}" s
+        CROSS JOIN LATERAL (
+          SELECT array_agg(w.due_date ORDER BY w.due_date) AS due_dates
+          FROM win w
+          WHERE w.dom = LEAST(EXTRACT(DAY FROM s."{schema.sub_start_col}")::int, w.last_dom)
+        ) d
         {" ".join(joins)}
+        WHERE {" AND ".join(where)}
     """
 
-    cur.execute(sql)
-    rows = cur.fetchall()
 
-    out: list[DueItem] = []
+def due_pairs_sql(schema: VerifySchema, label_where: list[str]) -> str:
+    """
+    Flat (sub_id, due_date) form of the due scan, one row per payment that
+    falls due, with no customer/package joins. Meant to be embedded in
+    INSERT ... SELECT. Same parameters as the due scan:
+    (window_start, window_end, candidate start days, *label params).
+    """
+    if not schema.sub_pk:
+        raise SystemExit(f"{schema.sub_table}: no primary key column detected; cannot build due pairs.")
 
-    for r in rows:
-        (
-            sub_start,
-            sub_id,
-            cust_id,
-            pkg_id,
-            cycle,
-            status,
-            cust_full,
-            cust_first,
-            cust_last,
-            cust_email,
-            pkg_name,
-        ) = r
+    return f"""
+        {_DUE_WINDOW_CTE}
+        SELECT s."{schema.sub_pk}" AS sub_id, w.due_date
+        FROM "{schema.sub_table}" s
+        JOIN win w
+          ON w.dom = LEAST(EXTRACT(DAY FROM s."{schema.sub_start_col}")::int, w.last_dom)
+        WHERE {" AND ".join(_due_filters(schema, label_where))}
+    """
 
-        if sub_start is None:
-            continue
 
-        # Filter MONTHLY + ACTIVE (only if the columns exist)
-        if schema.sub_cycle_col and str(cycle).upper() != "MONTHLY":
-            continue
-        if schema.sub_status_col and str(status).upper() != "ACTIVE":
-            continue
+def due_scan_params(today: date, days_ahead: int) -> tuple:
+    return (today, today + timedelta(days=days_ahead), due_start_days(today, days_ahead))
 
-        start_day = int(sub_start.day)
 
-        due_dates = []
-        for d in dates:
-            if d.day == effective_due_day(start_day, d):
-                due_dates.append(d)
+def iter_due_monthly_active_subs(
+    cur,
+    schema: VerifySchema,
+    days_ahead: int = 7,
+    today: date | None = None,
+):
+    """
+    Streaming form of find_due_monthly_active_subs(): yields DueItem rows.
 
-        if not due_dates:
-            continue
+    Filtering and due-date matching run in Postgres, and results come through
+    a server-side cursor (DUE_SCAN_ITERSIZE rows per round trip), so only due
+    subscriptions cross the wire and memory stays flat.
+    Must be called inside a transaction.
+    """
+    if today is None:
+        today = date.today()
 
-        customer_label = (
-            cust_full
-            or (" ".join([x for x in [cust_first, cust_last] if x]) if (cust_first or cust_last) else None)
-            or cust_email
-        )
+    label_where, label_params = due_label_filters(cur, schema)
+    sql = _due_scan_sql(schema, label_where)
+
+    with cur.connection.cursor(name="due_monthly_active_scan") as scan:
+        scan.itersize = DUE_SCAN_ITERSIZE
+        scan.execute(sql, (*due_scan_params(today, days_ahead), *label_params))
+
+        for r in scan:
+            (
+                sub_start,
+                sub_id,
+                cust_id,
+                pkg_id,
+                cycle,
+                status,
+                cust_full,
+                cust_first,
+                cust_last,
+                cust_email,
+                pkg_name,
+                due_dates,
+            ) = r
+
+            customer_label = (
+                cust_full
+                or (" ".join([x for x in [cust_first, cust_last] if x]) if (cust_first or cust_last) else None)
+                or cust_email
+            )
 
-        out.append(
-            DueItem(
+            yield DueItem(
                 sub_id=sub_id,
                 cust_id=cust_id,
                 pkg_id=pkg_id,
@@ -186,11 +317,23 @@ def find_due_monthly_active_subs(
                 status=status,
                 pkg_name=pkg_name,
                 customer_label=customer_label,
-                due_dates=due_dates,
+                due_dates=list(due_dates),
             )
-        )
 
-    return out
+
+def find_due_monthly_active_subs(
+    cur,
+    schema: VerifySchema,
+    days_ahead: int = 7,
+    today: date | None = None,
+) -> list[DueItem]:
+    """
+    Returns MONTHLY + ACTIVE subscriptions whose "startDate day-of-month"
+    is due within [today, today+days_ahead].
+
+    IMPORTANT: This function does NOT print and does NOT insert anything.
+    """
+    return list(iter_due_monthly_active_subs(cur, schema, days_ahead=days_ahead, today=today))
 
 
 def verify_due_next_days(cur, schema: VerifySchema, days_ahead: int = 7, today: date | None = None) -> None:
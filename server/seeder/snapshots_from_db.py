@@ -0,0 +1,35 @@
+import os
+import sys
+
+# Ensure imports work: allow `from seeder.snapshot_generator import generate_snapshots_from_db`
+HERE = os.path.dirname(os.path.abspath(__file__))  # .../server/seeder
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+from seeder.config import strip_prisma_schema_query
+from seeder.db import connect
+from seeder.seeders import SNAPSHOT_OUTPUT_DIR
+from seeder.snapshot_generator import generate_snapshots_from_db
+
+
+def main():
+    # Usage: python snapshots_from_db.py [output dir]
+    if len(sys.argv) > 2:
+        raise SystemExit("Usage: python snapshots_from_db.py [output dir]")
+
+    db_url = os.getenv("DATABASE_URL")
+    if not db_url:
+        raise SystemExit("DATABASE_URL is not set (needed for snapshots_from_db.py).")
+
+    output_dir = sys.argv[1] if len(sys.argv) == 2 else SNAPSHOT_OUTPUT_DIR
+    conn = connect(strip_prisma_schema_query(db_url))
+    try:
+        with conn.cursor() as cur:
+            generate_snapshots_from_db(cur, output_dir=output_dir)
+        conn.rollback()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -166,6 +166,62 @@ describe("Payments routes", () => {
     expect(callArg.data.paidAt).toBe(null); // your code: (paidAt ? pa : null)
   });
 
+  test("POST /api/payments returns 409 when the payment already exists (P2002)", async () => {
+    prisma.payment.create.mockRejectedValue({ code: "P2002" });
+
+    const res = await request(app).post("/api/payments").send({
+      subscriptionID: 1,
+      dueDate: "2030-01-01",
+      status: "DUE",
+    });
+
+    expect(res.status).toBe(409);
+    expect(res.body).toEqual({
+      error: "A payment for this subscription and dueDate already exists",
+      code: "P2002",
+    });
+  });
+
+  test("POST /api/payments returns 500 for other create errors", async () => {
+    prisma.payment.create.mockRejectedValue({ code: "P2003" });
+
+    const res = await request(app).post("/api/payments").send({
+      subscriptionID: 1,
+      dueDate: "2030-01-01",
+      status: "DUE",
+    });
+
+    expect(res.status).toBe(500);
+    expect(res.body).toEqual({ error: "Failed to create payment (bad subscriptionID?)" });
+  });
+
+  test("PUT /api/payments/:id returns 409 when the dueDate collides (P2002)", async () => {
+    prisma.payment.findUnique.mockResolvedValue({ paymentID: 5 });
+    prisma.payment.update.mockRejectedValue({ code: "P2002" });
+
+    const res = await request(app)
+      .put("/api/payments/5")
+      .send({ dueDate: "2030-02-01" });
+
+    expect(res.status).toBe(409);
+    expect(res.body).toEqual({
+      error: "A payment for this subscription and dueDate already exists",
+      code: "P2002",
+    });
+  });
+
+  test("PUT /api/payments/:id returns 500 for other update errors", async () => {
+    prisma.payment.findUnique.mockResolvedValue({ paymentID: 5 });
+    prisma.payment.update.mockRejectedValue(new Error("boom"));
+
+    const res = await request(app)
+      .put("/api/payments/5")
+      .send({ status: "PAID" });
+
+    expect(res.status).toBe(500);
+    expect(res.body).toEqual({ error: "Failed to update payment" });
+  });
+
   test("DELETE /api/payments/:id returns 204 when deleted", async () => {
     prisma.payment.findUnique.mockResolvedValue({ paymentID: 9 });
     prisma.payment.delete.mockResolvedValue({});
@@ -95,6 +95,9 @@ router.post("/", async (req, res) => {
 
     res.status(201).json(created);
   } catch (_e) {
+    if (_e?.code === "P2002") {
+      return res.status(409).json({ error: "A payment for this subscription and dueDate already exists", code: _e.code });
+    }
     log.error("POST /payments failed", _e);
     res.status(500).json({ error: "Failed to create payment (bad subscriptionID?)" });
   }
@@ -141,6 +144,9 @@ router.put("/:id", async (req, res) => {
 
     res.json(updated);
   } catch (_e) {
+    if (_e?.code === "P2002") {
+      return res.status(409).json({ error: "A payment for this subscription and dueDate already exists", code: _e.code });
+    }
     log.error("PUT /payments/:id failed", _e);
     res.status(500).json({ error: "Failed to update payment" });
   }